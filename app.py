@@ -2,12 +2,16 @@
 
 import streamlit as st
 import os
-import json
 from econometric_data.upload_file import streamlit_file_uploader
 from econometric_data.model_date_selection import display_model_date_selection
 from econometric_data.select_model_variables import display_model_variables
+from econometric_data.data_cache import display_cache_stats
+from econometric_data.session_state import MODEL_SELECTION, get_state
 from econometric_data.econometric_modes.run_linear_regression import display_run_regression as run_linear
 from econometric_data.econometric_modes.run_logistic_regression import display_run_regression as run_logistic
+from econometric_data.econometric_modes.run_lasso_regression import display_run_regression as run_lasso
+from econometric_data.econometric_modes.run_ridge_regression import display_run_regression as run_ridge
+from econometric_data.econometric_modes.run_elastic_net_regression import display_run_regression as run_elastic_net
 
 # Ensure the save directory exists (if required globally for the app)
 SAVE_DIR = "uploaded_files"
@@ -44,6 +48,9 @@ def main():
     elif choice == "Step 4: Run Regression":
         step4_run_regression()
 
+    # Cache counters, after this run's lookups
+    display_cache_stats()
+
     # Footer
     st.components.v1.html("""
         <hr>
@@ -70,14 +77,11 @@ def step3_configure_model_variables():
 # Step 4: Run Regression
 def step4_run_regression():
     """Run the selected regression model."""
-    json_file = "econometric_data/date_and_model_selection.json"
-    if not os.path.exists(json_file):
-        st.error("JSON configuration file not found. Complete Step 2 first.")
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("No model selection found. Complete Step 2 first.")
         return
 
-    with open(json_file, 'r') as f:
-        selection_data = json.load(f)
-
     model_type = selection_data.get("model", "").title()  # Capitalize the model type
     regression_title = f"Run {model_type}"  # Avoid repeating "Regression"
     st.subheader(regression_title)  # Dynamic title
@@ -88,9 +92,11 @@ def step4_run_regression():
     elif model_type.lower() == "logistic regression":
         run_logistic()
     elif model_type.lower() == "lasso regression":
-        from econometric_data.econometric_modes.run_lasso_regression import run_lasso_model
-        if st.button("Run Lasso Regression"):
-            run_lasso_model()
+        run_lasso()
+    elif model_type.lower() == "ridge regression":
+        run_ridge()
+    elif model_type.lower() == "elastic net regression":
+        run_elastic_net()
     else:
         st.error(f"Unsupported model type: {model_type}")
 
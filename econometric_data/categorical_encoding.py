@@ -0,0 +1,80 @@
+# regressly/econometric_data/categorical_encoding.py
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sklearn.feature_extraction import FeatureHasher
+
+ENCODINGS = ["one-hot", "hashing"]
+
+# Columns each hashed categorical is folded into by default
+DEFAULT_HASH_FEATURES = 1024
+
+DEFAULT_ENCODING = {"method": "one-hot"}
+
+
+def one_hot(column, drop_first=True):
+    """
+    One-hot encode a column as the position of each row's level column.
+
+    Levels are sorted and the first is dropped when `drop_first`, as with
+    OneHotEncoder(drop="first"); missing values form their own level. Rows
+    of the dropped level get position -1 (no column).
+    Returns (positions, column names).
+    """
+    codes, levels = pd.factorize(column, use_na_sentinel=False)
+    # Sort by value, not by the category order of a categorical column, with missing last
+    levels = pd.Index(np.asarray(levels, dtype=object))
+    present = np.flatnonzero(levels.notna())
+    order = np.concatenate([present[np.argsort(levels[present].to_numpy())], np.flatnonzero(levels.isna())])
+    rank = np.empty(len(levels), dtype=np.intp)
+    rank[order] = np.arange(len(levels))
+    codes, levels = rank[codes], levels[order]
+
+    first = 1 if drop_first else 0
+    return codes - first, [f"{column.name}_{level}" for level in levels[first:]]
+
+
+def hashed(column, n_features=DEFAULT_HASH_FEATURES):
+    """
+    Encode a column with the hashing trick: every level is hashed into one of
+    `n_features` columns, however many levels there are. Each distinct level
+    is hashed once and the rows pick up their level's column.
+    Returns (positions, column names).
+    """
+    codes, levels = pd.factorize(column, use_na_sentinel=False)
+    hasher = FeatureHasher(n_features=n_features, input_type="string", alternate_sign=False)
+    level_columns = hasher.transform(
+        [f"{column.name}={level}"] for level in np.asarray(levels, dtype=object).astype(str)
+    ).tocsr().indices  # One non-zero per level
+    return level_columns[codes].astype(np.intp), [f"{column.name}_hash{i}" for i in range(n_features)]
+
+
+def binary_column(column):
+    """Map a two-level categorical to 0/1 in order of first appearance, as one float column."""
+    unique_values = column.unique()
+    return column.map({unique_values[0]: 0, unique_values[1]: 1}).astype(float)
+
+
+def column_summary(columns, limit=20):
+    """List the columns of a design, or the first `limit` of them and how many more there are."""
+    if len(columns) <= limit:
+        return ", ".join(columns)
+    return f"{', '.join(columns[:limit])} and {len(columns) - limit:,} more"
+
+
+def select_encoding(x_categorical):
+    """Show the categorical encoding choice and return the encoding entry to save with a selection."""
+    if not x_categorical:
+        return dict(DEFAULT_ENCODING)
+    method = st.selectbox(
+        "Categorical Encoding",
+        options=ENCODINGS,
+        help="One-hot keeps one sparse column per level; hashing folds every level into a fixed number of columns.",
+    )
+    if method == "hashing":
+        n_features = st.number_input(
+            "Hashed Columns per Categorical", min_value=2, max_value=2 ** 20, value=DEFAULT_HASH_FEATURES
+        )
+        return {"method": method, "n_features": int(n_features)}
+    return {"method": method}
@@ -0,0 +1,312 @@
+# regressly/econometric_data/chunked_io.py
+
+import io
+import os
+import csv
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from econometric_data.compression import (
+    READ_BLOCK_BYTES,
+    compression_of,
+    iter_decompressed_blocks,
+    open_decompressed,
+    read_csv,
+    skip_bytes,
+)
+
+# Ingestion settings
+UPLOAD_CHUNK_BYTES      = 8 * 1024 * 1024  # Bytes copied per write when saving an upload
+DEFAULT_MEMORY_LIMIT_MB = int(os.environ.get("REGRESSLY_INGEST_MEMORY_MB", 1024))
+MIN_CHUNK_ROWS          = 1_000
+MAX_CHUNK_ROWS          = 1_000_000
+SAMPLE_ROWS             = 1_000  # Rows parsed to estimate the in-memory size of a row
+PARSE_OVERHEAD          = 4      # Parsed chunk + parser buffers + per-column temporaries
+
+
+class PrefixHasher:
+    """
+    SHA-256 of a byte stream, with snapshots of the digest at given prefix sizes.
+    """
+
+    def __init__(self, prefix_sizes=()):
+        self.digest = hashlib.sha256()
+        self.pending = sorted(size for size in set(prefix_sizes) if size > 0)
+        self.prefixes = {}
+        self.size = 0
+
+    def update(self, block):
+        """Hash the next block, splitting it at any prefix boundary it crosses."""
+        start = 0
+        while self.pending and self.pending[0] <= self.size + len(block):
+            cut = self.pending.pop(0) - self.size
+            self.digest.update(block[start:cut])
+            self.prefixes[self.size + cut] = (self.digest.hexdigest(), block[cut - 1:cut] == b"\n")
+            start = cut
+        self.digest.update(block[start:])
+        self.size += len(block)
+
+    def result(self):
+        """Return (size, hex digest, {size: (prefix digest, ends_with_newline)})."""
+        return self.size, self.digest.hexdigest(), self.prefixes
+
+
+def save_upload_in_chunks(uploaded_file, save_path, chunk_bytes=UPLOAD_CHUNK_BYTES, prefix_sizes=(),
+                          file_name=None):
+    """
+    Copy an uploaded file to disk in fixed-size blocks, hashing it on the way.
+
+    The file is written to a temporary name first and moved into place once
+    complete, so readers never see a partially written upload. Compressed uploads
+    are stored as-is; their hashes are taken over the decompressed content, read
+    back as a stream. For every size in `prefix_sizes` the SHA-256 of the first
+    that many (uncompressed) bytes is recorded too, along with whether that prefix
+    ends on a line break. `file_name` (default: the upload's name) decides the
+    compression.
+
+    Returns (uncompressed bytes, SHA-256 hex digest, {size: (prefix digest, ends_with_newline)}).
+    """
+    compression = compression_of(file_name or uploaded_file.name)
+    hasher = PrefixHasher(prefix_sizes)
+    uploaded_file.seek(0)
+    tmp_path = save_path + ".part"
+    with open(tmp_path, 'wb') as f:
+        while True:
+            block = uploaded_file.read(chunk_bytes)
+            if not block:
+                break
+            f.write(block)
+            if compression is None:
+                hasher.update(block)
+    os.replace(tmp_path, save_path)
+
+    if compression is not None:
+        for block in iter_decompressed_blocks(save_path, chunk_bytes, compression):
+            hasher.update(block)
+    return hasher.result()
+
+
+def current_rss_bytes():
+    """Return the resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def validate_header(file_path):
+    """
+    Check that a CSV has a usable header row.
+
+    Raises ValueError for an empty file, blank column names or duplicate column names.
+    """
+    with open_decompressed(file_path) as (stream, _):
+        text = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+        header = next(csv.reader(text), None)
+    if not header:
+        raise ValueError("The file is empty or has no header row.")
+    names = [name.strip() for name in header]
+    if any(not name for name in names):
+        raise ValueError("The header row contains blank column names.")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate column names in header: {', '.join(duplicates)}")
+    return header
+
+
+def plan_chunk_rows(file_path, memory_limit_mb=None, chunk_budget_mb=None, **read_csv_kwargs):
+    """
+    Pick a chunk size (in rows) that keeps parsing within the memory limit.
+
+    The in-memory size of a row is estimated from a small sample of the file and
+    the budget is whatever the limit leaves above the current process RSS, or
+    `chunk_budget_mb` when given (a worker's share of the headroom, which the
+    RSS of a process shared with other workers says nothing about).
+    """
+    memory_limit_mb = memory_limit_mb or DEFAULT_MEMORY_LIMIT_MB
+    sample = read_csv(file_path, nrows=SAMPLE_ROWS, on_bad_lines="skip", **read_csv_kwargs)
+    if sample.empty:
+        return MIN_CHUNK_ROWS
+
+    bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+    if chunk_budget_mb is not None:
+        budget = chunk_budget_mb * 1024 ** 2
+    else:
+        budget = memory_limit_mb * 1024 ** 2 - (current_rss_bytes() or 0)
+    rows = int(budget / (bytes_per_row * PARSE_OVERHEAD))
+    return min(max(rows, MIN_CHUNK_ROWS), MAX_CHUNK_ROWS)
+
+
+class BadRowFilter(io.RawIOBase):
+    """
+    A CSV byte stream with the rows that have more fields than the header taken out.
+
+    Every row is checked as it passes through: its fields are the delimiters
+    outside quotes plus one, counted with numpy a block at a time. The
+    taken-out rows are listed in `skipped` as (line number, data rows before
+    it), line numbers being 1-based and counting rows, blank ones included,
+    from the first line read, as pandas numbers them (a line break inside
+    quotes does not start a new line). The state is the reader's own, so readers in
+    different threads do not wait on each other. `expected_fields` defaults to
+    the field count of the first row, the header.
+    """
+
+    def __init__(self, stream, expected_fields=None, has_header=True, sep=",", quotechar='"',
+                 block_bytes=READ_BLOCK_BYTES):
+        self.stream = stream
+        self.expected = expected_fields
+        self.header_pending = has_header
+        self.sep = sep.encode()
+        self.quote = quotechar.encode()
+        self.block_bytes = block_bytes
+        self.pending = b""    # Bytes read past the last complete row
+        self.output = b""     # Checked rows, read up to `position`
+        self.position = 0
+        self.lines = 0        # Rows checked so far
+        self.data_rows = 0    # Non-blank rows passed through, the header excluded
+        self.skipped = []
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.position == len(self.output) and not self.done:
+            block = self.stream.read(self.block_bytes)
+            self.done = not block
+            self.output = memoryview(self._check(self.pending + block, final=self.done))
+            self.position = 0
+        size = min(len(buffer), len(self.output) - self.position)
+        buffer[:size] = self.output[self.position:self.position + size]
+        self.position += size
+        return size
+
+    def _check(self, data, final):
+        """Return the complete rows of `data` that have the expected field count, keeping the rest pending."""
+        starts, ends, fields = self._split_rows(data, final)
+        self.pending = data[ends[-1]:] if len(ends) else data
+        if not len(ends):
+            return b""
+
+        if self.expected is None:
+            self.expected = int(fields[0])
+        bad = fields > self.expected
+        line_numbers = self.lines + 1 + np.arange(len(ends))
+        self.lines += len(ends)
+
+        # Rows counted by pandas: neither skipped, nor blank, nor the header
+        counted = ~bad & (ends - starts > 2)
+        for i in np.flatnonzero(~bad & (ends - starts <= 2)):
+            counted[i] = bool(data[starts[i]:ends[i]].strip(b"\r\n"))
+        if self.header_pending and counted.any():
+            counted[np.argmax(counted)] = False
+            self.header_pending = False
+        rows_before = self.data_rows + np.cumsum(counted) - counted
+        self.data_rows += int(counted.sum())
+
+        if not bad.any():
+            return data[:ends[-1]]
+        self.skipped += [(int(line), int(before)) for line, before in zip(line_numbers[bad], rows_before[bad])]
+        return b"".join(data[start:end] for start, end in zip(starts[~bad], ends[~bad]))
+
+    def _split_rows(self, data, final):
+        """
+        Return the (starts, ends, field counts) of the complete rows of `data`.
+
+        A delimiter or line break is inside quotes when an odd number of quotes
+        comes before it ("" inside quotes adds two).
+        """
+        values = np.frombuffer(data, dtype=np.uint8)
+        quotes = np.flatnonzero(values == self.quote[0])
+        newlines = np.flatnonzero(values == ord("\n"))
+        delimiters = np.flatnonzero(values == self.sep[0])
+        if len(quotes):
+            newlines = newlines[np.searchsorted(quotes, newlines) % 2 == 0]
+            delimiters = delimiters[np.searchsorted(quotes, delimiters) % 2 == 0]
+
+        ends = newlines + 1
+        if final and len(data) and (not len(ends) or ends[-1] < len(data)):
+            ends = np.append(ends, len(data))
+        starts = np.concatenate([[0], ends[:-1]])
+        fields = np.diff(np.searchsorted(delimiters, ends), prepend=0) + 1
+        return starts, ends, fields
+
+
+def iter_csv_chunks(file_path, chunksize=None, memory_limit_mb=None, progress_callback=None,
+                    start_offset=0, chunk_budget_mb=None, bad_rows_callback=None, **read_csv_kwargs):
+    """
+    Yield a CSV file as DataFrame chunks sized to stay within a memory limit.
+
+    Unless `chunksize` is given, the starting chunk size comes from
+    plan_chunk_rows (against `chunk_budget_mb`, if given). It is halved whenever
+    the process RSS is above the limit after a chunk has been consumed. `progress_callback(rows, fraction, rows_per_second)`
+    is called after every chunk.
+
+    Rows with more fields than the header are skipped rather than failing the
+    whole file; `bad_rows_callback(chunk_number, line_numbers)` is called for
+    every chunk (numbered from 0) that skipped any. Line numbers are 1-based and count from the
+    first line read. (Rows with too few fields cannot be told from rows with
+    trailing empty values and are kept, padded with missing values.)
+
+    With `start_offset`, reading starts at that (uncompressed) byte offset, which
+    must fall on a line boundary; pass `header=None, names=...` so the rows there
+    are not taken as a header. Compressed files are decompressed as they are read.
+    """
+    memory_limit_mb = memory_limit_mb or DEFAULT_MEMORY_LIMIT_MB
+    limit_bytes = memory_limit_mb * 1024 ** 2
+    plan_kwargs = {key: value for key, value in read_csv_kwargs.items() if key not in ("header", "names")}
+    rows_per_chunk = chunksize or plan_chunk_rows(file_path, memory_limit_mb, chunk_budget_mb, **plan_kwargs)
+    started = time.perf_counter()
+    rows = 0
+    chunk_number = 0
+
+    with open_decompressed(file_path) as (handle, raw):
+        skip_bytes(handle, start_offset)
+        raw_start = raw.tell()
+        total_bytes = max(os.path.getsize(file_path) - raw_start, 1)
+
+        names = read_csv_kwargs.get("names")
+        header = read_csv_kwargs.get("header", "infer")
+        checked = BadRowFilter(
+            handle,
+            expected_fields=len(names) if names is not None else None,
+            has_header=header == 0 or (header == "infer" and names is None),
+            sep=read_csv_kwargs.get("sep", ","),
+        )
+        # Rows the filter lets through are all well-formed; any it misreads are still skipped, not fatal
+        with pd.read_csv(io.BufferedReader(checked), iterator=True, on_bad_lines="skip",
+                         **read_csv_kwargs) as reader:
+            reported = 0
+            while True:
+                try:
+                    chunk = reader.get_chunk(rows_per_chunk)
+                except StopIteration:
+                    chunk = None
+                except pd.errors.ParserError as e:
+                    raise ValueError(f"Malformed CSV data after row {rows:,}: {e}") from e
+
+                # Report the skipped rows before the end of this chunk (all of them once the file ends)
+                at_end = chunk is None or len(chunk) < rows_per_chunk
+                read_rows = rows + (len(chunk) if chunk is not None else 0)
+                skipped = [line for line, before in checked.skipped[reported:] if at_end or before < read_rows]
+                reported += len(skipped)
+                if skipped and bad_rows_callback:
+                    bad_rows_callback(chunk_number, skipped)
+                if chunk is None:
+                    break
+
+                rows += len(chunk)
+                chunk_number += 1
+                yield chunk
+
+                # Shrink later chunks if the process has grown past the limit
+                rss = current_rss_bytes()
+                if rss is not None and rss > limit_bytes:
+                    rows_per_chunk = max(MIN_CHUNK_ROWS, rows_per_chunk // 2)
+
+                if progress_callback:
+                    elapsed = max(time.perf_counter() - started, 1e-9)
+                    fraction = min((raw.tell() - raw_start) / total_bytes, 1.0)
+                    progress_callback(rows, fraction, rows / elapsed)
@@ -0,0 +1,224 @@
+# regressly/econometric_data/collinearity.py
+
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from econometric_data.data_cache import cached
+
+# Auxiliary R² above 1 - ALIAS_TOLERANCE counts as an exact linear combination of the other columns
+ALIAS_TOLERANCE = 1e-10
+
+
+class CorrelationInverse:
+    """
+    Correlation matrix of a set of columns and the inverse of it, kept up to
+    date as columns are added and removed.
+
+    The VIF of a column is the matching diagonal entry of the inverse, so every
+    VIF comes from one inverse instead of one auxiliary regression per column.
+    Adding a column borders the inverse and removing one downdates it, both in
+    O(k^2); only the new column's correlations with the others touch the data.
+    Columns that are an exact linear combination of the others are "aliased":
+    they are kept out of the inverse and get an infinite VIF.
+
+    Correlations are pairwise complete, as in DataFrame.corr(): each pair of
+    columns is correlated over the rows where both have a value. A pair's
+    correlation so does not depend on the other columns, and columns with
+    missing values in different rows come and go without starting over.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def __sizeof__(self):
+        return self.corr.nbytes + self.inverse.nbytes + 64 * len(self.order)
+
+    def reset(self):
+        """Drop every column."""
+        self.order = []     # Every column, in the order added
+        self.active = []    # Columns in the inverse
+        self.aliased = []   # Constant or exactly collinear columns
+        self.moments = {}   # name -> (mean, norm of the centred column) over its observed rows
+        self.corr = np.empty((0, 0))
+        self.inverse = np.empty((0, 0))
+
+    def add(self, name, values, others):
+        """
+        Add a column. `others` maps the names of the columns already added
+        to their values on the same rows; missing values are NaN.
+        """
+        self.moments[name] = _moments(values)
+        existing = np.empty((len(values), len(self.order)))
+        for j, other in enumerate(self.order):
+            existing[:, j] = others[other] - self.moments[other][0]
+        correlations = _pairwise_correlations(values - self.moments[name][0], existing)
+
+        k = len(self.order)
+        corr = np.empty((k + 1, k + 1))
+        corr[:k, :k] = self.corr
+        corr[:k, k] = corr[k, :k] = correlations
+        corr[k, k] = 1.0 if self.moments[name][1] > 0 else np.nan
+        self.corr = corr
+        self.order.append(name)
+        self._activate(name)
+
+    def _activate(self, name):
+        """Border the inverse with a column, or mark it aliased if it is collinear with the active ones."""
+        j = self.order.index(name)
+        positions = [self.order.index(active) for active in self.active]
+        c = self.corr[positions, j]
+        if np.isnan(self.corr[j, j]) or np.isnan(c).any():
+            # Constant, or without a correlation with an active column (too few shared rows)
+            self.aliased.append(name)
+            return
+        b = self.inverse @ c
+        schur = 1.0 - c @ b  # 1 - auxiliary R² of the column on the active ones
+        if schur <= ALIAS_TOLERANCE:
+            self.aliased.append(name)
+            return
+
+        k = len(self.active)
+        inverse = np.empty((k + 1, k + 1))
+        inverse[:k, :k] = self.inverse + np.outer(b, b) / schur
+        inverse[:k, k] = inverse[k, :k] = -b / schur
+        inverse[k, k] = 1.0 / schur
+        self.inverse = inverse
+        self.active.append(name)
+
+    def remove(self, name):
+        """Remove a column, downdating the inverse and retrying the aliased columns."""
+        j = self.order.index(name)
+        keep = [i for i in range(len(self.order)) if i != j]
+        self.corr = self.corr[np.ix_(keep, keep)]
+        self.order.remove(name)
+        del self.moments[name]
+
+        if name in self.aliased:
+            self.aliased.remove(name)
+            return
+        a = self.active.index(name)
+        rest = [i for i in range(len(self.active)) if i != a]
+        column = self.inverse[rest, a]
+        self.inverse = self.inverse[np.ix_(rest, rest)] - np.outer(column, column) / self.inverse[a, a]
+        self.active.remove(name)
+
+        # A column aliased with the removed one may now be independent of the rest
+        retry, self.aliased = self.aliased, []
+        for aliased in retry:
+            self._activate(aliased)
+
+    def update(self, frame):
+        """
+        Make the tracked columns those of `frame`, numeric with missing
+        values as NaN. A column whose values changed is removed and added
+        again.
+        """
+        values = {name: frame[name].to_numpy(dtype=float) for name in frame.columns}
+
+        for name in list(self.order):
+            if name not in values:
+                self.remove(name)
+            elif not np.allclose(_moments(values[name]), self.moments[name]):
+                self.remove(name)
+        for name in frame.columns:
+            if name not in self.order:
+                self.add(name, values[name], values)
+
+    def correlation_matrix(self, names):
+        """Return the correlation matrix of `names` as a DataFrame."""
+        positions = [self.order.index(name) for name in names]
+        return pd.DataFrame(self.corr[np.ix_(positions, positions)], index=names, columns=names)
+
+    def vif_table(self, names):
+        """Return the VIF and auxiliary R² of every column in `names`."""
+        diagonal = dict(zip(self.active, np.diag(self.inverse)))
+        positions = [self.order.index(active) for active in self.active]
+        undefined = {
+            name for name in self.aliased
+            if np.isnan(self.corr[self.order.index(name), positions + [self.order.index(name)]]).any()
+        }
+        vif = np.array([
+            diagonal[name] if name in diagonal else (np.nan if name in undefined else np.inf)
+            for name in names
+        ])
+        with np.errstate(divide="ignore"):
+            auxiliary = 1 - 1 / vif
+        return pd.DataFrame({"Variable": names, "VIF": vif, "Auxiliary R-squared": auxiliary})
+
+
+def _moments(values):
+    """Return the mean and the norm of the centred values of a column's observed rows."""
+    observed = values[~np.isnan(values)]
+    if not observed.size:
+        return 0.0, 0.0
+    mean = observed.mean()
+    centred = observed - mean
+    return mean, np.sqrt(centred @ centred)
+
+
+def _pairwise_correlations(column, others):
+    """
+    Correlate a column with each column of `others` over the rows where both
+    have a value; NaN for pairs with under two such rows or no variation on
+    them. Columns should be roughly centred, so the sums below do not cancel.
+    """
+    observed = ~np.isnan(column)
+    others_observed = ~np.isnan(others)
+    column = np.where(observed, column, 0.0)
+    others = np.where(others_observed, others, 0.0)
+    both = (others_observed & observed[:, None]).astype(float)
+
+    count = both.sum(axis=0)
+    column_sum, others_sum = column @ both, others.T @ observed
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = column @ others - column_sum * others_sum / count
+        column_variance = (column * column) @ both - column_sum**2 / count
+        others_variance = (others * others).T @ observed - others_sum**2 / count
+        correlations = covariance / np.sqrt(column_variance * others_variance)
+    correlations[(count < 2) | ~(column_variance > 0) | ~(others_variance > 0)] = np.nan
+    return correlations
+
+
+# One tracker per dataset and row definition, shared by every session
+@cached(lambda data_key: data_key)
+def correlation_tracker(data_key):
+    return CorrelationInverse()
+
+
+@cached(lambda data_key, columns, load_frame: (data_key, columns))
+def collinearity_diagnostics(data_key, columns, load_frame):
+    """
+    Return (correlation matrix, VIF table) of a set of candidate regressors.
+
+    `data_key` identifies the dataset (file fingerprints and any row filter)
+    and `columns` the column set, hashable and describing every choice that
+    changes the values; `load_frame()` returns the numeric columns with
+    missing values as NaN, and each pair is compared on the rows where both
+    have a value. Results are cached per (data_key, columns), and a miss only
+    updates the tracker of `data_key` for the columns added or removed.
+    """
+    frame = load_frame()
+    tracker = correlation_tracker(data_key)
+    with tracker.lock:
+        tracker.update(frame)
+        names = list(frame.columns)
+        return tracker.correlation_matrix(names), tracker.vif_table(names)
+
+
+def display_collinearity_diagnostics(data_key, columns, load_frame):
+    """Show the correlation matrix and VIFs of the selected X variables."""
+    with st.expander("Collinearity diagnostics"):
+        try:
+            corr, vif = collinearity_diagnostics(data_key, columns, load_frame)
+        except (KeyError, ValueError, TypeError) as e:
+            st.error(f"Could not compute collinearity diagnostics: {e}")
+            return
+        if len(vif) < 2:
+            st.write("Select at least two numeric X variables to compare them.")
+            return
+        st.write("Variance inflation factors (above 10 usually signals harmful collinearity):")
+        st.dataframe(vif)
+        st.write("Correlation matrix:")
+        st.dataframe(corr.round(3))
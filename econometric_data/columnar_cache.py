@@ -0,0 +1,216 @@
+# regressly/econometric_data/columnar_cache.py
+
+import os
+import shutil
+import pandas as pd
+from econometric_data.chunked_io import iter_csv_chunks
+from econometric_data.compression import read_csv
+from econometric_data.dataset_catalog import find_entry
+from econometric_data.dtype_plan import apply_dtype_plan
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # The columnar cache is optional; readers fall back to CSV
+    pa = None
+    pq = None
+
+COLUMNAR_SUFFIX = ".parquet"
+PART_TEMPLATE   = "part-{:05d}.parquet"
+
+# Catalog dtype -> (pandas dtype used while parsing, Arrow type written to disk)
+_COLUMN_TYPES = {
+    "int64": ("int64", "int64"),
+    "float64": ("float64", "float64"),
+    "bool": ("bool", "bool_"),
+    "object": ("object", "string"),
+}
+
+# Planned storage dtype -> Arrow type written to disk
+_PLANNED_TYPES = {
+    "int8": "int8",
+    "int16": "int16",
+    "int32": "int32",
+    "int64": "int64",
+    "float32": "float32",
+    "float64": "float64",
+    "bool": "bool_",
+    "object": "string",
+}
+
+
+def columnar_path(file_path):
+    """Return the path of the columnar copy (a directory of parts) stored next to an uploaded file."""
+    return file_path + COLUMNAR_SUFFIX
+
+
+def has_columnar_copy(file_path):
+    """Check that a columnar copy exists and is at least as new as the source file."""
+    cache_path = columnar_path(file_path)
+    return (
+        pq is not None
+        and os.path.exists(cache_path)
+        and os.path.getmtime(cache_path) >= os.path.getmtime(file_path)
+    )
+
+
+def _arrow_type(planned_dtype):
+    """Return the Arrow type a column is stored as under its planned dtype."""
+    if planned_dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    return getattr(pa, _PLANNED_TYPES[planned_dtype])()
+
+
+def _column_plan(catalog_entry):
+    """
+    Work out the parse dtype and Arrow type of every column from the catalog.
+
+    Columns are stored with the entry's dtype plan when it has one, so the copy
+    holds narrowed numbers and dictionary-encoded text.
+    """
+    dtype_plan = catalog_entry.get("dtype_plan", {})
+    parse_dtypes, date_columns, fields = {}, [], []
+    for column in catalog_entry["headers"]:
+        info = catalog_entry["columns"][column]
+        if "date" in info:
+            date_columns.append(column)
+            fields.append(pa.field(column, pa.timestamp("ns")))
+            continue
+
+        dtype = info["dtype"]
+        if info["null_count"] and dtype in ("int64", "bool"):
+            # Missing values cannot be stored in numpy integer/bool columns
+            dtype = "float64" if dtype == "int64" else "object"
+        pandas_dtype, arrow_type = _COLUMN_TYPES.get(dtype, _COLUMN_TYPES["object"])
+        parse_dtypes[column] = pandas_dtype
+        planned_dtype = dtype_plan.get(column)
+        if planned_dtype in _PLANNED_TYPES or planned_dtype == "category":
+            fields.append(pa.field(column, _arrow_type(planned_dtype)))
+        else:
+            fields.append(pa.field(column, getattr(pa, arrow_type)()))
+    return parse_dtypes, date_columns, pa.schema(fields)
+
+
+def _write_part(part_path, file_path, plan, **chunk_kwargs):
+    """Stream CSV rows into a single Parquet part file."""
+    parse_dtypes, date_columns, schema = plan
+    tmp_path = os.path.join(os.path.dirname(part_path), "." + os.path.basename(part_path) + ".tmp")
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for chunk in iter_csv_chunks(file_path, dtype=parse_dtypes, **chunk_kwargs):
+            for column in date_columns:
+                chunk[column] = pd.to_datetime(chunk[column], errors="coerce").astype("datetime64[ns]")
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer.write_table(table.cast(schema))
+    os.replace(tmp_path, part_path)
+
+
+def _remove_path(path):
+    """Delete a file or directory if it exists."""
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _swap_directory(tmp_dir, cache_path):
+    """Move a freshly written copy into place, replacing any previous one."""
+    old_path = cache_path + ".old"
+    _remove_path(old_path)
+    if os.path.exists(cache_path):
+        os.replace(cache_path, old_path)
+    os.replace(tmp_dir, cache_path)
+    _remove_path(old_path)
+
+
+def _link_parts(source_dir, target_dir):
+    """Hard-link (or copy) the Parquet parts of one copy into another directory."""
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith(".parquet") or name.startswith("."):
+            continue
+        try:
+            os.link(os.path.join(source_dir, name), os.path.join(target_dir, name))
+        except OSError:
+            shutil.copy2(os.path.join(source_dir, name), os.path.join(target_dir, name))
+
+
+def _next_part_path(cache_dir):
+    """Return the path of the next part file in a copy directory."""
+    parts = [name for name in os.listdir(cache_dir) if name.startswith("part-") and name.endswith(".parquet")]
+    return os.path.join(cache_dir, PART_TEMPLATE.format(len(parts)))
+
+
+def write_columnar_copy(file_path, catalog_entry, chunksize=None, memory_limit_mb=None, progress_callback=None,
+                        append_to=None, chunk_budget_mb=None):
+    """
+    Write a typed Parquet copy of an uploaded CSV using the catalog's column types.
+
+    The copy is a directory of Parquet part files. The CSV is streamed chunk by
+    chunk into row groups, within the same memory limit as profiling.
+
+    `append_to=(base_file, base_entry)` names an earlier upload whose bytes are a
+    prefix of this file. If its column types are unchanged, its parts are reused
+    and only the rows after the prefix are written as a new part; otherwise the
+    whole file is rewritten. Returns the path of the copy, or None when pyarrow is
+    not installed.
+    """
+    if pq is None:
+        return None
+
+    plan = _column_plan(catalog_entry)
+    cache_path = columnar_path(file_path)
+    chunk_kwargs = {
+        "chunksize": chunksize,
+        "memory_limit_mb": memory_limit_mb,
+        "progress_callback": progress_callback,
+        "chunk_budget_mb": chunk_budget_mb,
+    }
+
+    if append_to is not None:
+        base_file, base_entry = append_to
+        base_cache = columnar_path(base_file)
+        if os.path.isdir(base_cache) and _column_plan(base_entry)[2].equals(plan[2]):
+            tail_kwargs = dict(chunk_kwargs, start_offset=base_entry["size"], header=None,
+                               names=catalog_entry["headers"])
+            if base_cache == cache_path:
+                _write_part(_next_part_path(cache_path), file_path, plan, **tail_kwargs)
+                os.utime(cache_path)
+            else:
+                tmp_dir = cache_path + ".tmp"
+                _remove_path(tmp_dir)
+                os.makedirs(tmp_dir)
+                _link_parts(base_cache, tmp_dir)
+                _write_part(_next_part_path(tmp_dir), file_path, plan, **tail_kwargs)
+                _swap_directory(tmp_dir, cache_path)
+            return cache_path
+
+    tmp_dir = cache_path + ".tmp"
+    _remove_path(tmp_dir)
+    os.makedirs(tmp_dir)
+    _write_part(os.path.join(tmp_dir, PART_TEMPLATE.format(0)), file_path, plan, **chunk_kwargs)
+    _swap_directory(tmp_dir, cache_path)
+    return cache_path
+
+
+def read_columns(file_path, columns, parse_dates=None):
+    """
+    Read only the requested columns of an uploaded dataset.
+
+    Uses the columnar copy when it is available and falls back to a column-projected
+    CSV read otherwise. Columns come back in the order requested, stored with the
+    dtypes planned for the dataset at ingest.
+    """
+    columns = list(dict.fromkeys(columns))
+    parse_dates = [column for column in (parse_dates or []) if column in columns]
+
+    if has_columnar_copy(file_path):
+        df = pd.read_parquet(columnar_path(file_path), columns=columns)
+    else:
+        df = read_csv(file_path, usecols=columns, on_bad_lines="skip")  # As skipped at ingest
+
+    entry = find_entry(file_path)
+    if entry and entry.get("dtype_plan"):
+        df = apply_dtype_plan(df, entry["dtype_plan"])
+    for column in parse_dates:
+        if not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    return df[columns]
@@ -0,0 +1,95 @@
+# regressly/econometric_data/compression.py
+
+import os
+import gzip
+import zipfile
+from contextlib import contextmanager, ExitStack
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:  # Only needed for .zst uploads
+    zstandard = None
+
+# File extensions accepted by the uploader
+UPLOAD_TYPES = ["csv", "gz", "zip", "zst"]
+
+# Compressed file extension -> compression name
+COMPRESSIONS = {".gz": "gzip", ".zip": "zip", ".zst": "zstd"}
+
+READ_BLOCK_BYTES = 1024 * 1024
+
+
+def compression_of(file_path):
+    """Return the compression of a file from its extension, or None for plain files."""
+    return COMPRESSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def _zip_member(archive):
+    """Pick the single data file inside a ZIP archive."""
+    members = [
+        info.filename for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+    ]
+    csv_members = [name for name in members if name.lower().endswith(".csv")]
+    if len(members) == 1:
+        return members[0]
+    if len(csv_members) == 1:
+        return csv_members[0]
+    raise ValueError(f"ZIP archive must contain exactly one CSV file; found {len(csv_members)}.")
+
+
+@contextmanager
+def open_decompressed(file_path, compression="infer"):
+    """
+    Open a plain or compressed CSV as a stream of uncompressed bytes.
+
+    Decompression happens while reading, so no plaintext copy is written to disk.
+    The compression is inferred from the file extension unless given. Yields
+    (stream, raw), where raw is the underlying file handle; raw.tell() gives
+    progress through the file as stored on disk.
+    """
+    if compression == "infer":
+        compression = compression_of(file_path)
+    with ExitStack() as stack:
+        raw = stack.enter_context(open(file_path, 'rb'))
+        if compression is None:
+            stream = raw
+        elif compression == "gzip":
+            stream = stack.enter_context(gzip.GzipFile(fileobj=raw, mode='rb'))
+        elif compression == "zip":
+            archive = stack.enter_context(zipfile.ZipFile(raw))
+            stream = stack.enter_context(archive.open(_zip_member(archive)))
+        else:
+            if zstandard is None:
+                raise ValueError("Reading .zst files requires the zstandard package.")
+            decompressor = zstandard.ZstdDecompressor()
+            stream = stack.enter_context(
+                decompressor.stream_reader(raw, closefd=False, read_across_frames=True)
+            )
+        yield stream, raw
+
+
+def iter_decompressed_blocks(file_path, block_bytes=READ_BLOCK_BYTES, compression="infer"):
+    """Yield the uncompressed content of a file in blocks."""
+    with open_decompressed(file_path, compression) as (stream, _):
+        while True:
+            block = stream.read(block_bytes)
+            if not block:
+                break
+            yield block
+
+
+def skip_bytes(stream, count, block_bytes=READ_BLOCK_BYTES):
+    """Advance a (possibly non-seekable) stream by `count` bytes."""
+    while count > 0:
+        block = stream.read(min(block_bytes, count))
+        if not block:
+            break
+        count -= len(block)
+
+
+def read_csv(file_path, **read_csv_kwargs):
+    """pd.read_csv for plain or compressed files, decompressing as it reads."""
+    with open_decompressed(file_path) as (stream, _):
+        return pd.read_csv(stream, **read_csv_kwargs)
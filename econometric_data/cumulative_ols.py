@@ -0,0 +1,224 @@
+# regressly/econometric_data/cumulative_ols.py
+
+import math
+import numpy as np
+import pandas as pd
+from scipy import stats
+from econometric_data.ols_engine import (
+    OLSResult,
+    constant_columns,
+    minimum_norm_projection,
+    normal_equations_rank,
+)
+
+# Most prefix entries kept per design; longer designs keep one entry per block of rows
+PREFIX_MAX_ENTRIES = 4096
+
+
+class CumulativeOLS:
+    """
+    Date-ordered prefix sums of X'X, X'y, y'y and sum(y) for one regression design.
+
+    Built once per design in O(n k^2); the cross products of any contiguous date
+    window are then a difference of two prefix entries, so an OLS fit over any
+    [start_date, end_date] costs O(k^3) regardless of the number of rows. Long
+    designs keep prefix sums per block of rows (at most PREFIX_MAX_ENTRIES of
+    them), adding the partial blocks at the window edges row by row. Columns
+    are centred on their full-sample means before accumulating (when the design
+    has a constant) to limit cancellation when differencing large sums; estimates
+    are mapped back to the original columns.
+    """
+
+    def __init__(self, y, x):
+        order = np.argsort(x.index.values, kind="stable")
+        self.y = y.iloc[order]
+        self.x = x.iloc[order]
+        self.dates = self.x.index
+        self.names = list(x.columns)
+
+        x_values = self.x.to_numpy(dtype=float)
+        y_values = self.y.to_numpy(dtype=float)
+        constants = constant_columns(x_values)
+        self.has_constant = bool(constants)
+
+        # Shift non-constant columns (and y) by their means: X_c = X T, y_c = y - m_y * const
+        self.x_shift = np.zeros(len(self.names))
+        self.y_shift = 0.0
+        self.constant = constants[0] if constants else None
+        if self.constant is not None:
+            scale = x_values[0, self.constant]
+            self.x_shift = x_values.mean(axis=0) / scale
+            self.x_shift[constants] = 0.0
+            self.y_shift = y_values.mean() / scale
+            x_values = x_values - np.outer(x_values[:, self.constant], self.x_shift)
+            y_values = y_values - x_values[:, self.constant] * self.y_shift
+
+        self.x_centred = x_values
+        self.y_centred = y_values
+
+        # Entry i holds the sums over the first i blocks of `block` rows
+        k = len(self.names)
+        self.block = max(1, math.ceil(len(x_values) / PREFIX_MAX_ENTRIES))
+        blocks = len(x_values) // self.block
+        x_blocks = x_values[:blocks * self.block].reshape(blocks, self.block, k)
+        y_blocks = y_values[:blocks * self.block].reshape(blocks, self.block)
+        self.xtx = np.concatenate([np.zeros((1, k, k)), np.cumsum(np.einsum("bri,brj->bij", x_blocks, x_blocks), axis=0)])
+        self.xty = np.concatenate([np.zeros((1, k)), np.cumsum(np.einsum("bri,br->bi", x_blocks, y_blocks), axis=0)])
+        self.yty = np.concatenate([[0.0], np.cumsum(np.einsum("br,br->b", y_blocks, y_blocks))])
+        self.y_sum = np.concatenate([[0.0], np.cumsum(y_blocks.sum(axis=1))])
+
+    def __sizeof__(self):
+        arrays = (self.xtx, self.xty, self.yty, self.y_sum, self.x_centred, self.y_centred)
+        return sum(array.nbytes for array in arrays) + int(self.x.memory_usage(deep=True).sum()) \
+            + int(self.y.memory_usage(deep=True))
+
+    def window(self, start_date=None, end_date=None):
+        """Return the [lo, hi) row positions of the dates within [start_date, end_date]."""
+        lo = 0 if start_date is None else int(self.dates.searchsorted(pd.Timestamp(start_date), side="left"))
+        hi = len(self.dates) if end_date is None else int(self.dates.searchsorted(pd.Timestamp(end_date), side="right"))
+        return lo, max(lo, hi)
+
+    def row_stats(self, lo, hi):
+        """Return the centred (X'X, X'y, y'y, sum y) of rows [lo, hi), summed directly."""
+        x_values = self.x_centred[lo:hi]
+        y_values = self.y_centred[lo:hi]
+        return x_values.T @ x_values, x_values.T @ y_values, y_values @ y_values, y_values.sum()
+
+    def window_stats(self, lo, hi):
+        """Return the centred (X'X, X'y, y'y, sum y, n) of rows [lo, hi)."""
+        first = -(-lo // self.block)  # First whole block in the window
+        last = hi // self.block
+        if first >= last:
+            return (*self.row_stats(lo, hi), hi - lo)
+
+        sums = [
+            self.xtx[last] - self.xtx[first],
+            self.xty[last] - self.xty[first],
+            self.yty[last] - self.yty[first],
+            self.y_sum[last] - self.y_sum[first],
+        ]
+        for edge_lo, edge_hi in ((lo, first * self.block), (last * self.block, hi)):
+            if edge_hi > edge_lo:
+                sums = [total + edge for total, edge in zip(sums, self.row_stats(edge_lo, edge_hi))]
+        return (*sums, hi - lo)
+
+    def prefix_run(self, lo, hi):
+        """Return the centred prefix sums (X'X, X'y, y'y) over the first i rows, for every i in [lo, hi]."""
+        xtx, xty, yty, _, _ = self.window_stats(0, lo)
+        x_values = self.x_centred[lo:hi]
+        y_values = self.y_centred[lo:hi]
+        return (
+            np.concatenate([xtx[None], xtx + np.cumsum(np.einsum("ri,rj->rij", x_values, x_values), axis=0)]),
+            np.concatenate([xty[None], xty + np.cumsum(x_values * y_values[:, None], axis=0)]),
+            np.concatenate([[yty], yty + np.cumsum(y_values * y_values)]),
+        )
+
+    def transform(self):
+        """Return T with X_centred = X T, so original coefficients are T b_centred (+ y shift)."""
+        transform = np.eye(len(self.names))
+        if self.constant is not None:
+            transform[self.constant, :] -= self.x_shift
+        return transform
+
+    def fit_rows(self, lo, hi):
+        """Fit OLS on rows [lo, hi) of the design."""
+        xtx, xty, yty, y_sum, nobs = self.window_stats(lo, hi)
+        x_slice = slice(lo, hi)
+        result = OLSResult(
+            self.names, xtx, xty, yty, y_sum, nobs,
+            has_constant=self.has_constant,
+            data=lambda: (self.y.iloc[x_slice], self.x.iloc[x_slice]),
+        )
+        if self.constant is not None:
+            self._uncentre(result, xtx)
+        return result
+
+    def fit(self, start_date=None, end_date=None):
+        """Fit OLS over the rows dated within [start_date, end_date]."""
+        return self.fit_rows(*self.window(start_date, end_date))
+
+    def _uncentre(self, result, xtx):
+        """Map estimates of the centred design (with cross products `xtx`) back to the original columns."""
+        transform = self.transform()
+        params = transform @ result.params.to_numpy()
+        params[self.constant] += self.y_shift
+        cov = transform @ result.cov_params_matrix @ transform.T
+        if result.rank < len(self.names):
+            projection = minimum_norm_projection(xtx, transform, result.rank)
+            params, cov = projection @ params, projection @ cov @ projection
+        result.set_estimates(params, cov)
+
+    def rolling_fits(self, window=None, min_nobs=None, alpha=0.05):
+        """
+        Fit OLS over every rolling window of `window` rows, or an expanding
+        window when `window` is None, ending at each date of the design.
+        Windows with fewer than `min_nobs` rows are skipped.
+
+        Each window's cross products are the difference of two prefix sums
+        (the rows entering minus the rows leaving). Windows are solved together
+        in batches of PREFIX_MAX_ENTRIES, so memory stays O(PREFIX_MAX_ENTRIES
+        k^2) however long the design. Returns a long DataFrame with one row per
+        (window end date, variable): date, variable, coefficient, std_error,
+        lower, upper, nobs.
+        """
+        k = len(self.names)
+        # Rolling windows start once full; expanding ones once there are more rows than columns
+        min_nobs = max(min_nobs or window or 0, k + 1)
+        hi = np.arange(1, len(self.dates) + 1)
+        lo = np.zeros_like(hi) if window is None else np.maximum(hi - window, 0)
+        keep = hi - lo >= min_nobs
+        hi, lo = hi[keep], lo[keep]
+        columns = ["date", "variable", "coefficient", "std_error", "lower", "upper", "nobs"]
+        if not len(hi):
+            return pd.DataFrame(columns=columns)
+
+        # Solve PREFIX_MAX_ENTRIES windows at a time; the window ends (and starts) of a
+        # batch are consecutive rows, so one short run of prefix sums covers each
+        transform = self.transform()
+        params, bse, margin = [], [], []
+        for first in range(0, len(hi), PREFIX_MAX_ENTRIES):
+            batch_hi, batch_lo = hi[first:first + PREFIX_MAX_ENTRIES], lo[first:first + PREFIX_MAX_ENTRIES]
+            hi_sums = self.prefix_run(batch_hi[0], batch_hi[-1])
+            lo_sums = self.prefix_run(batch_lo[0], batch_lo[-1])
+            xtx, xty, yty = (
+                at_hi[batch_hi - batch_hi[0]] - at_lo[batch_lo - batch_lo[0]]
+                for at_hi, at_lo in zip(hi_sums, lo_sums)
+            )
+
+            # Pseudo-inverse, as for single fits, so collinear windows still get estimates
+            xtx_inv = np.linalg.pinv(xtx, hermitian=True)
+            batch_params = np.einsum("wij,wj->wi", xtx_inv, xty)
+            ssr = yty - 2 * np.einsum("wi,wi->w", batch_params, xty) \
+                + np.einsum("wi,wij,wj->w", batch_params, xtx, batch_params)
+            rank = normal_equations_rank(xtx)
+            df_resid = (batch_hi - batch_lo) - rank
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scale = np.where(df_resid > 0, np.clip(ssr, 0, None) / df_resid, np.nan)
+
+            # Map back to the original columns: b = T b_c (+ y shift), cov = T cov_c T'
+            batch_params = batch_params @ transform.T
+            if self.constant is not None:
+                batch_params[:, self.constant] += self.y_shift
+            variance = np.einsum("ij,wjl,il->wi", transform, xtx_inv, transform) * scale[:, None]
+            # Collinear windows take the minimum-norm solution of the original columns, as statsmodels does
+            for w in np.flatnonzero(rank < k):
+                projection = minimum_norm_projection(xtx[w], transform, rank[w])
+                batch_params[w] = projection @ batch_params[w]
+                cov = projection @ transform @ xtx_inv[w] @ transform.T @ projection
+                variance[w] = np.diag(cov) * scale[w]
+            params.append(batch_params)
+            bse.append(np.sqrt(np.clip(variance, 0, None)))
+            margin.append(stats.t.ppf(1 - alpha / 2, np.maximum(df_resid, 1))[:, None] * bse[-1])
+
+        params, bse, margin = np.concatenate(params), np.concatenate(bse), np.concatenate(margin)
+        nobs = hi - lo
+
+        return pd.DataFrame({
+            "date": np.repeat(self.dates[hi - 1], k),
+            "variable": np.tile(self.names, len(hi)),
+            "coefficient": params.ravel(),
+            "std_error": bse.ravel(),
+            "lower": (params - margin).ravel(),
+            "upper": (params + margin).ravel(),
+            "nobs": np.repeat(nobs, k),
+        })
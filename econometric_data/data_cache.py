@@ -0,0 +1,193 @@
+# regressly/econometric_data/data_cache.py
+
+import os
+import sys
+import copy
+import json
+import functools
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from econometric_data.dataset_catalog import CATALOG_FILE, load_catalog
+from econometric_data.session_state import SELECTED_VARIABLES, get_state
+
+# Memory budget of the shared cache; least recently used entries are evicted beyond it
+CACHE_MEMORY_MB = int(os.environ.get("REGRESSLY_CACHE_MEMORY_MB", 256))
+
+
+def file_fingerprint(file_path):
+    """Return (absolute path, size, mtime) identifying the current contents of a file or directory."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return os.path.abspath(file_path), None, None
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+
+@functools.lru_cache(maxsize=1)
+def _dtype_plans(catalog_fingerprint):
+    """Return {absolute path: dtype plan as JSON} of the catalog with this fingerprint."""
+    return {
+        os.path.abspath(entry["path"]): json.dumps(entry.get("dtype_plan"), sort_keys=True)
+        for entry in load_catalog(catalog_fingerprint[0]).values() if entry.get("path")
+    }
+
+
+def dataset_fingerprint(file_path):
+    """
+    Return the file_fingerprint() of an uploaded dataset together with the dtype
+    plan its catalog entry gives it, which columnar_cache.read_columns applies:
+    either changing changes what a read returns.
+    """
+    plans = _dtype_plans(file_fingerprint(CATALOG_FILE))
+    return file_fingerprint(file_path), plans.get(os.path.abspath(file_path))
+
+
+def estimate_bytes(value):
+    """Estimate the memory held by a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _copy_value(value):
+    """
+    Copy a cached value so callers can modify what they get back. Frames are
+    copied deeply, as in-place edits of a shallow copy reach the cached one;
+    arrays come back as read-only views.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=True)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, tuple):
+        return tuple(_copy_value(item) for item in value)
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by the estimated memory of its values.
+    """
+
+    def __init__(self, memory_limit_mb=CACHE_MEMORY_MB):
+        self.limit_bytes = memory_limit_mb * 1024 ** 2
+        self.entries = OrderedDict()  # key -> (value, bytes)
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return (True, value) on a hit and (False, None) on a miss."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key][0]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries to stay within the budget."""
+        size = estimate_bytes(value)
+        if size > self.limit_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.used_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.used_bytes += size
+            while self.used_bytes > self.limit_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.used_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.used_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+# Shared by every session of the app process
+DATA_CACHE = LRUCache()
+
+
+def cached(key_function):
+    """
+    Memoise a function in the shared cache.
+
+    `key_function` receives the function's arguments and must return a hashable
+    key that changes whenever the result would, typically built from
+    file_fingerprint() of every file the function reads. Exceptions are not cached.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (function.__module__, function.__qualname__, key_function(*args, **kwargs))
+            found, value = DATA_CACHE.get(key)
+            if not found:
+                value = function(*args, **kwargs)
+                DATA_CACHE.put(key, value)
+            return _copy_value(value)
+        return wrapper
+    return decorator
+
+
+def _without_keys(value, ignore):
+    """Return a copy of nested dicts and lists without the dictionary keys in `ignore`."""
+    if isinstance(value, dict):
+        return {key: _without_keys(item, ignore) for key, item in value.items() if key not in ignore}
+    if isinstance(value, list):
+        return [_without_keys(item, ignore) for item in value]
+    return value
+
+
+def selection_key(ignore=()):
+    """
+    Cache key of a loader driven by this session's Step 3 selections.
+
+    Combines the selections themselves with the dataset_fingerprint() and selected
+    columns of every dataset they reference, so sessions with the same selections share
+    cached data. Selection entries named in `ignore` (at any depth) are left out,
+    for loaders that do not depend on them.
+    """
+    selected_data = _without_keys(get_state(SELECTED_VARIABLES) or {}, ignore)
+    columns_by_file = {}
+    for variable in [selected_data.get("y", {})] + selected_data.get("additional_y", []) + selected_data.get("x", []):
+        if "file_path" not in variable:
+            continue
+        columns = columns_by_file.setdefault(variable["file_path"], [])
+        columns += [variable[key] for key in ("date_column", "variable") if variable.get(key)]
+    datasets = tuple(
+        (dataset_fingerprint(file_path), tuple(columns)) for file_path, columns in sorted(columns_by_file.items())
+    )
+    return json.dumps(selected_data, sort_keys=True, default=str), datasets
+
+
+def display_cache_stats():
+    """Show the cache hit/miss counters and memory use in the sidebar."""
+    st.sidebar.write("### Data Cache")
+    st.sidebar.caption(
+        f"{DATA_CACHE.hits:,} hits · {DATA_CACHE.misses:,} misses · {len(DATA_CACHE.entries):,} entries · "
+        f"{DATA_CACHE.used_bytes / 1024 ** 2:,.1f} / {DATA_CACHE.limit_bytes / 1024 ** 2:,.0f} MB"
+    )
+    if st.sidebar.button("Clear Data Cache"):
+        DATA_CACHE.clear()
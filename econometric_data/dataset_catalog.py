@@ -0,0 +1,482 @@
+# regressly/econometric_data/dataset_catalog.py
+
+import os
+import json
+import time
+import warnings
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from econometric_data.chunked_io import iter_csv_chunks, validate_header
+from econometric_data.compression import read_csv
+from econometric_data.dtype_plan import plan_dtypes
+
+try:
+    import fcntl
+except ImportError:  # Windows locks a byte of the lock file instead
+    fcntl = None
+    import msvcrt
+
+# Set up paths
+CURRENT_DIR  = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_DIR   = os.path.join(CURRENT_DIR, "uploaded_files")
+CATALOG_FILE = os.path.join(UPLOAD_DIR, "ingested_files.json")
+
+# Profiling settings
+SKETCH_SIZE      = 256      # Hashes kept per column for the distinct-count estimate
+FREQUENCY_SAMPLE = 500      # Unique dates kept per column for frequency inference
+PROFILE_SUFFIX   = ".profile.json"  # Saved accumulator state, used to profile appended rows
+REPORTED_LINES   = 10       # Line numbers of skipped malformed rows kept in the catalog entry
+NUMERIC_SAMPLE   = 100      # Values of a text chunk parsed first, to tell bad numbers from text
+
+# Catalog writers hold an OS lock on a lock file, which is released if the writer dies
+LOCK_SUFFIX       = ".lock"
+LOCK_POLL_SECONDS = 0.05  # Windows only: flock waits without polling
+
+# Median spacing (in days) of each frequency offered in Step 2
+FREQUENCY_STEPS = {
+    "Daily": (0.5, 1.5),
+    "Weekly": (6, 8),
+    "Monthly": (27, 32),
+    "Quarterly": (88, 93),
+    "Annually": (364, 367),
+}
+
+
+class ColumnProfile:
+    """
+    Streaming accumulator for the statistics of a single column.
+    """
+
+    def __init__(self):
+        self.kind = None          # "bool", "integer", "float" or "text"
+        self.null_count = 0
+        self.memory_bytes = 0     # In-memory size with pandas' default parse dtypes
+        self.float32_exact = True # Every numeric value so far survives a float32 round trip
+        self.unparsed_count = 0   # Values that are not numbers in chunks where most values are
+        self.min = None
+        self.max = None
+        self.sketch = np.array([], dtype=np.uint64)
+        self.is_date = None       # None until a text chunk has been checked
+        self.min_date = None
+        self.max_date = None
+        self.date_sample = pd.DatetimeIndex([])
+
+    def update(self, series):
+        """Fold one chunk of the column into the profile."""
+        self.null_count += int(series.isna().sum())
+        self.memory_bytes += int(series.memory_usage(deep=True, index=False))
+        values = series.dropna()
+        self.kind = _merge_kinds(self.kind, _series_kind(series))
+        if values.empty:
+            return
+
+        # Keep the smallest hashes seen so far (K-minimum-values sketch)
+        hashes = _sketch_hashes(values)
+        if len(self.sketch) == SKETCH_SIZE:
+            hashes = hashes[hashes < self.sketch[-1]]  # Only smaller hashes can enter a full sketch
+        merged = pd.unique(np.concatenate([self.sketch, hashes]))
+        if len(merged) > SKETCH_SIZE:
+            merged = np.partition(merged, SKETCH_SIZE - 1)[:SKETCH_SIZE]
+        self.sketch = np.sort(merged)
+
+        if self.kind in ("integer", "float"):
+            if self.float32_exact:
+                as_float = values.to_numpy(dtype=np.float64)
+                self.float32_exact = bool(np.array_equal(as_float.astype(np.float32), as_float))
+            chunk_min, chunk_max = values.min(), values.max()
+            self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+            self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+        elif self.kind == "text":
+            self._count_unparsed(values)
+            if self.is_date is not False:
+                self._update_dates(values)
+
+    def _count_unparsed(self, values):
+        """Count the values that fail to parse in a chunk of mostly numbers (e.g. "12.5x" or "n.a.")."""
+        if pd.api.types.is_numeric_dtype(values):
+            return
+        # Text columns proper fail on most of a small sample, and are not parsed in full
+        sample = values[:NUMERIC_SAMPLE]
+        if pd.to_numeric(sample, errors="coerce").isna().sum() * 2 >= len(sample):
+            return
+        failed = int(pd.to_numeric(values, errors="coerce").isna().sum())
+        if failed * 2 < len(values):
+            self.unparsed_count += failed
+
+    def _update_dates(self, values):
+        """Track parsed date statistics while every value still parses as a date."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # Format inference fallback
+            dates = pd.to_datetime(values.astype(str), errors="coerce")
+        if dates.isna().any():
+            self.is_date = False
+            return
+        self.is_date = True
+        chunk_min, chunk_max = dates.min(), dates.max()
+        self.min_date = chunk_min if self.min_date is None else min(self.min_date, chunk_min)
+        self.max_date = chunk_max if self.max_date is None else max(self.max_date, chunk_max)
+        if len(self.date_sample) < FREQUENCY_SAMPLE:
+            sample = self.date_sample.append(pd.DatetimeIndex(dates)).unique().sort_values()
+            self.date_sample = sample[:FREQUENCY_SAMPLE]
+
+    def get_state(self):
+        """Return the accumulator state as JSON-serialisable values."""
+        return {
+            "kind": self.kind,
+            "null_count": self.null_count,
+            "memory_bytes": self.memory_bytes,
+            "float32_exact": self.float32_exact,
+            "unparsed_count": self.unparsed_count,
+            "min": _to_json_scalar(self.min),
+            "max": _to_json_scalar(self.max),
+            "sketch": self.sketch.tolist(),
+            "is_date": self.is_date,
+            "min_date": None if self.min_date is None else self.min_date.isoformat(),
+            "max_date": None if self.max_date is None else self.max_date.isoformat(),
+            "date_sample": [date.isoformat() for date in self.date_sample],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an accumulator from get_state() output."""
+        profile = cls()
+        profile.kind = state["kind"]
+        profile.null_count = state["null_count"]
+        profile.memory_bytes = state.get("memory_bytes", 0)
+        profile.float32_exact = state.get("float32_exact", False)
+        profile.unparsed_count = state.get("unparsed_count", 0)
+        profile.min = state["min"]
+        profile.max = state["max"]
+        profile.sketch = np.array(state["sketch"], dtype=np.uint64)
+        profile.is_date = state["is_date"]
+        profile.min_date = None if state["min_date"] is None else pd.Timestamp(state["min_date"])
+        profile.max_date = None if state["max_date"] is None else pd.Timestamp(state["max_date"])
+        profile.date_sample = pd.DatetimeIndex(pd.to_datetime(state["date_sample"]))
+        return profile
+
+    def distinct_estimate(self):
+        """Estimate the number of distinct non-null values from the sketch."""
+        if len(self.sketch) < SKETCH_SIZE:
+            return int(len(self.sketch))
+        kth_fraction = float(self.sketch[SKETCH_SIZE - 1]) / 2.0 ** 64
+        return int(round((SKETCH_SIZE - 1) / kth_fraction))
+
+    def to_dict(self):
+        """Return the JSON-serialisable catalog entry for the column."""
+        entry = {
+            "dtype": _KIND_DTYPES.get(self.kind, "object"),
+            "null_count": self.null_count,
+            "min": _to_json_scalar(self.min),
+            "max": _to_json_scalar(self.max),
+            "distinct_estimate": self.distinct_estimate(),
+            "memory_bytes": self.memory_bytes,
+        }
+        if self.kind in ("integer", "float"):
+            entry["float32_exact"] = self.float32_exact
+        if self.unparsed_count:
+            entry["unparsed_count"] = self.unparsed_count
+        if self.kind == "text" and self.is_date:
+            label, alias = infer_frequency(self.date_sample)
+            entry["dtype"] = "datetime64[ns]"
+            entry["date"] = {
+                "min": self.min_date.isoformat(),
+                "max": self.max_date.isoformat(),
+                "frequency": label,
+                "freq_alias": alias,
+            }
+        return entry
+
+
+_KIND_DTYPES = {"bool": "bool", "integer": "int64", "float": "float64", "text": "object"}
+_KIND_ORDER = ["bool", "integer", "float", "text"]
+
+
+def _series_kind(series):
+    """Classify the parsed dtype of a chunk."""
+    if series.isna().all():
+        return None
+    if pd.api.types.is_bool_dtype(series):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    return "text"
+
+
+def _sketch_hashes(values):
+    """
+    Return the 64-bit hashes of a chunk's non-null values for the distinct-count
+    sketch. Numbers are hashed as float64, so 3 in a chunk parsed as integers,
+    3.0 in one parsed as floats and "3" in a mostly numeric chunk read as text
+    are one value.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.util.hash_pandas_object(values.astype(np.float64), index=False).to_numpy()
+
+    # Text columns proper fail on most of a small sample, and are hashed as text
+    sample = values[:NUMERIC_SAMPLE]
+    if pd.to_numeric(sample, errors="coerce").isna().sum() * 2 >= len(sample):
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    numbers = pd.to_numeric(values, errors="coerce")
+    parsed = numbers.notna()
+    return np.concatenate([
+        pd.util.hash_pandas_object(numbers[parsed].astype(np.float64), index=False).to_numpy(),
+        pd.util.hash_pandas_object(values[~parsed].astype(str), index=False).to_numpy(),
+    ])
+
+
+def _merge_kinds(current, new):
+    """Widen the column kind when chunks disagree (e.g. int then float)."""
+    if current is None or new is None:
+        return current or new
+    if "text" in (current, new) or "bool" in (current, new):
+        return current if current == new else "text"
+    return _KIND_ORDER[max(_KIND_ORDER.index(current), _KIND_ORDER.index(new))]
+
+
+def _to_json_scalar(value):
+    """Convert numpy scalars to plain Python values for JSON."""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def infer_frequency(dates):
+    """
+    Infer the sampling frequency of a set of dates.
+
+    Returns the Step 2 frequency label (e.g. "Monthly") and the pandas offset
+    alias when pandas can infer one; either may be None.
+    """
+    dates = pd.DatetimeIndex(dates).dropna().unique().sort_values()
+    if len(dates) < 3:
+        return None, None
+
+    try:
+        alias = pd.infer_freq(dates)
+    except ValueError:
+        alias = None
+
+    median_days = (dates[1:] - dates[:-1]).median() / pd.Timedelta(days=1)
+    label = next(
+        (name for name, (low, high) in FREQUENCY_STEPS.items() if low <= median_days <= high),
+        None,
+    )
+    return label, alias
+
+
+def profile_state_path(file_path):
+    """Return the path of the saved profile state of an uploaded file."""
+    return file_path + PROFILE_SUFFIX
+
+
+def load_profile_state(file_path):
+    """Load the saved profile state of an uploaded file, or None if there is none."""
+    try:
+        with open(profile_state_path(file_path), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_profile_state(file_path, headers, profiles, rows, skipped_rows=0):
+    """Save the accumulator state of a finished profile next to the file."""
+    state = {
+        "rows": rows,
+        "skipped_rows": skipped_rows,
+        "headers": headers,
+        "columns": {column: profile.get_state() for column, profile in profiles.items()},
+    }
+    tmp_path = profile_state_path(file_path) + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, profile_state_path(file_path))
+
+
+def profile_csv(file_path, chunksize=None, memory_limit_mb=None, progress_callback=None, resume_from=None,
+                chunk_budget_mb=None):
+    """
+    Build the catalog entry for a CSV file in a single streaming pass.
+
+    Only one chunk of rows is held in memory at a time, and chunks are sized to
+    stay within `memory_limit_mb` or `chunk_budget_mb` (see
+    chunked_io.iter_csv_chunks), so profiling cost stays flat in memory
+    regardless of file size. The entry includes the
+    storage dtype plan of the dataset (see dtype_plan.plan_dtypes).
+
+    Rows with more fields than the header are skipped: the entry counts them
+    in "skipped_rows" and lists the first REPORTED_LINES of their line numbers
+    in "skipped_lines". Columns count the values that fail to parse in chunks
+    of mostly numbers in "unparsed_count".
+
+    `resume_from=(base_file, base_size)` names an earlier upload whose content
+    is the first `base_size` (uncompressed) bytes of this file. Its saved profile
+    state is restored and only the rows after that prefix are read; the line
+    numbers of skipped rows then count from the first appended line.
+    """
+    validate_header(file_path)
+    profiles = {}
+    headers = None
+    rows = 0
+    skipped_rows = 0
+    skipped_lines = []
+    read_kwargs = {}
+    if resume_from is not None:
+        base_file, base_size = resume_from
+        state = load_profile_state(base_file)
+        if state is None:
+            raise ValueError(f"No saved profile to resume from for {base_file}")
+        headers = state["headers"]
+        profiles = {column: ColumnProfile.from_state(state["columns"][column]) for column in headers}
+        rows = state["rows"]
+        skipped_rows = state.get("skipped_rows", 0)
+        read_kwargs = {"start_offset": base_size, "header": None, "names": headers}
+
+    chunks = iter_csv_chunks(
+        file_path,
+        chunksize=chunksize,
+        memory_limit_mb=memory_limit_mb,
+        progress_callback=progress_callback,
+        chunk_budget_mb=chunk_budget_mb,
+        bad_rows_callback=lambda chunk_number, line_numbers: skipped_lines.extend(line_numbers),
+        **read_kwargs,
+    )
+    for chunk in chunks:
+        if headers is None:
+            headers = chunk.columns.tolist()
+            profiles = {column: ColumnProfile() for column in headers}
+        for column in headers:
+            profiles[column].update(chunk[column])
+        rows += len(chunk)
+
+    if headers is None:
+        headers = read_csv(file_path, nrows=0).columns.tolist()
+        profiles = {column: ColumnProfile() for column in headers}
+    skipped_rows += len(skipped_lines)
+    save_profile_state(file_path, headers, profiles, rows, skipped_rows)
+
+    columns = {column: profile.to_dict() for column, profile in profiles.items()}
+    entry = {
+        "path": file_path,
+        "headers": headers,
+        "rows": rows,
+        "skipped_rows": skipped_rows,
+        "skipped_lines": skipped_lines[:REPORTED_LINES],
+        "date_columns": [column for column, column_entry in columns.items() if "date" in column_entry],
+        "columns": columns,
+    }
+    entry["dtype_plan"], entry["memory"] = plan_dtypes(entry)
+    return entry
+
+
+def load_catalog(catalog_file=CATALOG_FILE):
+    """Load the dataset catalog written at upload time."""
+    if not os.path.exists(catalog_file):
+        return {}
+    try:
+        with open(catalog_file, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return {}
+
+
+def _lock_fd(fd):
+    """Block until this process holds the exclusive lock of an open lock file."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+@contextmanager
+def catalog_lock(catalog_file=CATALOG_FILE):
+    """
+    Hold the catalog's lock file, so that concurrent sessions (threads or
+    processes) read, merge and rewrite the catalog one at a time rather than
+    overwriting each other's entries.
+
+    The lock is an OS lock on the file (flock, or msvcrt.locking on Windows),
+    so the OS releases it when a writer dies, and a writer holds it for as
+    long as it needs. On POSIX the holder removes the file on release; a
+    waiter that then gets the lock of the removed file opens it afresh.
+    """
+    lock_file = catalog_file + LOCK_SUFFIX
+    while True:
+        fd = os.open(lock_file, os.O_CREAT | os.O_RDWR)
+        _lock_fd(fd)
+        try:
+            if os.path.samestat(os.fstat(fd), os.stat(lock_file)):
+                break
+        except FileNotFoundError:
+            pass
+        os.close(fd)  # Locked the file a previous holder has since removed
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            os.remove(lock_file)  # While locked: waiters on this file then see it gone and retry
+        else:
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+def find_entry(file_path, catalog=None):
+    """Return the catalog entry of the dataset stored at `file_path`, or None."""
+    catalog = load_catalog() if catalog is None else catalog
+    target = os.path.abspath(file_path)
+    return next(
+        (entry for entry in catalog.values() if entry.get("path") and os.path.abspath(entry["path"]) == target),
+        None,
+    )
+
+
+def get_columns(file_name, file_path=None, catalog=None):
+    """
+    Return the column names of a dataset, preferring the catalog over the file.
+    Returns an empty list for a dataset that is neither catalogued nor given a path.
+    """
+    catalog = load_catalog() if catalog is None else catalog
+    entry = catalog.get(file_name) or {}
+    if entry.get("headers"):
+        return entry["headers"]
+    file_path = file_path or entry.get("path")
+    if file_path is None:
+        return []
+    return read_csv(file_path, nrows=0).columns.tolist()
+
+
+def get_date_range(file_name, date_column, file_path=None, catalog=None):
+    """
+    Return (min_date, max_date, frequency) for a dataset's date column.
+
+    Uses the catalog when it profiled the column; otherwise falls back to
+    reading only the date column from disk. Returns None if no valid dates exist,
+    or if the dataset is neither catalogued nor given a path.
+    """
+    catalog = load_catalog() if catalog is None else catalog
+    entry = catalog.get(file_name) or {}
+    column_entry = entry.get("columns", {}).get(date_column)
+    if column_entry is not None:
+        date_info = column_entry.get("date")
+        if date_info is None:
+            return None
+        return pd.Timestamp(date_info["min"]), pd.Timestamp(date_info["max"]), date_info["frequency"]
+
+    file_path = file_path or entry.get("path")
+    if file_path is None:
+        return None
+    dates = pd.to_datetime(read_csv(file_path, usecols=[date_column])[date_column], errors="coerce").dropna()
+    if dates.empty:
+        return None
+    return dates.min(), dates.max(), infer_frequency(dates.iloc[:FREQUENCY_SAMPLE])[0]
@@ -0,0 +1,155 @@
+# regressly/econometric_data/design_matrix.py
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from econometric_data.categorical_encoding import DEFAULT_ENCODING, DEFAULT_HASH_FEATURES, binary_column, hashed, one_hot
+
+# Name of the intercept column, as statsmodels' add_constant names it
+CONSTANT_COLUMN = "const"
+
+
+class DesignMatrix:
+    """
+    Design matrix of a regression held in one buffer, with its column names and row labels.
+
+    `matrix` is a C-contiguous float array or a SciPy CSR matrix, filled once
+    by build_design. scikit-learn estimators take `matrix` directly; statsmodels
+    takes `frame()`, a DataFrame over the same buffer. `columns` mirrors the
+    DataFrame attribute used for display.
+    """
+
+    def __init__(self, matrix, columns, index):
+        self.matrix = matrix
+        self.columns = list(columns)
+        self.index = index
+
+    def __sizeof__(self):
+        if sp.issparse(self.matrix):
+            return self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+        return self.matrix.nbytes
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def frame(self):
+        """Return a dense design as a DataFrame sharing its buffer."""
+        if sp.issparse(self.matrix):
+            raise TypeError("Only a dense design can be viewed as a DataFrame.")
+        return pd.DataFrame(self.matrix, index=self.index, columns=self.columns, copy=False)
+
+
+def plan_design(df, x_entries, y_variable, encoding=None, binary_as_column=False):
+    """
+    Plan the design of a Step 3 selection without building it.
+
+    Rows with a missing Y or continuous value are masked out first, once.
+    Each X variable then becomes a term (column names, values, positions):
+    continuous columns (and two-level categoricals, with `binary_as_column`)
+    carry their values; one-hot or hashed categoricals carry each row's
+    column within the term, -1 for none. `encoding` is {"method": "one-hot"}
+    or {"method": "hashing", "n_features": n}.
+    Returns (boolean mask of the rows kept, terms).
+    """
+    encoding = encoding or DEFAULT_ENCODING
+    values = {}
+    for x_var in x_entries:
+        column = df[x_var["variable"]]
+        if x_var["type"] != "categorical":
+            values[x_var["variable"]] = column
+        elif binary_as_column and column.nunique(dropna=False) == 2:
+            values[x_var["variable"]] = binary_column(column)
+
+    complete = df[y_variable].notna().to_numpy(copy=True)
+    for column in values.values():
+        complete &= column.notna().to_numpy()
+    everything = complete.all()
+
+    terms = []
+    for x_var in x_entries:
+        name = x_var["variable"]
+        if name in values:
+            column = values[name] if everything else values[name][complete]
+            terms.append(([name], column.to_numpy(dtype=float), None))
+            continue
+        column = df[name] if everything else df[name][complete]
+        if encoding["method"] == "hashing":
+            positions, columns = hashed(column, encoding.get("n_features", DEFAULT_HASH_FEATURES))
+        else:
+            positions, columns = one_hot(column)
+        terms.append((columns, None, positions))
+    return complete, terms
+
+
+def fill_design(terms, nobs, sparse=True, constant=False):
+    """
+    Write planned terms into one preallocated matrix.
+
+    Widths are known from the plan, so the matrix is allocated once and each
+    term written into its own columns: a dense C-contiguous array, or the
+    data and indices of a CSR matrix (every term has at most one non-zero
+    per row). With `constant`, the first column is an intercept named like
+    statsmodels' add_constant.
+    Returns (matrix, column names).
+    """
+    if constant:
+        terms = [([CONSTANT_COLUMN], np.ones(nobs), None)] + terms
+    names = [name for columns, _, _ in terms for name in columns]
+    width = len(names)
+
+    if not sparse:
+        matrix = np.zeros((nobs, width))
+        offset = 0
+        for columns, values, positions in terms:
+            if values is not None:
+                matrix[:, offset] = values
+            else:
+                rows = np.flatnonzero(positions >= 0)
+                matrix[rows, offset + positions[rows]] = 1.0
+            offset += len(columns)
+        return matrix, names
+
+    # One slot per (row, term); the rows of a C-ordered (nobs, terms) array are the CSR rows in order
+    index_dtype = np.int32 if max(width, nobs * len(terms)) < 2 ** 31 else np.int64
+    data = np.ones((nobs, len(terms)))
+    indices = np.empty((nobs, len(terms)), dtype=index_dtype)
+    stored = np.empty((nobs, len(terms)), dtype=bool)
+    offset = 0
+    for t, (columns, values, positions) in enumerate(terms):
+        if values is not None:
+            data[:, t] = values
+            indices[:, t] = offset
+            stored[:, t] = values != 0
+        else:
+            indices[:, t] = offset + positions
+            stored[:, t] = positions >= 0
+        offset += len(columns)
+
+    if terms and stored.all():
+        indptr = np.arange(0, nobs * len(terms) + 1, len(terms), dtype=index_dtype)
+        data, indices = data.ravel(), indices.ravel()
+    else:
+        indptr = np.zeros(nobs + 1, dtype=index_dtype)
+        np.cumsum(stored.sum(axis=1), out=indptr[1:])
+        data, indices = data[stored], indices[stored]
+    return sp.csr_matrix((data, indices, indptr), shape=(nobs, width)), names
+
+
+def build_design(df, x_entries, y_variable, encoding=None, binary_as_column=False, sparse=True, constant=False):
+    """
+    Build the design matrix of a Step 3 selection from its loaded columns,
+    planned by plan_design and written by fill_design.
+    Returns (y, DesignMatrix).
+    """
+    complete, terms = plan_design(df, x_entries, y_variable, encoding, binary_as_column)
+    y_data = df[y_variable] if complete.all() else df[y_variable][complete]
+    matrix, names = fill_design(terms, len(y_data), sparse, constant)
+    return y_data, DesignMatrix(matrix, names, y_data.index)
+
+
+def add_constant(x):
+    """Return a numeric DataFrame with an intercept column first, as one dense DesignMatrix."""
+    terms = [([name], x[name].to_numpy(dtype=float), None) for name in x.columns]
+    matrix, names = fill_design(terms, len(x), sparse=False, constant=True)
+    return DesignMatrix(matrix, names, x.index)
@@ -0,0 +1,107 @@
+# regressly/econometric_data/dtype_plan.py
+
+import numpy as np
+import pandas as pd
+
+# Text columns whose distinct values are at most this share of their rows are stored as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+INTEGER_DTYPES = ["int8", "int16", "int32", "int64"]
+
+# Bytes per row of the fixed-width dtypes the planner can choose
+_ITEM_BYTES = {"bool": 1, "float32": 4, "float64": 8, "datetime64[ns]": 8}
+
+
+def _narrowest_integer(low, high):
+    """Return the smallest signed integer dtype that holds [low, high]."""
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return "int64"
+
+
+def _category_code_bytes(categories):
+    """Bytes per row of the codes pandas uses for a categorical with this many categories."""
+    if categories < 2 ** 7:
+        return 1
+    if categories < 2 ** 15:
+        return 2
+    return 4
+
+
+def plan_column_dtype(column_entry, rows):
+    """
+    Pick the narrowest dtype that stores a profiled column without losing values.
+
+    Integers without nulls get the smallest integer type covering their range;
+    numbers that survive a float32 round trip are stored as float32; repetitive
+    text becomes a dictionary-encoded categorical. Anything else keeps pandas'
+    default dtype.
+    """
+    dtype = column_entry["dtype"]
+    nulls = column_entry["null_count"]
+    if "date" in column_entry:
+        return "datetime64[ns]"
+    if dtype == "int64" and not nulls and column_entry["min"] is not None:
+        return _narrowest_integer(column_entry["min"], column_entry["max"])
+    if dtype in ("int64", "float64"):
+        return "float32" if column_entry.get("float32_exact") else "float64"
+    if dtype == "bool" and not nulls:
+        return "bool"
+    values = rows - nulls
+    if values and column_entry["distinct_estimate"] <= CATEGORY_MAX_RATIO * values:
+        return "category"
+    return "object"
+
+
+def planned_bytes(column_entry, planned_dtype, rows):
+    """Estimate the in-memory size of a column stored with its planned dtype."""
+    default_bytes = column_entry.get("memory_bytes", 0)
+    if planned_dtype in INTEGER_DTYPES:
+        return np.dtype(planned_dtype).itemsize * rows
+    if planned_dtype in _ITEM_BYTES:
+        return _ITEM_BYTES[planned_dtype] * rows
+    if planned_dtype == "category":
+        categories = column_entry["distinct_estimate"]
+        values = max(rows - column_entry["null_count"], 1)
+        return _category_code_bytes(categories) * rows + categories * default_bytes // values
+    return default_bytes
+
+
+def plan_dtypes(catalog_entry):
+    """
+    Build the storage dtype plan of a profiled dataset.
+
+    Returns ({column: dtype}, {"default_bytes": ..., "planned_bytes": ...}), the
+    memory figures being estimates for the whole dataset held in memory.
+    """
+    rows = catalog_entry["rows"]
+    plan, default_total, planned_total = {}, 0, 0
+    for column in catalog_entry["headers"]:
+        column_entry = catalog_entry["columns"][column]
+        plan[column] = plan_column_dtype(column_entry, rows)
+        default_total += column_entry.get("memory_bytes", 0)
+        planned_total += planned_bytes(column_entry, plan[column], rows)
+    return plan, {"default_bytes": int(default_total), "planned_bytes": int(planned_total)}
+
+
+def apply_dtype_plan(df, dtype_plan):
+    """Cast the columns of a DataFrame to their planned dtypes, leaving unplanned columns as they are."""
+    for column in df.columns:
+        dtype = dtype_plan.get(column)
+        if dtype is None or df[column].dtype == dtype:
+            continue
+        if dtype == "datetime64[ns]":
+            # pandas 3 parses to the resolution of the text; the plan fixes nanoseconds
+            df[column] = pd.to_datetime(df[column], errors="coerce").astype(dtype)
+        else:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def memory_saved_fraction(memory):
+    """Return the share of the default in-memory size saved by the plan (0 when unknown)."""
+    if not memory or not memory.get("default_bytes"):
+        return 0.0
+    return max(0.0, 1 - memory["planned_bytes"] / memory["default_bytes"])
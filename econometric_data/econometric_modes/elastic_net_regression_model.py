@@ -0,0 +1,16 @@
+# regressly/econometric_data/econometric_modes/elastic_net_regression_model.py
+
+import streamlit as st
+from econometric_data.econometric_modes.lasso_regression_model import display_penalized_widgets
+
+# Display the Elastic Net alpha slider and the mix of the L1 (Lasso) and L2 (Ridge) penalties: 1 is the Lasso
+def elastic_net_penalty_widgets():
+    alpha = st.slider("Select Regularization Parameter (Alpha)", min_value=0.01, max_value=1.0, value=0.1, step=0.01)
+    l1_ratio = st.slider("Select L1 Ratio", min_value=0.01, max_value=1.0, value=0.5, step=0.01)
+    return {"alpha": alpha, "l1_ratio": l1_ratio}
+
+# Display widgets for Elastic Net Regression variable selection
+def display_widgets():
+    display_penalized_widgets(
+        "Elastic Net Regression", elastic_net_penalty_widgets, "the regularization parameter (alpha) and the L1 ratio"
+    )
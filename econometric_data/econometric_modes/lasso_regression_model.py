@@ -1,20 +1,33 @@
 # regressly/econometric_data/econometric_modes/lasso_regression_model.py
 
-import os
-import json
-import pandas as pd
 import streamlit as st
-
-# Load JSON selection data
-def load_selection_data(json_file="econometric_data/date_and_model_selection.json"):
-    if not os.path.exists(json_file):
-        st.error(f"File not found: {json_file}")
+from econometric_data.categorical_encoding import select_encoding
+from econometric_data.collinearity import display_collinearity_diagnostics
+from econometric_data.columnar_cache import read_columns
+from econometric_data.data_cache import dataset_fingerprint
+from econometric_data.dataset_catalog import load_catalog, get_columns
+from econometric_data.session_state import MODEL_SELECTION, SELECTED_VARIABLES, get_state, set_state
+
+# Load the Step 2 selections of this session
+def load_selection_data():
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("No model selection found. Please complete Step 2 first.")
         return None
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    return selection_data
+
+# Display the Lasso alpha slider
+def lasso_penalty_widgets():
+    alpha = st.slider("Select Regularization Parameter (Alpha)", min_value=0.01, max_value=1.0, value=0.1, step=0.01)
+    return {"alpha": alpha}
 
 # Display widgets for Lasso Regression variable selection
 def display_widgets():
+    display_penalized_widgets("Lasso Regression", lasso_penalty_widgets)
+
+# Display widgets for the variable selection of a penalized linear model (Lasso, Ridge or Elastic Net).
+# `penalty_widgets` shows the model's own penalty widgets and returns their values by selection key.
+def display_penalized_widgets(model_name, penalty_widgets, penalty_description="the regularization parameter (alpha)"):
     selection_data = load_selection_data()
     if not selection_data:
         return
@@ -22,6 +35,7 @@ def display_widgets():
     datasets = selection_data["datasets"]
 
     # Extract available columns and date columns for each dataset
+    catalog = load_catalog()
     all_columns = {}
     date_columns = set()
     for dataset in datasets:
@@ -30,12 +44,12 @@ def display_widgets():
         date_columns.add(date_column)
 
         try:
-            df = pd.read_csv(file_path)
+            columns = get_columns(dataset["file_name"], file_path, catalog)
         except Exception as e:
             st.error(f"Error loading file: {file_path}. {e}")
             continue
 
-        for column in df.columns:
+        for column in columns:
             all_columns[column] = {
                 "file_name": dataset["file_name"],
                 "file_path": file_path,
@@ -46,8 +60,8 @@ def display_widgets():
     selectable_columns = [col for col in column_names if col not in date_columns]
 
     # Display headers
-    st.header("Select Variables for Lasso Regression")
-    st.write("Choose the dependent variable (Y), independent variables (X), and the regularization parameter (alpha).")
+    st.header(f"Select Variables for {model_name}")
+    st.write(f"Choose the dependent variable (Y), independent variables (X), and {penalty_description}.")
 
     # Dependent variable
     y_variable = st.selectbox("Select Dependent Variable (Y)", options=selectable_columns)
@@ -56,8 +70,11 @@ def display_widgets():
     x_categorical = st.multiselect("Select Categorical Independent Variables (X)", options=selectable_columns)
     x_continuous = st.multiselect("Select Continuous Independent Variables (X)", options=selectable_columns)
 
-    # Alpha parameter
-    alpha = st.slider("Select Regularization Parameter (Alpha)", min_value=0.01, max_value=1.0, value=0.1, step=0.01)
+    # One-hot or hashed encoding of the categorical X variables, kept sparse
+    encoding = select_encoding(x_categorical)
+
+    # Penalty parameters of the model
+    penalty = penalty_widgets()
 
     # Validation: Ensure Y is not in X variables
     if y_variable in x_categorical or y_variable in x_continuous:
@@ -70,6 +87,15 @@ def display_widgets():
         st.error(f"Variables {', '.join(overlapping_x)} cannot be both categorical and continuous. Please revise your selections.")
         return
 
+    # The model reads every X column from the dependent variable's file
+    if y_variable and x_continuous:
+        y_path = all_columns[y_variable]["file_path"]
+        display_collinearity_diagnostics(
+            dataset_fingerprint(y_path),
+            tuple(x_continuous),
+            lambda: read_columns(y_path, x_continuous),
+        )
+
     if st.button("Submit Selections"):
         if not y_variable or not (x_categorical or x_continuous):
             st.error("Please select a dependent variable and at least one independent variable.")
@@ -77,8 +103,9 @@ def display_widgets():
 
         # Prepare data for saving
         variable_data = {
-            "model": "Lasso Regression",
-            "alpha": alpha,
+            "model": model_name,
+            **penalty,
+            "encoding": encoding,
             "y": {
                 "variable": y_variable,
                 "file_name": all_columns[y_variable]["file_name"],
@@ -108,11 +135,8 @@ def display_widgets():
                 "date_column": all_columns[x_var]["date_column"]
             })
 
-        # Save to JSON file
-        output_file = "econometric_data/selected_variables.json"
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, 'w') as f:
-            json.dump(variable_data, f, indent=4)
+        # Save to this session's state
+        set_state(SELECTED_VARIABLES, variable_data)
 
         st.success("Selections saved successfully!")
         st.json(variable_data)  # Display the saved selections for confirmation
@@ -4,85 +4,146 @@
 import os
 import json
 import pandas as pd
-import statsmodels.api as sm
 import streamlit as st
 from datetime import datetime
+from econometric_data.collinearity import display_collinearity_diagnostics
+from econometric_data.data_cache import cached, file_fingerprint
+from econometric_data.dataset_catalog import CATALOG_FILE, load_catalog, get_columns, get_date_range
+from econometric_data.design_matrix import add_constant
+from econometric_data.feature_transforms import (
+    TRANSFORM_OPTIONS, derived_name, load_transformed_data, transform_specs, transformed_design, variable_transforms,
+)
+from econometric_data.lead_lag_screening import best_lags, catalogued_series, load_screening_data, screen_leading_indicators
+from econometric_data.econometric_modes.run_linear_regression import format_regression_results
+from econometric_data.ols_engine import fit_ols
+from econometric_data.session_state import MODEL_SELECTION, SELECTED_VARIABLES, get_state, set_state
+from econometric_data.timeseries_join import AGGREGATIONS, align_time_series, display_join_report
 
-# Load JSON selection data
-def load_selection_data(json_file="econometric_data/date_and_model_selection.json"):
-    if not os.path.exists(json_file):
-        st.error(f"File not found: {json_file}")
+# Load the Step 2 selections of this session
+def load_selection_data():
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("No model selection found. Please complete Step 2 first.")
         return None
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    return selection_data
+
+# Date range and columns of one dataset, cached until the file or the catalog changes
+@cached(lambda file_name, file_path, date_column: (
+    file_name, date_column, file_fingerprint(file_path), file_fingerprint(CATALOG_FILE)
+))
+def dataset_date_range(file_name, file_path, date_column):
+    """Return (date range entry, None) for a dataset, or (None, error message)."""
+    if not os.path.exists(file_path):
+        return None, f"File not found: {file_path}"
+
+    catalog = load_catalog()
+    columns = get_columns(file_name, file_path, catalog)
+    if date_column not in columns:
+        return None, f"Date column '{date_column}' not found in file: {file_path}"
 
-# Calculate date ranges for datasets
+    date_range = get_date_range(file_name, date_column, file_path, catalog)
+    if date_range is None:
+        return None, f"No valid dates found in column '{date_column}' for file: {file_path}"
+
+    min_date, max_date, _ = date_range
+    return {
+        "file_path": file_path,
+        "date_column": date_column,
+        "min_date": min_date,
+        "max_date": max_date,
+        "columns": [col for col in columns if col != date_column]
+    }, None
+
+# Calculate date ranges for datasets from the upload-time catalog
 def calculate_date_ranges(datasets):
     date_ranges = {}
     for dataset in datasets:
-        file_path = dataset["path"]
-        date_column = dataset["date_column"]
-
-        if not os.path.exists(file_path):
-            st.error(f"File not found: {file_path}")
+        date_range, error = dataset_date_range(dataset["file_name"], dataset["path"], dataset["date_column"])
+        if error:
+            st.error(error)
             continue
+        date_ranges[dataset["file_name"]] = date_range
+    return date_ranges
 
-        df = pd.read_csv(file_path)
-        if date_column not in df.columns:
-            st.error(f"Date column '{date_column}' not found in file: {file_path}")
-            continue
+# Step 3 selection entry of one variable
+def variable_entry(variable, file_options, date_ranges, aggregation):
+    file_name = next(file for file, vars in file_options.items() if variable in vars)
+    return {
+        "variable": variable,
+        "file_name": file_name,
+        "file_path": date_ranges[file_name]["file_path"],
+        "date_column": date_ranges[file_name]["date_column"],
+        "aggregation": aggregation
+    }
 
-        df[date_column] = pd.to_datetime(df[date_column], errors="coerce")
-        df = df.dropna(subset=[date_column])
+# Lead-lag screen of catalogued series against Y, cached until a file or the catalog changes
+@cached(lambda y_entry, candidates, start_date, end_date, frequency, max_lag: (
+    json.dumps([y_entry] + candidates, sort_keys=True),
+    tuple(file_fingerprint(path) for path in sorted({entry["file_path"] for entry in [y_entry] + candidates})),
+    str(start_date), str(end_date), frequency, max_lag,
+))
+def screen_catalogued_series(y_entry, candidates, start_date, end_date, frequency, max_lag):
+    y_data, candidate_data = load_screening_data(y_entry, candidates, start_date, end_date, frequency)
+    return screen_leading_indicators(y_data, candidate_data, max_lag)
 
-        if df.empty:
-            st.error(f"No valid dates found in column '{date_column}' for file: {file_path}")
-            continue
+# Rank every uploaded series as a leading indicator of Y
+def display_lead_lag_screening(y_entry, date_columns, start_date, end_date, frequency):
+    with st.expander(f"Screen leading indicators of {y_entry['variable']}"):
+        candidates = catalogued_series(date_columns)
+        max_lag = st.number_input(
+            f"Largest lag ({frequency.lower()} periods)",
+            min_value=1,
+            max_value=48,
+            value=24,
+            help="Cross-correlations and Granger tests are computed for every lag up to this one.",
+        )
+        st.write(f"{len(candidates):,} numeric series in the uploaded datasets.")
+        arguments = (y_entry, candidates, start_date, end_date, frequency, int(max_lag))
+        if st.button("Screen Series"):
+            st.session_state["lead_lag_screening"] = arguments
+        if st.session_state.get("lead_lag_screening") != arguments:
+            return
 
-        min_date = df[date_column].min()
-        max_date = df[date_column].max()
-        columns = [col for col in df.columns if col != date_column]
+        try:
+            table = screen_catalogued_series(*arguments)
+        except ValueError as e:
+            st.error(f"Could not screen the uploaded series: {e}")
+            return
+        ranked = best_lags(table)
+        if ranked.empty:
+            st.error(f"Too few dates between {start_date.date()} and {end_date.date()} to test {int(max_lag)} lags.")
+            return
+        st.write("Lag with the strongest Granger causality of each series (x leading Y):")
+        st.dataframe(ranked)
+        if st.checkbox("Show every (series, lag) pair"):
+            st.dataframe(table)
 
-        date_ranges[dataset["file_name"]] = {
-            "file_path": file_path,
-            "date_column": date_column,
-            "min_date": min_date,
-            "max_date": max_date,
-            "columns": columns
-        }
-    return date_ranges
+# Transformed X columns of a Step 3 selection, gaps left as NaN, for the collinearity diagnostics
+def load_x_design(x_entries, start_date, end_date, frequency):
+    joined, groups = align_time_series(x_entries, start_date, end_date, frequency)
+    design, x_names, _ = transformed_design(joined, groups, [], x_entries)
+    return design[x_names]
 
 # Run regression model
 def run_regression_model():
-    with open("econometric_data/selected_variables.json", 'r') as f:
-        selected_data = json.load(f)
+    selected_data = get_state(SELECTED_VARIABLES)
 
     y_info = selected_data["y"]
-    x_info = selected_data["x"]
     start_date = pd.to_datetime(selected_data["start_date"])
     end_date = pd.to_datetime(selected_data["end_date"])
 
-    y_df = pd.read_csv(y_info["file_path"], parse_dates=[y_info["date_column"]])
-    y_df.set_index(y_info["date_column"], inplace=True)
-    y_df = y_df.loc[start_date:end_date]
     y_column = y_info["variable"]
-    y_data = y_df[[y_column]]
-
-    x_data = pd.DataFrame()
-    for x_var in x_info:
-        x_df = pd.read_csv(x_var["file_path"], parse_dates=[x_var["date_column"]])
-        x_df.set_index(x_var["date_column"], inplace=True)
-        x_df = x_df.loc[start_date:end_date]
-        x_column = x_var["variable"]
-        x_data[x_column] = x_df[x_column]
-
-    if not y_data.index.equals(x_data.index):
-        st.error("The indices for the dependent and independent variables are not aligned.")
+    data, x_column_names, join_report = load_transformed_data(selected_data, [y_column], start_date, end_date)
+    display_join_report(join_report)
+    if data.empty:
+        st.error("The dependent and independent variables have no dates in common.")
         return
 
-    x_data = sm.add_constant(x_data)
-    model = sm.OLS(y_data, x_data).fit()
-    st.text(model.summary())
+    y_data = data[y_column]
+    x_data = add_constant(data[x_column_names]).frame()
+    # Fitted from X'X and X'y; the statsmodels summary is only built if requested
+    model = fit_ols(y_data, x_data)
+    format_regression_results(model, y_column, x_column_names)
 
 # Display widgets for variable selection
 def display_widgets():
@@ -106,7 +167,7 @@ def display_widgets():
     st.write(f"Data range: {overall_min_date.date()} to {overall_max_date.date()}")
 
     # Date selection based on frequency
-    if frequency.lower() == "daily":
+    if frequency.lower() in ("daily", "weekly"):
         start_date = st.date_input(
             "Start Date",
             value=overall_min_date.date(),
@@ -121,7 +182,7 @@ def display_widgets():
         )
         start_date = pd.Timestamp(start_date)
         end_date = pd.Timestamp(end_date)
-    elif frequency.lower() == "monthly":
+    elif frequency.lower() in ("monthly", "quarterly"):
         start_month = st.selectbox(
             "Start Month",
             options=[datetime(2000, m, 1).strftime('%B') for m in range(1, 13)],
@@ -162,7 +223,80 @@ def display_widgets():
     y_file = st.selectbox("Select File for Dependent Variable (Y)", options=list(file_options.keys()))
     y_variable = st.selectbox("Select Dependent Variable (Y)", options=file_options[y_file])
 
-    x_variables = st.multiselect("Select Independent Variables (X)", options=[var for file_vars in file_options.values() for var in file_vars])
+    all_variables = [var for file_vars in file_options.values() for var in file_vars]
+    additional_y_variables = st.multiselect(
+        "Additional Dependent Variables (optional)",
+        options=[var for var in all_variables if var != y_variable],
+        help="Regress every one of these on the same X variables too, in a single solve.",
+    )
+
+    x_variables = st.multiselect("Select Independent Variables (X)", options=all_variables)
+
+    # Every series is resampled to the Step 2 frequency before the series are joined
+    aggregations = {}
+    with st.expander(f"Resampling to {frequency} frequency"):
+        for variable in dict.fromkeys([y_variable] + additional_y_variables + x_variables):
+            aggregations[variable] = st.selectbox(
+                f"Aggregation for {variable}",
+                options=AGGREGATIONS,
+                key=f"aggregation_{variable}",
+                help="mean for rates and averages, last for levels and stocks, sum for flows.",
+            )
+        tolerance_days = st.number_input(
+            "As-of join tolerance (days)",
+            min_value=0,
+            value=0,
+            help="Match each Y date to the latest X value up to this many days earlier. 0 joins on exact dates.",
+        )
+
+    y_entry = variable_entry(y_variable, {y_file: file_options[y_file]}, date_ranges, aggregations[y_variable])
+    date_columns = {file_name: info["date_column"] for file_name, info in date_ranges.items()}
+    display_lead_lag_screening(y_entry, date_columns, start_date, end_date, frequency)
+
+    # Lags, leads, differences and rolling means are computed from the joined series in Step 4
+    transforms = {}
+    with st.expander("Transforms"):
+        for x in x_variables:
+            transforms[x] = st.multiselect(
+                f"Transforms of {x}",
+                options=list(TRANSFORM_OPTIONS),
+                default=["level"],
+                key=f"transforms_{x}",
+                help=f"Periods are {frequency.lower()} periods. Each transform becomes its own regressor.",
+            )
+            if not transforms[x]:
+                st.error(f"Select at least one transform of {x}.")
+                return
+
+    x_entries = [
+        dict(variable_entry(x, file_options, date_ranges, aggregations[x]), transforms=transform_specs(transforms[x]))
+        for x in x_variables
+    ]
+
+    # Validation: a dependent variable may be an X variable only through a transform (a lag of Y, say)
+    targets = [y_variable] + additional_y_variables
+    clashes = [
+        derived_name(entry["variable"], transform, periods)
+        for entry in x_entries for transform, periods in variable_transforms(entry)
+    ]
+    clashes = [name for name in clashes if name in targets]
+    if clashes:
+        st.error(
+            f"{', '.join(clashes)} cannot be both a dependent variable (Y) and an independent variable (X). "
+            "Select another transform of it or revise your selections."
+        )
+        return
+
+    data_key = (
+        tuple(sorted(file_fingerprint(info["file_path"]) for info in date_ranges.values())),
+        frequency, start_date.isoformat(), end_date.isoformat(),
+    )
+    if x_entries:
+        display_collinearity_diagnostics(
+            data_key,
+            json.dumps(x_entries, sort_keys=True),
+            lambda: load_x_design(x_entries, start_date, end_date, frequency),
+        )
 
     if st.button("Submit Selections"):
         # Prepare data to write to JSON
@@ -171,28 +305,22 @@ def display_widgets():
             "frequency": frequency,
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
+            "asof_tolerance_days": int(tolerance_days),
             "y": {
                 "variable": y_variable,
                 "file_name": y_file,
                 "file_path": date_ranges[y_file]["file_path"],
-                "date_column": date_ranges[y_file]["date_column"]
+                "date_column": date_ranges[y_file]["date_column"],
+                "aggregation": aggregations[y_variable]
             },
-            "x": [
-                {
-                    "variable": x,
-                    "file_name": next(file for file, vars in file_options.items() if x in vars),
-                    "file_path": date_ranges[next(file for file, vars in file_options.items() if x in vars)]["file_path"],
-                    "date_column": date_ranges[next(file for file, vars in file_options.items() if x in vars)]["date_column"]
-                }
-                for x in x_variables
-            ]
+            "additional_y": [
+                variable_entry(y, file_options, date_ranges, aggregations[y]) for y in additional_y_variables
+            ],
+            "x": x_entries
         }
 
-        # Write to JSON file
-        output_file = "econometric_data/selected_variables.json"
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, 'w') as f:
-            json.dump(variable_data, f, indent=4)
+        # Save to this session's state
+        set_state(SELECTED_VARIABLES, variable_data)
 
         # Display success message and the written JSON
         st.success("Selections saved successfully!")
@@ -1,17 +1,19 @@
 # regressly/econometric_data/econometric_modes/logistic_regression_model.py
 
-import os
-import json
-import pandas as pd
 import streamlit as st
-
-# Load JSON selection data
-def load_selection_data(json_file="econometric_data/date_and_model_selection.json"):
-    if not os.path.exists(json_file):
-        st.error(f"File not found: {json_file}")
+from econometric_data.collinearity import display_collinearity_diagnostics
+from econometric_data.columnar_cache import read_columns
+from econometric_data.data_cache import dataset_fingerprint
+from econometric_data.dataset_catalog import load_catalog, get_columns
+from econometric_data.session_state import MODEL_SELECTION, SELECTED_VARIABLES, get_state, set_state
+
+# Load the Step 2 selections of this session
+def load_selection_data():
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("No model selection found. Please complete Step 2 first.")
         return None
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    return selection_data
 
 # Display widgets for logistic regression variable selection
 def display_widgets():
@@ -22,16 +24,17 @@ def display_widgets():
     datasets = selection_data["datasets"]
 
     # Extract available columns for each dataset
+    catalog = load_catalog()
     all_columns = {}
     for dataset in datasets:
         file_path = dataset["path"]
         try:
-            df = pd.read_csv(file_path)
+            columns = get_columns(dataset["file_name"], file_path, catalog)
         except Exception as e:
             st.error(f"Error loading file: {file_path}. {e}")
             continue
 
-        for column in df.columns:
+        for column in columns:
             all_columns[column] = {
                 "file_name": dataset["file_name"],
                 "file_path": file_path
@@ -61,6 +64,15 @@ def display_widgets():
         st.error(f"Variables {', '.join(overlapping_x)} cannot be both categorical and continuous. Please revise your selections.")
         return
 
+    # The model reads every X column from the dependent variable's file
+    if y_variable and x_continuous:
+        y_path = all_columns[y_variable]["file_path"]
+        display_collinearity_diagnostics(
+            dataset_fingerprint(y_path),
+            tuple(x_continuous),
+            lambda: read_columns(y_path, x_continuous),
+        )
+
     if st.button("Submit Selections"):
         if not y_variable or not (x_categorical or x_continuous):
             st.error("Please select a dependent variable and at least one independent variable.")
@@ -95,11 +107,8 @@ def display_widgets():
                 "file_path": all_columns[x_var]["file_path"]
             })
 
-        # Save to JSON file
-        output_file = "econometric_data/selected_variables.json"
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, 'w') as f:
-            json.dump(variable_data, f, indent=4)
+        # Save to this session's state
+        set_state(SELECTED_VARIABLES, variable_data)
 
         st.success("Selections saved successfully!")
         st.json(variable_data)  # Display the saved selections for confirmation
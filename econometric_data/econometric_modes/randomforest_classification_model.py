@@ -1,20 +1,20 @@
 # regressly/econometric_data/econometric_modes/randomforest_classification_model.py 
 
 
-import os
-import json
-import pandas as pd
 import streamlit as st
+from econometric_data.categorical_encoding import select_encoding
+from econometric_data.dataset_catalog import load_catalog, get_columns
+from econometric_data.session_state import MODEL_SELECTION, SELECTED_VARIABLES, get_state, set_state
 
-def load_selection_data(json_file="econometric_data/date_and_model_selection.json"):
+def load_selection_data():
     """
-    Load the JSON file containing datasets and selected model type.
+    Load the datasets and model type selected in Step 2 for this session.
     """
-    if not os.path.exists(json_file):
-        st.error("JSON file not found. Please complete Step 2 first.")
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("No model selection found. Please complete Step 2 first.")
         return None
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    return selection_data
 
 def display_widgets():
     """
@@ -26,6 +26,7 @@ def display_widgets():
 
     datasets = selection_data["datasets"]
 
+    catalog = load_catalog()
     all_columns = {}
     date_columns = set()
 
@@ -34,8 +35,7 @@ def display_widgets():
         date_column = dataset["date_column"]
         date_columns.add(date_column)
 
-        df = pd.read_csv(file_path)
-        for column in df.columns:
+        for column in get_columns(dataset["file_name"], file_path, catalog):
             all_columns[column] = {
                 "file_name": dataset["file_name"],
                 "file_path": dataset["path"]
@@ -58,6 +58,9 @@ def display_widgets():
         options=column_names,
     )
 
+    # One-hot or hashed encoding of the categorical X variables, kept sparse
+    encoding = select_encoding(x_categorical)
+
     n_estimators = st.slider(
         "Number of Trees (n_estimators):",
         min_value=10,
@@ -77,6 +80,7 @@ def display_widgets():
             "parameters": {
                 "n_estimators": n_estimators,
             },
+            "encoding": encoding,
             "y": {
                 "variable": y_variable,
                 "file_name": all_columns[y_variable]["file_name"],
@@ -103,11 +107,8 @@ def display_widgets():
                 "file_path": all_columns[x_var]["file_path"],
             })
 
-        # Save to JSON file
-        output_file = "econometric_data/selected_variables.json"
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        with open(output_file, "w") as f:
-            json.dump(variable_data, f, indent=4)
+        # Save to this session's state
+        set_state(SELECTED_VARIABLES, variable_data)
 
-        st.success(f"Selections saved to {output_file}")
+        st.success("Selections saved successfully!")
         st.json(variable_data)
@@ -0,0 +1,13 @@
+# regressly/econometric_data/econometric_modes/ridge_regression_model.py
+
+import streamlit as st
+from econometric_data.econometric_modes.lasso_regression_model import display_penalized_widgets
+
+# Display the Ridge alpha input: the L2 penalty is on the scale of X'X, so it can be large
+def ridge_penalty_widgets():
+    alpha = st.number_input("Select Regularization Parameter (Alpha)", min_value=0.0, value=1.0)
+    return {"alpha": alpha}
+
+# Display widgets for Ridge Regression variable selection
+def display_widgets():
+    display_penalized_widgets("Ridge Regression", ridge_penalty_widgets)
@@ -0,0 +1,93 @@
+# regressly/econometric_data/econometric_modes/run_elastic_net_regression.py
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from econometric_data.categorical_encoding import column_summary
+from econometric_data.data_cache import cached, selection_key
+from econometric_data.lasso_path import CV_FOLDS, LassoPath, fit_lasso
+from econometric_data.session_state import SELECTED_VARIABLES, get_state
+from econometric_data.econometric_modes.run_lasso_regression import (
+    display_lasso_results, load_and_prepare_penalized_data, plot_cross_validation, plot_lasso_path,
+)
+
+# The regularization path does not depend on the alpha chosen in Step 3
+@cached(lambda: selection_key(ignore=("alpha",)))
+def load_elastic_net_path():
+    """
+    Fit the Elastic Net over the whole alpha grid, with cross-validation, on the data selected in Step 3.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    l1_ratio = get_state(SELECTED_VARIABLES)["l1_ratio"]
+    return LassoPath(y_data, x_data.matrix, x_data.columns, l1_ratio=l1_ratio)
+
+
+def run_elastic_net_model():
+    """
+    Run the Elastic Net regression at the Step 3 alpha and L1 ratio.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    selected_data = get_state(SELECTED_VARIABLES)
+    alpha_value, l1_ratio = selected_data["alpha"], selected_data["l1_ratio"]
+
+    st.write("### Running Elastic Net Regression")
+    st.write(f"**Dependent Variable (Y):** {y_data.name}")
+    st.write(f"**Independent Variables (X):** {column_summary(x_data.columns)}")
+    st.write(f"**Alpha Value:** {alpha_value}")
+    st.write(f"**L1 Ratio:** {l1_ratio}")
+
+    # Fit on the sparse design, screening out columns that stay at zero on wide designs
+    coef, intercept = fit_lasso(x_data.matrix, y_data, alpha_value, l1_ratio)
+    y_pred = np.asarray(x_data.matrix @ coef).ravel() + intercept
+    display_lasso_results(y_data, y_pred, pd.Series(coef, index=x_data.columns), "Elastic Net Regression")
+
+
+def run_elastic_net_path_model():
+    """
+    Show the cross-validated regularization path and the fit at the alpha
+    picked on it. Moving the slider looks the fit up on the cached path.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    l1_ratio = get_state(SELECTED_VARIABLES)["l1_ratio"]
+    path = load_elastic_net_path()
+
+    st.write("### Elastic Net Regularization Path")
+    st.write(f"**Dependent Variable (Y):** {y_data.name}")
+    st.write(f"**Independent Variables (X):** {column_summary(x_data.columns)}")
+    st.write(
+        f"{CV_FOLDS}-fold cross-validation at L1 ratio {l1_ratio} picks alpha = {path.alpha_min:.4g} "
+        f"(largest alpha within one standard error: {path.alpha_1se:.4g})."
+    )
+
+    positions = list(range(len(path.alphas)))
+    position = st.select_slider(
+        "Alpha",
+        options=positions,
+        value=path.index(path.alpha_min),
+        format_func=lambda i: f"{path.alphas[i]:.4g}",
+    )
+    alpha = path.alphas[position]
+    st.write(f"**Alpha Value:** {alpha:.4g} ({path.nonzero_counts()[position]} non-zero coefficients)")
+
+    st.pyplot(plot_lasso_path(path, alpha, "Elastic Net Regression"))
+    st.pyplot(plot_cross_validation(path, alpha, "Elastic Net Regression"))
+    display_lasso_results(
+        y_data, path.predict(x_data.matrix, alpha), path.coefficients(alpha), "Elastic Net Regression"
+    )
+
+
+def display_run_regression():
+    """
+    Display the "Run Elastic Net Regression" button and run the Elastic Net when clicked.
+    """
+    mode = st.radio("Alpha", ["Fixed alpha", "Cross-validated path"], horizontal=True)
+
+    # Keep the results on screen while alpha is moved along the path
+    if st.button("Run Elastic Net Regression"):
+        st.session_state["elastic_net_regression_ran"] = True
+
+    if st.session_state.get("elastic_net_regression_ran"):
+        if mode == "Fixed alpha":
+            run_elastic_net_model()
+        else:
+            run_elastic_net_path_model()
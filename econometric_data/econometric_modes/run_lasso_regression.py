@@ -1,69 +1,43 @@
 # regressly/econometric_data/econometric_modes/run_lasso_regression.py
 
 import os
+import numpy as np
 import pandas as pd
-import json
-from sklearn.linear_model import Lasso
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.metrics import mean_squared_error, r2_score
 import streamlit as st
 import matplotlib.pyplot as plt
-
-# Function to load and prepare the Lasso data
-def load_and_prepare_lasso_data():
+from econometric_data.categorical_encoding import column_summary
+from econometric_data.columnar_cache import read_columns
+from econometric_data.data_cache import cached, selection_key
+from econometric_data.design_matrix import build_design
+from econometric_data.lasso_path import CV_FOLDS, LassoPath, fit_lasso
+from econometric_data.session_state import SELECTED_VARIABLES, get_state
+
+# Coefficients drawn in the coefficient plot; one-hot or hashed designs can have thousands
+MAX_PLOTTED_FEATURES = 30
+
+# Step 3 selections that set the penalty rather than the data
+PENALTY_SETTINGS = ("model", "alpha", "l1_ratio")
+
+# Function to load and prepare the data of a penalized linear model
+@cached(lambda: selection_key(ignore=PENALTY_SETTINGS))
+def load_and_prepare_penalized_data():
     """
-    Load and prepare the Lasso regression data from the selected_variables.json file.
+    Load and prepare the Lasso, Ridge or Elastic Net regression data from the
+    variables selected in Step 3. The design does not depend on the penalty,
+    so changing it, or switching between these models, reuses the cached one.
     """
-    # Load the selected variables from the JSON file
-    with open('econometric_data/selected_variables.json', 'r') as f:
-        selected_data = json.load(f)
+    # Load the selected variables of this session
+    selected_data = get_state(SELECTED_VARIABLES)
 
-    # Load the CSV file once
+    # Load only the selected columns once
     file_path = selected_data["y"]["file_path"]
-    df = pd.read_csv(file_path)
+    columns = [selected_data["y"]["variable"]] + [x_var["variable"] for x_var in selected_data["x"]]
+    df = read_columns(file_path, columns)
 
-    # Load the dependent variable (Y)
+    # Encode the X variables into a sparse design, dropping rows with missing values
     y_variable = selected_data["y"]["variable"]
-    y_data = df[y_variable]
-
-    # Initialize a DataFrame for X variables
-    x_data = pd.DataFrame()
-
-    # Process independent variables (X)
-    for x_var in selected_data["x"]:
-        x_column = x_var["variable"]
-
-        if x_var["type"] == "categorical":
-            # Check the unique values in the categorical column
-            unique_values = df[x_column].unique()
-
-            if len(unique_values) == 2:
-                # Binary encoding (0/1) for two unique values
-                mapping = {unique_values[0]: 0, unique_values[1]: 1}
-                x_data[x_column] = df[x_column].map(mapping)
-            else:
-                # One-hot encoding for more than two unique values
-                encoder = OneHotEncoder(drop="first", sparse_output=False)
-                x_encoded = pd.DataFrame(
-                    encoder.fit_transform(df[[x_column]]),
-                    columns=encoder.get_feature_names_out([x_column])
-                )
-                x_data = pd.concat([x_data, x_encoded], axis=1)
-        else:
-            # For continuous variables, add directly to the DataFrame
-            x_data[x_column] = df[x_column]
-
-    # Drop rows with missing values
-    combined_data = pd.concat([y_data, x_data], axis=1).dropna()
-
-    # Separate Y and X after alignment
-    y_data = combined_data[y_variable]
-    x_data = combined_data.drop(columns=[y_variable])
-
-    # Get the alpha value from the JSON
-    alpha_value = selected_data["alpha"]
-
-    return y_data, x_data, alpha_value
+    return build_design(df, selected_data["x"], y_variable, selected_data.get("encoding"), binary_as_column=True)
 
 
 # Function to run the Lasso regression
@@ -71,22 +45,28 @@ def run_lasso_model():
     """
     Run the Lasso regression using the prepared data.
     """
-    # Load and prepare the data
-    y_data, x_data, alpha_value = load_and_prepare_lasso_data()
+    # Load and prepare the data, and get the alpha value from the Step 3 selections
+    y_data, x_data = load_and_prepare_penalized_data()
+    alpha_value = get_state(SELECTED_VARIABLES)["alpha"]
 
     # Streamlit: Display summary of inputs
     st.write("### Running Lasso Regression")
     st.write(f"**Dependent Variable (Y):** {y_data.name}")
-    st.write(f"**Independent Variables (X):** {', '.join(x_data.columns)}")
+    st.write(f"**Independent Variables (X):** {column_summary(x_data.columns)}")
     st.write(f"**Alpha Value:** {alpha_value}")
 
-    # Create and fit the Lasso Regression model
-    lasso = Lasso(alpha=alpha_value)
-    lasso.fit(x_data, y_data)
+    # Fit the Lasso on the sparse design, screening out columns that stay at zero on wide designs
+    coef, intercept = fit_lasso(x_data.matrix, y_data, alpha_value)
 
     # Make predictions
-    y_pred = lasso.predict(x_data)
+    y_pred = np.asarray(x_data.matrix @ coef).ravel() + intercept
+    display_lasso_results(y_data, y_pred, pd.Series(coef, index=x_data.columns))
+
 
+def display_lasso_results(y_data, y_pred, coefficients, model_name="Lasso Regression"):
+    """
+    Display the fit metrics, coefficients and plots of a Lasso (or other penalized linear) fit.
+    """
     # Calculate performance metrics
     mse = mean_squared_error(y_data, y_pred)
     r2 = r2_score(y_data, y_pred)
@@ -98,44 +78,143 @@ def run_lasso_model():
 
     # Display coefficients in a table
     coefficients_df = pd.DataFrame({
-        "Feature": x_data.columns,
-        "Coefficient": lasso.coef_
+        "Feature": coefficients.index,
+        "Coefficient": coefficients.to_numpy()
     }).sort_values(by="Coefficient", ascending=False)
     st.write("### Feature Coefficients")
     st.dataframe(coefficients_df)
 
     # Plot feature coefficients
     st.write("### Coefficient Plot")
-    st.pyplot(plot_feature_coefficients(coefficients_df))
+    st.pyplot(plot_feature_coefficients(coefficients_df, model_name))
 
     # Plot actual vs predicted values
     st.write("### Actual vs Predicted Plot")
-    st.pyplot(plot_lasso_regression_results(y_data, y_pred))
+    st.pyplot(plot_lasso_regression_results(y_data, y_pred, model_name))
+
 
+# The regularization path does not depend on the alpha chosen in Step 3
+@cached(lambda: selection_key(ignore=("alpha",)))
+def load_lasso_path():
+    """
+    Fit the Lasso over the whole alpha grid, with cross-validation, on the data selected in Step 3.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    return LassoPath(y_data, x_data.matrix, x_data.columns)
+
+
+def run_lasso_path_model():
+    """
+    Show the cross-validated regularization path and the fit at the alpha
+    picked on it. Moving the slider looks the fit up on the cached path.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    path = load_lasso_path()
 
-def plot_feature_coefficients(coefficients_df):
+    st.write("### Lasso Regularization Path")
+    st.write(f"**Dependent Variable (Y):** {y_data.name}")
+    st.write(f"**Independent Variables (X):** {column_summary(x_data.columns)}")
+    st.write(
+        f"{CV_FOLDS}-fold cross-validation picks alpha = {path.alpha_min:.4g} "
+        f"(largest alpha within one standard error: {path.alpha_1se:.4g})."
+    )
+
+    positions = list(range(len(path.alphas)))
+    position = st.select_slider(
+        "Alpha",
+        options=positions,
+        value=path.index(path.alpha_min),
+        format_func=lambda i: f"{path.alphas[i]:.4g}",
+    )
+    alpha = path.alphas[position]
+    st.write(f"**Alpha Value:** {alpha:.4g} ({path.nonzero_counts()[position]} non-zero coefficients)")
+
+    st.pyplot(plot_lasso_path(path, alpha))
+    st.pyplot(plot_cross_validation(path, alpha))
+    display_lasso_results(y_data, path.predict(x_data.matrix, alpha), path.coefficients(alpha))
+
+
+def plot_feature_coefficients(coefficients_df, model_name="Lasso Regression"):
     """
-    Plot the feature coefficients from the Lasso regression.
+    Plot the feature coefficients from the Lasso regression, the
+    MAX_PLOTTED_FEATURES largest in absolute value when there are more.
     """
+    largest = coefficients_df["Coefficient"].abs().nlargest(MAX_PLOTTED_FEATURES).index
+    coefficients_df = coefficients_df.loc[coefficients_df.index.isin(largest)]
     plt.figure(figsize=(10, 6))
     plt.barh(coefficients_df["Feature"], coefficients_df["Coefficient"], color="#1E90FF")
-    plt.title("Lasso Regression: Feature Coefficients")
+    plt.title(f"{model_name}: Feature Coefficients")
     plt.xlabel("Coefficient Value")
     plt.ylabel("Feature")
     plt.grid(True)
     return plt.gcf()
 
 
-def plot_lasso_regression_results(y_data, y_pred):
+def plot_lasso_regression_results(y_data, y_pred, model_name="Lasso Regression"):
     """
     Plot the actual vs predicted values for Lasso regression.
     """
     plt.figure(figsize=(10, 6))
     plt.scatter(y_data, y_pred, alpha=0.6, label="Predicted Values", color="#FFA07A")
     plt.plot(y_data, y_data, color="red", linewidth=2, label="Perfect Prediction Line")
-    plt.title("Lasso Regression: Actual vs Predicted Values")
+    plt.title(f"{model_name}: Actual vs Predicted Values")
     plt.xlabel("Actual Values")
     plt.ylabel("Predicted Values")
     plt.legend()
     plt.grid(True)
-    return plt.gcf()
\ No newline at end of file
+    return plt.gcf()
+
+
+def plot_lasso_path(path, alpha, model_name="Lasso Regression"):
+    """
+    Plot the coefficients against alpha, marking the selected alpha. Only the
+    MAX_PLOTTED_FEATURES coefficients that grow largest along the path are drawn.
+    """
+    plt.figure(figsize=(10, 6))
+    largest = np.argsort(-np.abs(path.coefs).max(axis=0))[:MAX_PLOTTED_FEATURES]
+    for j in sorted(largest):
+        plt.plot(path.alphas, path.coefs[:, j], label=path.names[j])
+    plt.axvline(alpha, color="red", linestyle="--", label="Selected Alpha")
+    plt.xscale("log")
+    plt.title(f"{model_name}: Coefficient Path")
+    plt.xlabel("Alpha")
+    plt.ylabel("Coefficient Value")
+    if len(largest) <= 15:
+        plt.legend()
+    plt.grid(True)
+    return plt.gcf()
+
+
+def plot_cross_validation(path, alpha, model_name="Lasso Regression"):
+    """
+    Plot the cross-validated mean squared error against alpha, with one standard error bands.
+    """
+    plt.figure(figsize=(10, 6))
+    plt.plot(path.alphas, path.cv_mean, color="#1E90FF", label="Mean CV Error")
+    plt.fill_between(path.alphas, path.cv_mean - path.cv_se, path.cv_mean + path.cv_se, color="#1E90FF", alpha=0.2)
+    plt.axvline(path.alpha_min, color="green", linestyle=":", label="Minimum CV Error")
+    plt.axvline(alpha, color="red", linestyle="--", label="Selected Alpha")
+    plt.xscale("log")
+    plt.title(f"{model_name}: Cross-Validated Error")
+    plt.xlabel("Alpha")
+    plt.ylabel("Mean Squared Error")
+    plt.legend()
+    plt.grid(True)
+    return plt.gcf()
+
+
+def display_run_regression():
+    """
+    Display the "Run Lasso Regression" button and run the Lasso when clicked.
+    """
+    mode = st.radio("Alpha", ["Fixed alpha", "Cross-validated path"], horizontal=True)
+
+    # Keep the results on screen while alpha is moved along the path
+    if st.button("Run Lasso Regression"):
+        st.session_state["lasso_regression_ran"] = True
+
+    if st.session_state.get("lasso_regression_ran"):
+        if mode == "Fixed alpha":
+            run_lasso_model()
+        else:
+            run_lasso_path_model()
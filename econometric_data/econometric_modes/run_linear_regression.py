@@ -1,40 +1,117 @@
 # regressly/econometric_data/econometric_modes/run_linear_regression.py
 
+import os
 import pandas as pd
-import json
-import statsmodels.api as sm
 import streamlit as st
 import altair as alt
+from econometric_data.cumulative_ols import CumulativeOLS
+from econometric_data.data_cache import cached, selection_key
+from econometric_data.design_matrix import add_constant
+from econometric_data.feature_transforms import apply_transform, keep_derived_columns, transformed_design
+from econometric_data.ols_engine import MultiOLSResult
+from econometric_data.recursive_ols import RecursiveOLS, list_saved_models, refresh_saved_model, save_model
+from econometric_data.session_state import SELECTED_VARIABLES, get_state, set_state
+from econometric_data.subset_selection import CRITERIA, GramSystem, best_subsets, rank_subsets, stepwise
+from econometric_data.timeseries_join import align_time_series, asof_tolerance, complete_rows, display_join_report
 
-def load_and_prepare_linear_data():
+def aligned_selection_key():
     """
-    Load and prepare the data for linear regression from the selected_variables.json file.
+    Cache key of the aligned Step 3 series. The X transforms are left out, so
+    changing them reuses the series already read and joined.
     """
-    with open('econometric_data/selected_variables.json', 'r') as f:
-        selected_data = json.load(f)
+    return selection_key(ignore=("transforms",))
 
-    y_variable = selected_data["y"]["variable"]
-    y_file_path = selected_data["y"]["file_path"]
+@cached(aligned_selection_key)
+def load_aligned_linear_data():
+    """
+    Read each file once, resample to the Step 2 frequency and align every Y and X
+    variable selected in Step 3 on all their dates.
+    """
+    selected_data = get_state(SELECTED_VARIABLES)
+    return align_time_series(
+        [selected_data["y"]] + selected_data.get("additional_y", []) + selected_data["x"],
+        frequency=selected_data.get("frequency"),
+        tolerance=asof_tolerance(selected_data),
+    )
 
-    y_df = pd.read_csv(y_file_path, parse_dates=[selected_data["y"]["date_column"]])
-    y_df.set_index(selected_data["y"]["date_column"], inplace=True)
-    y_data = y_df[y_variable]
+@cached(lambda variable, transform, periods: (aligned_selection_key(), variable, transform, periods))
+def derived_column(variable, transform, periods):
+    """
+    One transformed X column (lag, difference, ...) of the aligned series.
+    """
+    joined, _ = load_aligned_linear_data()
+    return apply_transform(joined[variable], transform, periods)
 
-    x_data = pd.DataFrame(index=y_data.index)
-    for x_var in selected_data["x"]:
-        x_variable = x_var["variable"]
-        x_file_path = x_var["file_path"]
+def load_transformed_design(target_names):
+    """
+    Return the aligned target columns and transformed X columns, the X column
+    names and the columns of each file.
+    """
+    selected_data = get_state(SELECTED_VARIABLES)
+    joined, groups = load_aligned_linear_data()
+    return transformed_design(joined, groups, target_names, selected_data["x"], column=derived_column)
 
-        x_df = pd.read_csv(x_file_path, parse_dates=[x_var["date_column"]])
-        x_df.set_index(x_var["date_column"], inplace=True)
-        x_data[x_variable] = x_df[x_variable]
+@cached(selection_key)
+def load_and_prepare_linear_data():
+    """
+    Load and prepare the data for linear regression from the variables selected in Step 3.
+    """
+    selected_data = get_state(SELECTED_VARIABLES)
+    y_variable = selected_data["y"]["variable"]
 
-    combined_data = pd.concat([y_data, x_data], axis=1).dropna()
+    # Keep the dates where Y and every (transformed) X have a value
+    design, x_variable_names, groups = load_transformed_design([y_variable])
+    combined_data, join_report = complete_rows(design, groups, frequency=selected_data.get("frequency"))
 
     y_data = combined_data[y_variable]
-    x_data = combined_data.drop(columns=[y_variable])
+    x_data = combined_data[x_variable_names]
 
-    return y_data, x_data, y_variable, [x["variable"] for x in selected_data["x"]]
+    return y_data, x_data, y_variable, x_variable_names, join_report
+
+@cached(selection_key)
+def load_cumulative_ols():
+    """
+    Build the date-ordered prefix sums of the selected design once, so OLS over
+    any estimation window is fitted without re-reading or re-slicing the data.
+    """
+    y_data, x_data, y_variable, x_variable_names, join_report = load_and_prepare_linear_data()
+    return CumulativeOLS(y_data, add_constant(x_data).frame()), y_variable, x_variable_names, join_report
+
+@cached(selection_key)
+def load_multi_target_ols():
+    """
+    Regress the dependent variable and every additional one selected in Step 3
+    on the shared X design, over the Step 3 dates where all of them have a value.
+    """
+    selected_data = get_state(SELECTED_VARIABLES)
+    targets = [selected_data["y"]] + selected_data.get("additional_y", [])
+    target_names = list(dict.fromkeys(y["variable"] for y in targets))
+
+    design, x_variable_names, groups = load_transformed_design(target_names)
+    design = design.loc[selected_data.get("start_date"):selected_data.get("end_date")]
+    combined_data, join_report = complete_rows(design, groups, frequency=selected_data.get("frequency"))
+    x_data = add_constant(combined_data[x_variable_names]).frame()
+    return MultiOLSResult(combined_data[target_names], x_data), x_variable_names, join_report
+
+def select_estimation_window(dates):
+    """
+    Let the user narrow the estimation window, starting from the Step 3 dates.
+    """
+    selected_data = get_state(SELECTED_VARIABLES)
+    start_date = max(pd.Timestamp(selected_data.get("start_date", dates[0])), dates[0])
+    end_date = min(pd.Timestamp(selected_data.get("end_date", dates[-1])), dates[-1])
+    options = list(dates)
+    start_date = options[min(dates.searchsorted(start_date), len(options) - 1)]
+    end_date = options[max(dates.searchsorted(end_date, side="right") - 1, 0)]
+    if start_date > end_date:
+        start_date, end_date = options[0], options[-1]
+
+    return st.select_slider(
+        "Estimation window",
+        options=options,
+        value=(start_date, end_date),
+        format_func=lambda date: str(date.date()),
+    )
 
 def plot_regression_results_with_streamlit(y_data, y_pred):
     """
@@ -58,6 +135,25 @@ def plot_regression_results_with_streamlit(y_data, y_pred):
 
     st.altair_chart(chart + line, use_container_width=True)
 
+def plot_coefficient_paths(paths):
+    """
+    Plot each coefficient over the window end dates with its confidence band.
+    """
+    base = alt.Chart().encode(x=alt.X("date:T", title="Window End"))
+    band = base.mark_area(opacity=0.3, color="#1E90FF").encode(
+        y=alt.Y("lower:Q", title="Coefficient"),
+        y2="upper:Q",
+    )
+    line = base.mark_line(color="#1E90FF").encode(
+        y="coefficient:Q",
+        tooltip=["date:T", "variable:N", "coefficient:Q", "std_error:Q", "lower:Q", "upper:Q", "nobs:Q"],
+    )
+
+    chart = alt.layer(band, line, data=paths).properties(height=150).facet(
+        row=alt.Row("variable:N", title=None, sort=list(dict.fromkeys(paths["variable"])))
+    ).resolve_scale(y="independent").interactive()
+    st.altair_chart(chart, use_container_width=True)
+
 def format_regression_results(model, y_variable, x_variable_names):
     """
     Format and display regression results in Streamlit.
@@ -67,7 +163,14 @@ def format_regression_results(model, y_variable, x_variable_names):
     st.markdown(f"<b>Independent Variables:</b> <span style='color: #1E90FF;'>{', '.join(x_variable_names)}</span>", unsafe_allow_html=True)
 
     st.markdown("### Model Summary")
-    st.text(model.summary())
+    summary_df = pd.DataFrame({
+        "Statistic": ["Observations", "R-squared", "Adj. R-squared", "F-statistic", "Prob (F-statistic)", "AIC", "BIC"],
+        "Value": [model.nobs, model.rsquared, model.rsquared_adj, model.fvalue, model.f_pvalue, model.aic, model.bic],
+    })
+    st.dataframe(summary_df)
+    # The full statsmodels summary refits the window, so it is only built on request
+    if st.checkbox("Show full statsmodels summary"):
+        st.text(model.summary())
 
     st.markdown("### Coefficients")
     results_df = pd.DataFrame({
@@ -83,13 +186,151 @@ def run_model():
     """
     Run the linear regression using the prepared data and display results.
     """
-    y_data, x_data, y_variable, x_variable_names = load_and_prepare_linear_data()
-    x_data = sm.add_constant(x_data)
-    linear_model = sm.OLS(y_data, x_data).fit()
+    cumulative_ols, y_variable, x_variable_names, join_report = load_cumulative_ols()
+    display_join_report(join_report)
+    if not len(cumulative_ols.dates):
+        st.error("The dependent and independent variables have no dates in common.")
+        return
+
+    start_date, end_date = select_estimation_window(cumulative_ols.dates)
+    lo, hi = cumulative_ols.window(start_date, end_date)
+    linear_model = cumulative_ols.fit_rows(lo, hi)
 
     format_regression_results(linear_model, y_variable, x_variable_names)
     st.markdown("### Regression Plot")
-    plot_regression_results_with_streamlit(y_data, linear_model.predict(x_data))
+    plot_regression_results_with_streamlit(
+        cumulative_ols.y.iloc[lo:hi], linear_model.predict(cumulative_ols.x.iloc[lo:hi])
+    )
+
+    # Saved models are refreshed with new rows by recursive least squares instead of refitting
+    with st.expander("Save Model"):
+        model_name = st.text_input("Model name", value=y_variable)
+        if st.button("Save Model"):
+            model = RecursiveOLS.from_data(cumulative_ols.y.iloc[lo:hi], cumulative_ols.x.iloc[lo:hi])
+            # A window ending before the last date keeps its end date; refreshes only extend an open one
+            end_date = cumulative_ols.dates[hi - 1].isoformat() if hi < len(cumulative_ols.dates) else None
+            selection = dict(
+                get_state(SELECTED_VARIABLES), start_date=cumulative_ols.dates[lo].isoformat(), end_date=end_date,
+            )
+            save_model(model_name, model, selection)
+            st.success(f"Saved model '{model_name}' fitted up to {model.last_date.date()}.")
+
+def run_multi_target_model():
+    """
+    Fit every selected dependent variable on the same X variables and compare them.
+    """
+    multi_model, x_variable_names, join_report = load_multi_target_ols()
+    display_join_report(join_report)
+    if not multi_model.nobs:
+        st.error("The dependent and independent variables have no dates in common.")
+        return
+
+    st.markdown("<h2 style='color: #4CAF50;'>Multi-Target OLS Comparison</h2>", unsafe_allow_html=True)
+    st.write(f"{len(multi_model.targets)} dependent variables, {multi_model.nobs:,} observations each.")
+    st.dataframe(multi_model.comparison_table())
+
+    target = st.selectbox("Show Results for", options=multi_model.targets)
+    format_regression_results(multi_model.result(target), target, x_variable_names)
+
+# Ways to search the X variables for the best subset
+SELECTION_METHODS = ["Best subset (branch and bound)", "Forward stepwise", "Backward stepwise"]
+
+@cached(lambda lo, hi, method, criterion: (selection_key(), lo, hi, method, criterion))
+def search_variable_subsets(lo, hi, method, criterion):
+    """
+    Search subsets of the selected X variables over rows [lo, hi) of the design,
+    from one X'X of all of them. Returns (ranked subsets table, best subset
+    names, exhaustive).
+    """
+    cumulative_ols, *_ = load_cumulative_ols()
+    if cumulative_ols.constant is None:
+        raise ValueError("Variable selection needs a model with a constant.")
+    system = GramSystem(cumulative_ols.names, *cumulative_ols.window_stats(lo, hi), forced=[cumulative_ols.constant])
+
+    exhaustive = True
+    if method == "Forward stepwise":
+        subsets = [stepwise(system, criterion, "forward")]
+    elif method == "Backward stepwise":
+        subsets = [stepwise(system, criterion, "backward")]
+    else:
+        subsets, _, exhaustive = best_subsets(system, criterion)
+    best_names = [system.names[j] for j in subsets[0]]
+    return rank_subsets(system, subsets), best_names, exhaustive
+
+def run_variable_selection():
+    """
+    Rank subsets of the selected X variables by an information criterion and
+    let the user keep the best one.
+    """
+    cumulative_ols, y_variable, x_variable_names, join_report = load_cumulative_ols()
+    display_join_report(join_report)
+    if not len(cumulative_ols.dates):
+        st.error("The dependent and independent variables have no dates in common.")
+        return
+
+    start_date, end_date = select_estimation_window(cumulative_ols.dates)
+    lo, hi = cumulative_ols.window(start_date, end_date)
+    method = st.selectbox("Search", options=SELECTION_METHODS)
+    criterion = st.selectbox("Rank by", options=CRITERIA)
+
+    ranked, best_names, exhaustive = search_variable_subsets(lo, hi, method, criterion)
+    st.markdown(f"<h2 style='color: #4CAF50;'>Variable Subsets for {y_variable}</h2>", unsafe_allow_html=True)
+    st.write(f"{len(x_variable_names)} candidate variables, ranked by {criterion}.")
+    if not exhaustive:
+        st.warning("The search hit its node limit, so better subsets than these may exist.")
+    st.dataframe(ranked)
+
+    if st.button("Use Best Subset"):
+        selected_data = get_state(SELECTED_VARIABLES)
+        selected_data["x"] = keep_derived_columns(selected_data["x"], best_names)
+        set_state(SELECTED_VARIABLES, selected_data)
+        st.success(f"Independent variables set to: {', '.join(best_names) or 'none (constant only)'}.")
+
+def display_saved_models():
+    """
+    Refresh every saved linear model with the rows added to its files since it
+    was last updated.
+    """
+    paths = list_saved_models()
+    if not paths:
+        return
+
+    st.markdown("### Saved Models")
+    check_drift = st.checkbox(
+        "Check drift against a full refit",
+        help="Refit each model on all its rows and rebuild the recursive state if the estimates have drifted.",
+    )
+    if st.button("Refresh Saved Models"):
+        refreshed = []
+        for path in paths:
+            try:
+                refreshed.append(refresh_saved_model(path, check_drift=check_drift))
+            except Exception as e:
+                st.error(f"Could not refresh {os.path.basename(path)}: {e}")
+        st.dataframe(pd.DataFrame(refreshed))
+
+def run_rolling_model(window=None):
+    """
+    Fit the linear regression over every rolling window of `window` periods (or
+    an expanding window) and chart the coefficient paths.
+    """
+    cumulative_ols, y_variable, x_variable_names, join_report = load_cumulative_ols()
+    display_join_report(join_report)
+
+    paths = cumulative_ols.rolling_fits(window)
+    if paths.empty:
+        st.error(
+            f"Not enough dates for a {window}-period window with {len(cumulative_ols.names)} coefficients."
+            if window else "Not enough dates to estimate the regression."
+        )
+        return
+
+    title = f"{window}-Period Rolling" if window else "Expanding Window"
+    st.markdown(f"<h2 style='color: #4CAF50;'>{title} OLS Coefficients</h2>", unsafe_allow_html=True)
+    st.markdown(f"<b>Dependent Variable:</b> <span style='color: #FF5733;'>{y_variable}</span>", unsafe_allow_html=True)
+    st.markdown(f"<b>Independent Variables:</b> <span style='color: #1E90FF;'>{', '.join(x_variable_names)}</span>", unsafe_allow_html=True)
+    st.write(f"{paths['date'].nunique():,} windows, shaded bands are 95% confidence intervals.")
+    plot_coefficient_paths(paths)
 
 def display_run_regression():
     """
@@ -97,8 +338,31 @@ def display_run_regression():
     """
     st.header("Run Linear Regression")
 
+    selected_data = get_state(SELECTED_VARIABLES, {})
+    frequency = selected_data.get("frequency") or "date"
+    modes = ["Single window", "Rolling window", "Expanding window", "Variable selection"]
+    if selected_data.get("additional_y"):
+        modes.append("All dependent variables")
+    mode = st.radio("Estimation", modes, horizontal=True)
+    window = None
+    if mode == "Rolling window":
+        window = int(st.number_input(f"Window length ({frequency.lower()} periods)", min_value=2, value=60))
+
+    # Keep the results on screen while the estimation window is changed
     if st.button("Run Regression"):
+        st.session_state["linear_regression_ran"] = True
+
+    if st.session_state.get("linear_regression_ran"):
         try:
-            run_model()
+            if mode == "Single window":
+                run_model()
+            elif mode == "All dependent variables":
+                run_multi_target_model()
+            elif mode == "Variable selection":
+                run_variable_selection()
+            else:
+                run_rolling_model(window)
         except Exception as e:
             st.error(f"An error occurred while running the regression: {e}")
+
+    display_saved_models()
@@ -1,53 +1,31 @@
 # regressly/econometric_data/econometric_modes/run_logistic_regression.py
 
-import pandas as pd
-import json
 import statsmodels.api as sm
 import streamlit as st
 import matplotlib.pyplot as plt
+from econometric_data.columnar_cache import read_columns
+from econometric_data.data_cache import cached, selection_key
+from econometric_data.design_matrix import build_design
+from econometric_data.session_state import SELECTED_VARIABLES, get_state
 
 
+@cached(selection_key)
 def load_and_prepare_logistic_data():
     """
-    Load and prepare the logistic regression data from the selected_variables.json file.
+    Load and prepare the logistic regression data from the variables selected in Step 3.
     """
-    # Load selected variables from the JSON file
-    with open('econometric_data/selected_variables.json', 'r') as f:
-        selected_data = json.load(f)
+    # Load the selected variables of this session
+    selected_data = get_state(SELECTED_VARIABLES)
 
-    # Load the CSV file once
+    # Load only the selected columns once
     file_path = selected_data["y"]["file_path"]
-    df = pd.read_csv(file_path)
+    columns = [selected_data["y"]["variable"]] + [x_var["variable"] for x_var in selected_data["x"]]
+    df = read_columns(file_path, columns)
 
-    # Load the dependent variable (Y)
+    # Build the design with its intercept in one buffer, dropping rows with missing values
     y_variable = selected_data["y"]["variable"]
-    y_data = df[y_variable].astype(int)  # Ensure binary target is numeric
-
-    # Initialize a DataFrame for X variables
-    x_data = pd.DataFrame()
-
-    # Process independent variables (X)
-    for x_var in selected_data["x"]:
-        x_column = x_var["variable"]
-
-        if x_var["type"] == "categorical":
-            # Binary or one-hot encoding for categorical columns
-            unique_values = df[x_column].unique()
-            if len(unique_values) == 2:
-                mapping = {unique_values[0]: 0, unique_values[1]: 1}
-                x_data[x_column] = df[x_column].map(mapping)
-            else:
-                x_encoded = pd.get_dummies(df[x_column], prefix=x_column, drop_first=True)
-                x_data = pd.concat([x_data, x_encoded], axis=1)
-        else:
-            x_data[x_column] = df[x_column]
-
-    # Drop rows with missing values
-    combined_data = pd.concat([y_data, x_data], axis=1).dropna()
-
-    # Separate Y and X after alignment
-    y_data = combined_data[y_variable]
-    x_data = combined_data.drop(columns=[y_variable])
+    y_data, x_data = build_design(df, selected_data["x"], y_variable, binary_as_column=True, sparse=False, constant=True)
+    y_data = y_data.astype(int)  # Ensure binary target is numeric
 
     return y_data, x_data
 
@@ -60,8 +38,8 @@ def display_run_regression():
         # Load and prepare data
         y_data, x_data = load_and_prepare_logistic_data()
 
-        # Add a constant for the intercept
-        x_data = sm.add_constant(x_data)
+        # The design already holds the intercept; statsmodels reads its buffer
+        x_data = x_data.frame()
 
         # Run the logistic regression
         logit_model = sm.Logit(y_data, x_data).fit()
@@ -2,54 +2,37 @@
 
 
 import pandas as pd
-import json
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
+from econometric_data.categorical_encoding import column_summary
+from econometric_data.columnar_cache import read_columns
+from econometric_data.data_cache import cached, selection_key
+from econometric_data.design_matrix import build_design
+from econometric_data.session_state import SELECTED_VARIABLES, get_state
 
+# Features drawn in the importance plot; one-hot or hashed designs can have thousands
+MAX_PLOTTED_FEATURES = 30
 
+
+@cached(selection_key)
 def load_and_prepare_rf_classification_data():
     """
-    Load and prepare the Random Forest Classification data from the selected_variables.json file.
+    Load and prepare the Random Forest Classification data from the variables selected in Step 3.
     """
-    # Load the selected variables from the JSON file
-    with open('econometric_data/selected_variables.json', 'r') as f:
-        selected_data = json.load(f)
+    # Load the selected variables of this session
+    selected_data = get_state(SELECTED_VARIABLES)
 
-    # Load the dataset
+    # Load only the selected columns of the dataset
     file_path = selected_data["y"]["file_path"]
-    df = pd.read_csv(file_path)
+    columns = [selected_data["y"]["variable"]] + [x_var["variable"] for x_var in selected_data["x"]]
+    df = read_columns(file_path, columns)
 
-    # Dependent variable (Y)
+    # Encode the X variables into a sparse design, dropping rows with missing values
     y_variable = selected_data["y"]["variable"]
-    y_data = df[y_variable]
-
-    # Initialize DataFrame for X variables
-    x_data = pd.DataFrame()
-
-    # Process X variables
-    for x_var in selected_data["x"]:
-        x_column = x_var["variable"]
-
-        if x_var["type"] == "categorical":
-            # One-hot encoding for categorical variables
-            encoder = OneHotEncoder(drop="first", sparse_output=False)
-            encoded_columns = encoder.fit_transform(df[[x_column]])
-            encoded_df = pd.DataFrame(encoded_columns, columns=encoder.get_feature_names_out([x_column]))
-            x_data = pd.concat([x_data, encoded_df], axis=1)
-        else:
-            # Continuous variables
-            x_data[x_column] = df[x_column]
-
-    # Drop rows with missing values
-    combined_data = pd.concat([y_data, x_data], axis=1).dropna()
-
-    # Separate Y and X after alignment
-    y_data = combined_data[y_variable]
-    x_data = combined_data.drop(columns=[y_variable])
+    y_data, x_data = build_design(df, selected_data["x"], y_variable, selected_data.get("encoding"))
 
     # Get n_estimators from JSON
     n_estimators = selected_data["parameters"]["n_estimators"]
@@ -70,15 +53,15 @@ def display_run_classification():
 
             st.write("### Model Inputs:")
             st.write(f"- **Dependent Variable (Y):** {y_data.name}")
-            st.write(f"- **Independent Variables (X):** {', '.join(x_data.columns)}")
+            st.write(f"- **Independent Variables (X):** {column_summary(x_data.columns)}")
             st.write(f"- **Number of Trees (n_estimators):** {n_estimators}")
 
             # Create and fit the Random Forest Classifier
             rf_classifier = RandomForestClassifier(n_estimators=n_estimators, random_state=42)
-            rf_classifier.fit(x_data, y_data)
+            rf_classifier.fit(x_data.matrix, y_data)
 
             # Make predictions
-            y_pred = rf_classifier.predict(x_data)
+            y_pred = rf_classifier.predict(x_data.matrix)
 
             # Calculate metrics
             accuracy = accuracy_score(y_data, y_pred)
@@ -115,12 +98,13 @@ def plot_confusion_matrix(y_data, y_pred):
 
 def plot_feature_importances(model, x_data):
     """
-    Plot the feature importances from the Random Forest model.
+    Plot the feature importances from the Random Forest model, the
+    MAX_PLOTTED_FEATURES most important when there are more.
     """
     importances = model.feature_importances_
     features = x_data.columns
     importance_df = pd.DataFrame({"Feature": features, "Importance": importances})
-    importance_df = importance_df.sort_values(by="Importance", ascending=False)
+    importance_df = importance_df.sort_values(by="Importance", ascending=False).head(MAX_PLOTTED_FEATURES)
 
     plt.figure(figsize=(10, 6))
     plt.barh(importance_df["Feature"], importance_df["Importance"], color="#1E90FF")
@@ -0,0 +1,104 @@
+# regressly/econometric_data/econometric_modes/run_ridge_regression.py
+
+import numpy as np
+import streamlit as st
+import matplotlib.pyplot as plt
+from econometric_data.categorical_encoding import column_summary
+from econometric_data.data_cache import cached, selection_key
+from econometric_data.ridge_path import RidgePath
+from econometric_data.session_state import SELECTED_VARIABLES, get_state
+from econometric_data.econometric_modes.run_lasso_regression import (
+    MAX_PLOTTED_FEATURES, display_lasso_results, load_and_prepare_penalized_data,
+)
+
+# One decomposition serves every alpha, so changing alpha in Step 3 reuses it
+@cached(lambda: selection_key(ignore=("alpha",)))
+def load_ridge_path():
+    """
+    Decompose the design selected in Step 3 once and score the alpha grid by GCV.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    return RidgePath(y_data, x_data.matrix, x_data.columns)
+
+
+def run_ridge_model(use_gcv=False):
+    """
+    Show the Ridge fit at the Step 3 alpha, or at an alpha picked on the GCV
+    grid. Either is computed in closed form from the cached decomposition.
+    """
+    y_data, x_data = load_and_prepare_penalized_data()
+    path = load_ridge_path()
+
+    st.write("### Running Ridge Regression")
+    st.write(f"**Dependent Variable (Y):** {y_data.name}")
+    st.write(f"**Independent Variables (X):** {column_summary(x_data.columns)}")
+
+    if use_gcv:
+        st.write(f"Generalized cross-validation picks alpha = {path.alpha_gcv:.4g}.")
+        positions = list(range(len(path.alphas)))
+        position = st.select_slider(
+            "Alpha",
+            options=positions,
+            value=path.index(path.alpha_gcv),
+            format_func=lambda i: f"{path.alphas[i]:.4g}",
+        )
+        alpha = path.alphas[position]
+        st.pyplot(plot_ridge_trace(path, alpha))
+        st.pyplot(plot_gcv(path, alpha))
+    else:
+        alpha = get_state(SELECTED_VARIABLES)["alpha"]
+    st.write(f"**Alpha Value:** {alpha:.4g} ({path.effective_df(alpha):.1f} effective degrees of freedom)")
+
+    display_lasso_results(y_data, path.predict(x_data.matrix, alpha), path.coefficients(alpha), "Ridge Regression")
+
+
+def plot_ridge_trace(path, alpha):
+    """
+    Plot the coefficients against alpha, marking the selected alpha. Only the
+    MAX_PLOTTED_FEATURES coefficients that grow largest along the grid are drawn.
+    """
+    plt.figure(figsize=(10, 6))
+    largest = np.argsort(-np.abs(path.coefs).max(axis=0))[:MAX_PLOTTED_FEATURES]
+    for j in sorted(largest):
+        plt.plot(path.alphas, path.coefs[:, j], label=path.names[j])
+    plt.axvline(alpha, color="red", linestyle="--", label="Selected Alpha")
+    plt.xscale("log")
+    plt.title("Ridge Regression: Coefficient Path")
+    plt.xlabel("Alpha")
+    plt.ylabel("Coefficient Value")
+    if len(largest) <= 15:
+        plt.legend()
+    plt.grid(True)
+    return plt.gcf()
+
+
+def plot_gcv(path, alpha):
+    """
+    Plot the generalized cross-validation score against alpha.
+    """
+    plt.figure(figsize=(10, 6))
+    plt.plot(path.alphas, path.gcv_scores, color="#1E90FF", label="GCV Score")
+    plt.axvline(path.alpha_gcv, color="green", linestyle=":", label="Minimum GCV")
+    plt.axvline(alpha, color="red", linestyle="--", label="Selected Alpha")
+    plt.xscale("log")
+    plt.yscale("log")
+    plt.title("Ridge Regression: Generalized Cross-Validation")
+    plt.xlabel("Alpha")
+    plt.ylabel("GCV Score")
+    plt.legend()
+    plt.grid(True)
+    return plt.gcf()
+
+
+def display_run_regression():
+    """
+    Display the "Run Ridge Regression" button and run the Ridge when clicked.
+    """
+    mode = st.radio("Alpha", ["Fixed alpha", "Generalized cross-validation"], horizontal=True)
+
+    # Keep the results on screen while alpha is moved along the grid
+    if st.button("Run Ridge Regression"):
+        st.session_state["ridge_regression_ran"] = True
+
+    if st.session_state.get("ridge_regression_ran"):
+        run_ridge_model(use_gcv=mode == "Generalized cross-validation")
@@ -0,0 +1,180 @@
+# regressly/econometric_data/feature_transforms.py
+
+import numpy as np
+import pandas as pd
+from econometric_data.dataset_catalog import infer_frequency
+from econometric_data.timeseries_join import align_time_series, asof_tolerance, complete_rows
+
+# Transform choices offered per X variable: label -> (transform, periods). Periods are
+# periods of the variable's own frequency (trading days for business-daily data).
+TRANSFORM_OPTIONS = {
+    "level": ("level", 0),
+    "lag 1": ("lag", 1),
+    "lag 2": ("lag", 2),
+    "lag 3": ("lag", 3),
+    "lag 6": ("lag", 6),
+    "lag 12": ("lag", 12),
+    "lead 1": ("lead", 1),
+    "diff": ("diff", 1),
+    "log diff": ("logdiff", 1),
+    "rolling mean 3": ("rolling_mean", 3),
+    "rolling mean 6": ("rolling_mean", 6),
+    "rolling mean 12": ("rolling_mean", 12),
+}
+
+DEFAULT_TRANSFORMS = [{"transform": "level", "periods": 0}]
+
+# Period of each inferred frequency that a regular series is shifted along
+PERIOD_FREQUENCIES = {
+    "Daily": "D",
+    "Weekly": "W",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Annually": "Y",
+}
+
+
+def transform_specs(labels):
+    """Turn TRANSFORM_OPTIONS labels into the transform entries saved with a selection."""
+    return [{"transform": TRANSFORM_OPTIONS[label][0], "periods": TRANSFORM_OPTIONS[label][1]} for label in labels]
+
+
+def transform_label(spec):
+    """Return the TRANSFORM_OPTIONS label of a saved transform entry."""
+    return next(
+        label for label, option in TRANSFORM_OPTIONS.items() if option == (spec["transform"], spec["periods"])
+    )
+
+
+def derived_name(variable, transform, periods):
+    """Return the column name of a transformed variable, e.g. UNRATE_lag3."""
+    suffix = {
+        "level": "",
+        "lag": f"_lag{periods}",
+        "lead": f"_lead{periods}",
+        "diff": "_diff" if periods == 1 else f"_diff{periods}",
+        "logdiff": "_logdiff" if periods == 1 else f"_logdiff{periods}",
+        "rolling_mean": f"_ma{periods}",
+    }[transform]
+    return f"{variable}{suffix}"
+
+
+def transform_base(series):
+    """
+    Return (base, dates, keys): the series a transform shifts along, the dates
+    its result is read back at, and the labels of those dates in `base`.
+
+    Daily data never observed at a weekend is business-daily: it is shifted
+    over its own observations, so a lag is the previous trading day. Data of
+    another regular frequency is placed on every period of that frequency, so
+    a missing month stays a gap and "lag 1" is never two months back.
+    Irregular data is shifted along the aligned dates as given.
+    """
+    observed = series.dropna()
+    label, _ = infer_frequency(observed.index)
+    if label == "Daily" and not np.any(observed.index.dayofweek >= 5):
+        return observed, observed.index, observed.index
+    keys = observed.index.to_period(PERIOD_FREQUENCIES[label]) if label else None
+    if keys is None or keys.has_duplicates:
+        return series, series.index, series.index
+    base = pd.Series(observed.to_numpy(), index=keys, name=series.name)
+    return base.reindex(pd.period_range(keys.min(), keys.max(), freq=keys.freq)), observed.index, keys
+
+
+def apply_transform(series, transform, periods):
+    """
+    Compute one transform of a date-ordered series as a vectorized column operation.
+
+    Shifts, differences and rolling means run along the base of
+    transform_base() and are read back at the series' dates.
+    """
+    base, dates, keys = transform_base(series)
+    if transform == "level":
+        values = base
+    elif transform == "lag":
+        values = base.shift(periods)
+    elif transform == "lead":
+        values = base.shift(-periods)
+    elif transform == "diff":
+        values = base.diff(periods)
+    elif transform == "logdiff":
+        # Non-positive values have no logarithm; their rows are dropped with the other gaps
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.log(base.where(base > 0)).diff(periods)
+    elif transform == "rolling_mean":
+        values = base.rolling(periods).mean()
+    else:
+        raise ValueError(f"Unknown transform '{transform}' for {series.name}")
+    values = pd.Series(values.reindex(keys).to_numpy(), index=dates)
+    return values.reindex(series.index).rename(derived_name(series.name, transform, periods))
+
+
+def variable_transforms(entry):
+    """Return the (transform, periods) pairs declared for one X selection entry."""
+    return [(spec["transform"], spec["periods"]) for spec in entry.get("transforms") or DEFAULT_TRANSFORMS]
+
+
+def transformed_design(joined, groups, targets, x_entries, column=None):
+    """
+    Build the columns of a regression from an aligned frame: the target columns
+    followed by every transform of every X variable.
+
+    `column(variable, transform, periods)` returns one derived column and
+    defaults to computing it from `joined`; pass a cached function to reuse
+    derived columns. Returns (frame, x names, groups) where groups maps each
+    file to its columns in the frame, for complete_rows(). Raises ValueError
+    when an X column would take the name of a target (a target's own level).
+    """
+    if column is None:
+        column = lambda variable, transform, periods: apply_transform(joined[variable], transform, periods)
+
+    derived = {}
+    source = {}
+    for entry in x_entries:
+        for transform, periods in variable_transforms(entry):
+            name = derived_name(entry["variable"], transform, periods)
+            derived[name] = column(entry["variable"], transform, periods)
+            source[name] = entry["variable"]
+
+    clashes = [name for name in derived if name in targets]
+    if clashes:
+        raise ValueError(f"X columns with the same name as a dependent variable: {', '.join(clashes)}")
+
+    frame = pd.concat([joined[targets]] + list(derived.values()), axis=1)
+    design_groups = {
+        file_key: [name for name in frame.columns if source.get(name, name) in columns]
+        for file_key, columns in groups.items()
+    }
+    return frame, list(derived), design_groups
+
+
+def keep_derived_columns(x_entries, names):
+    """Return the X selection entries restricted to the transforms whose columns are in `names`."""
+    kept = []
+    for entry in x_entries:
+        transforms = [
+            {"transform": transform, "periods": periods}
+            for transform, periods in variable_transforms(entry)
+            if derived_name(entry["variable"], transform, periods) in names
+        ]
+        if transforms:
+            kept.append(dict(entry, transforms=transforms))
+    return kept
+
+
+def load_transformed_data(selected_data, target_names, start_date=None, end_date=None):
+    """
+    Read, align and transform a Step 3 selection, keeping the dates in
+    [start_date, end_date] where every target and X column has a value.
+
+    Returns (data, x names, join report).
+    """
+    targets = [selected_data["y"]] + selected_data.get("additional_y", [])
+    joined, groups = align_time_series(
+        [entry for entry in targets if entry["variable"] in target_names] + selected_data["x"],
+        frequency=selected_data.get("frequency"),
+        tolerance=asof_tolerance(selected_data),
+    )
+    design, x_names, groups = transformed_design(joined, groups, target_names, selected_data["x"])
+    data, report = complete_rows(design.loc[start_date:end_date], groups, frequency=selected_data.get("frequency"))
+    return data, x_names, report
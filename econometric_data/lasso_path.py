@@ -0,0 +1,239 @@
+# regressly/econometric_data/lasso_path.py
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.linear_model import enet_path
+from sklearn.model_selection import KFold
+from econometric_data.parallel_ingest import default_worker_count
+
+# The path has PATH_ALPHAS log-spaced alphas from the smallest one that zeroes every
+# coefficient down to PATH_EPS times it, as in scikit-learn's LassoCV
+PATH_ALPHAS = 100
+PATH_EPS = 1e-3
+CV_FOLDS = 5
+
+# Coordinate-descent tolerance on the duality gap, relative to y'y, of every solve.
+# scikit-learn's 1e-4 leaves coefficients about 1e-2 from the optimum at small alphas
+PATH_TOL = 1e-6
+
+# Sparse designs, and dense ones with more columns than rows, at least this wide
+# are fitted with strong-rule screening (tall dense ones do better on the Gram matrix)
+SCREENING_MIN_FEATURES = 200
+
+# Alphas on the warm-started path leading to a single alpha on wide designs
+FIXED_ALPHA_STEPS = 20
+
+
+def alpha_grid(x, y, n_alphas=PATH_ALPHAS, eps=PATH_EPS, l1_ratio=1.0):
+    """Return the decreasing alpha grid of a Lasso (or Elastic Net, with `l1_ratio`) path on (x, y)."""
+    # Centring y is enough: the centred y sums to zero, so x needs no centring
+    alpha_max = np.max(np.abs(x.T @ (y - y.mean()))) / (len(y) * l1_ratio) if x.shape[1] else 0.0
+    if alpha_max <= 0:
+        alpha_max = 1.0  # Nothing correlates with y: every alpha gives the intercept-only fit
+    return np.geomspace(alpha_max, alpha_max * eps, n_alphas)
+
+
+def _screened(x):
+    """Return whether the path on design `x` is fitted through screened_path."""
+    return x.shape[1] >= SCREENING_MIN_FEATURES and (sp.issparse(x) or x.shape[1] > x.shape[0])
+
+
+def _gradient(x, x_mean, residual):
+    """Return |x_j' r| / n for every centred column of x (x_mean is zero when x is already centred)."""
+    return np.abs(x.T @ residual - x_mean * residual.sum()) / len(residual)
+
+
+def _extend_columns(x, block, columns):
+    """
+    Return `block` (x at some columns) with the columns `columns` of x appended.
+
+    A dense block is a view of the leading columns of a Fortran-ordered buffer
+    whose capacity doubles when it fills, so growing the working set copies
+    each column O(1) times.
+    """
+    if sp.issparse(x):
+        return sp.hstack([block, x[:, columns]], format="csc")
+    width = block.shape[1]
+    buffer = block.base if block.base is not None else block
+    if buffer.shape[1] < width + len(columns):
+        grown = np.empty((x.shape[0], min(x.shape[1], max(2 * buffer.shape[1], width + len(columns)))), order="F")
+        grown[:, :width] = block
+        buffer = grown
+    buffer[:, width:width + len(columns)] = x[:, columns]
+    return buffer[:, :width + len(columns)]
+
+
+def _solve_block(block, y, block_mean, alpha, coef, l1_ratio, tol=PATH_TOL):
+    """Solve the Lasso at one alpha on the columns of `block` only, warm-started from `coef`."""
+    if not block.shape[1]:
+        return coef
+    # precompute=False: the Gram matrix of a growing block would be rebuilt at every alpha
+    if sp.issparse(block):
+        _, coefs, _ = enet_path(
+            block, y, l1_ratio=l1_ratio, alphas=[alpha], coef_init=coef, check_input=False,
+            precompute=False, tol=tol, X_offset=block_mean, X_scale=np.ones(block.shape[1]),
+        )
+    else:
+        _, coefs, _ = enet_path(
+            block, y, l1_ratio=l1_ratio, alphas=[alpha], coef_init=coef, check_input=False,
+            precompute=False, tol=tol,
+        )
+    return coefs[:, 0]
+
+
+def screened_path(x, y, alphas, x_mean, l1_ratio=1.0, tol=PATH_TOL):
+    """
+    Fit a Lasso path (centred y, no intercept) with sequential strong rules.
+
+    Before each alpha, a column is discarded when |x_j' r| / n at the
+    previous alpha is below 2 alpha - previous alpha (both scaled by
+    `l1_ratio` for an Elastic Net). Coordinate descent only sees the working
+    set: every column that has passed the rule at some alpha so far, held in
+    one buffer that grows by the new columns. The KKT conditions
+    |x_j' r| / n <= l1_ratio alpha are then checked on all other columns
+    with one X'r product, which also serves the next alpha's rule; violators
+    join the working set and the alpha is solved again. `x` is a centred
+    dense array, or a CSC matrix with column means `x_mean`.
+    Returns the coefficients (n_alphas, k).
+    """
+    coefs = np.zeros((len(alphas), x.shape[1]))
+    working = np.zeros(0, dtype=np.intp)
+    in_working = np.zeros(x.shape[1], dtype=bool)
+    block = x[:, working] if sp.issparse(x) else np.empty((x.shape[0], 0), order="F")
+    coef = np.zeros(0)
+    gradient = _gradient(x, x_mean, y)
+    previous = gradient.max() / l1_ratio
+    for i, alpha in enumerate(alphas):
+        new = np.flatnonzero(~in_working & (gradient >= l1_ratio * (2 * alpha - previous)))
+        while True:
+            if len(new):
+                block = _extend_columns(x, block, new)
+                working = np.concatenate([working, new])
+                in_working[new] = True
+                coef = np.concatenate([coef, np.zeros(len(new))])
+            coef = _solve_block(block, y, x_mean[working], alpha, coef, l1_ratio, tol)
+            residual = y - (block @ coef - x_mean[working] @ coef)
+            gradient = _gradient(x, x_mean, residual)
+            new = np.flatnonzero(~in_working & (gradient > l1_ratio * alpha))
+            if not len(new):
+                break
+        coefs[i, working] = coef
+        previous = alpha
+    return coefs
+
+
+def fit_path(x, y, alphas, l1_ratio=1.0, tol=PATH_TOL):
+    """
+    Fit Lasso(alpha) with an intercept for every alpha of a decreasing grid,
+    or ElasticNet(alpha, l1_ratio) when `l1_ratio` is below 1.
+
+    The data are centred as Lasso does (a sparse x through its column means,
+    without densifying it), and each coordinate-descent solve is warm-started
+    from the previous alpha's coefficients to within `tol`. Wide designs (see
+    SCREENING_MIN_FEATURES) are fitted through screened_path.
+    Returns (coefficients (n_alphas, k), intercepts (n_alphas,)).
+    """
+    y_mean = y.mean()
+    sparse = sp.issparse(x)
+    x_mean = np.asarray(x.mean(axis=0)).ravel()
+    if _screened(x):
+        x_screened = x.tocsc() if sparse else x - x_mean
+        offsets = x_mean if sparse else np.zeros(x.shape[1])
+        coefs = screened_path(x_screened, y - y_mean, alphas, offsets, l1_ratio, tol)
+    else:
+        if sparse:
+            _, coefs, _ = enet_path(
+                x, y - y_mean, l1_ratio=l1_ratio, alphas=alphas, tol=tol,
+                X_offset=x_mean, X_scale=np.ones(x.shape[1]),
+            )
+        else:
+            _, coefs, _ = enet_path(x - x_mean, y - y_mean, l1_ratio=l1_ratio, alphas=alphas, tol=tol)
+        coefs = coefs.T
+    return coefs, y_mean - coefs @ x_mean
+
+
+def fit_lasso(x, y, alpha, l1_ratio=1.0, tol=PATH_TOL):
+    """
+    Fit Lasso(alpha), or ElasticNet(alpha, l1_ratio), with an intercept. Wide
+    designs get there along a short warm-started, screened path from the
+    largest useful alpha.
+    Returns (coefficients, intercept).
+    """
+    x = x.tocsr() if sp.issparse(x) else np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    alphas = [alpha]
+    if _screened(x):
+        alpha_max = alpha_grid(x, y, n_alphas=1, l1_ratio=l1_ratio)[0]
+        if alpha < alpha_max:
+            alphas = np.geomspace(alpha_max, alpha, FIXED_ALPHA_STEPS)
+    coefs, intercepts = fit_path(x, y, alphas, l1_ratio, tol)
+    return coefs[-1], float(intercepts[-1])
+
+
+def _fold_errors(x, y, train, test, alphas, l1_ratio, tol):
+    """Mean squared test error of every alpha of the path fitted on one training fold."""
+    coefs, intercepts = fit_path(x[train], y[train], alphas, l1_ratio, tol)
+    predictions = x[test] @ coefs.T + intercepts
+    return np.mean((y[test, None] - predictions) ** 2, axis=0)
+
+
+class LassoPath:
+    """
+    Lasso coefficients over a whole alpha grid, with k-fold cross-validation.
+
+    The full-sample path and one path per fold are each fitted with warm
+    starts. The folds run in a thread pool, since the coordinate-descent
+    solver releases the GIL. Any alpha on the grid is then a lookup; alpha_min
+    minimises the CV error and alpha_1se is the largest alpha within one
+    standard error of it. `x` is a dense array or a SciPy sparse matrix
+    whose columns are `names`. With `l1_ratio` below 1 the path is that of
+    an Elastic Net, which mixes the L1 penalty with a ridge (L2) one.
+    """
+
+    def __init__(self, y, x, names, n_folds=CV_FOLDS, max_workers=None, l1_ratio=1.0, tol=PATH_TOL):
+        self.names = list(names)
+        self.l1_ratio = l1_ratio
+        x_values = x.tocsr() if sp.issparse(x) else np.asarray(x, dtype=float)
+        y_values = np.asarray(y, dtype=float)
+        self.nobs = len(y_values)
+        self.alphas = alpha_grid(x_values, y_values, l1_ratio=l1_ratio)
+        self.coefs, self.intercepts = fit_path(x_values, y_values, self.alphas, l1_ratio, tol)
+
+        folds = list(KFold(max(2, min(n_folds, self.nobs))).split(x_values))
+        with ThreadPoolExecutor(max_workers or default_worker_count()) as pool:
+            errors = list(pool.map(
+                lambda fold: _fold_errors(x_values, y_values, *fold, self.alphas, l1_ratio, tol), folds
+            ))
+        self.cv_errors = np.array(errors)
+        self.cv_mean = self.cv_errors.mean(axis=0)
+        self.cv_se = self.cv_errors.std(axis=0, ddof=1) / np.sqrt(len(folds))
+
+        best = int(np.argmin(self.cv_mean))
+        self.alpha_min = self.alphas[best]
+        within = self.cv_mean <= self.cv_mean[best] + self.cv_se[best]
+        self.alpha_1se = self.alphas[int(np.argmax(within))]  # Alphas decrease, so the first is the largest
+
+    def __sizeof__(self):
+        return self.alphas.nbytes + self.coefs.nbytes + self.intercepts.nbytes + self.cv_errors.nbytes
+
+    def index(self, alpha):
+        """Return the position on the grid of the alpha closest to `alpha` (on a log scale)."""
+        return int(np.argmin(np.abs(np.log(self.alphas) - np.log(alpha))))
+
+    def coefficients(self, alpha):
+        """Return the coefficients at an alpha of the grid as a Series."""
+        return pd.Series(self.coefs[self.index(alpha)], index=self.names)
+
+    def intercept(self, alpha):
+        return float(self.intercepts[self.index(alpha)])
+
+    def predict(self, x, alpha):
+        """Return the fitted values of the rows of a design matrix at an alpha of the grid."""
+        i = self.index(alpha)
+        return np.asarray(x @ self.coefs[i]).ravel() + self.intercepts[i]
+
+    def nonzero_counts(self):
+        """Return the number of non-zero coefficients at every alpha of the grid."""
+        return np.count_nonzero(self.coefs, axis=1)
@@ -0,0 +1,194 @@
+# regressly/econometric_data/lead_lag_screening.py
+
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from scipy import stats
+from econometric_data.dataset_catalog import load_catalog
+from econometric_data.parallel_ingest import default_worker_count
+from econometric_data.timeseries_join import align_time_series
+
+# Screens of fewer series than this run in-process; worker start-up would dominate
+PROCESS_POOL_MIN_SERIES = 64
+
+
+def cross_correlations(y, x, max_lag):
+    """
+    Return corr(y_t, x_{t-lag}) for lag = 1..max_lag, from one set of FFTs.
+
+    Each is the Pearson correlation over the dates where both y_t and x_{t-lag}
+    have a value, as np.corrcoef of those pairs gives; the pair counts, sums and
+    sums of squares of every lag are cross-correlations of the masked series.
+    Lags with under 3 pairs, or no variation in them, are NaN.
+    """
+    correlations = np.full(max_lag, np.nan)
+    y_observed, x_observed = ~np.isnan(y), ~np.isnan(x)
+    if y_observed.sum() < 3 or x_observed.sum() < 3:
+        return correlations
+    # Centred first, so the sums of squares below do not cancel
+    y_dev = np.where(y_observed, y - y[y_observed].mean(), 0.0)
+    x_dev = np.where(x_observed, x - x[x_observed].mean(), 0.0)
+
+    size = 1 << int(2 * len(y) - 1).bit_length()
+    y_terms = np.fft.rfft(np.stack([y_observed.astype(float), y_dev, y_dev * y_dev]), size)
+    x_terms = np.conj(np.fft.rfft(np.stack([x_observed.astype(float), x_dev, x_dev * x_dev]), size))
+    pairs = [(0, 0), (1, 0), (2, 0), (0, 1), (0, 2), (1, 1)]
+    lags = min(max_lag, len(y) - 1)
+    sums = np.fft.irfft(np.stack([y_terms[i] * x_terms[j] for i, j in pairs]), size)[:, 1:lags + 1]
+    count, y_sum, y_squares, x_sum, x_squares, products = sums
+    count = np.rint(count)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y_variance = y_squares - y_sum * y_sum / count
+        x_variance = x_squares - x_sum * x_sum / count
+        correlations[:lags] = (products - y_sum * x_sum / count) / np.sqrt(y_variance * x_variance)
+    correlations[:lags][(count < 3) | ~(y_variance > 0) | ~(x_variance > 0)] = np.nan
+    return correlations
+
+
+def _lagged(values, max_lag):
+    """Return the columns values_{t-1}, ..., values_{t-max_lag} (NaN where undefined)."""
+    lagged = np.full((len(values), max_lag), np.nan)
+    for lag in range(1, max_lag + 1):
+        lagged[lag:, lag - 1] = values[:-lag]
+    return lagged
+
+
+def _ssr(gram, columns, target):
+    """Residual sum of squares of regressing column `target` on `columns` of a Gram matrix."""
+    xtx = gram[np.ix_(columns, columns)]
+    xty = gram[columns, target]
+    try:
+        half_solution = np.linalg.solve(np.linalg.cholesky(xtx), xty)
+        explained = half_solution @ half_solution
+    except np.linalg.LinAlgError:
+        explained = xty @ np.linalg.pinv(xtx, hermitian=True) @ xty
+    return max(gram[target, target] - explained, 0.0)
+
+
+def granger_tests(y, x, max_lag):
+    """
+    Granger F-tests of "x does not lead y" for lag orders 1..max_lag.
+
+    For order p, y_t is regressed on a constant and y_{t-1..t-p} (restricted)
+    and additionally on x_{t-1..t-p} (unrestricted). Every order uses the same
+    rows (those with all max_lag lags available), and all the regressions come
+    from one Gram matrix of [1, y lags, x lags, y]. Returns (F, p-values, nobs).
+    """
+    design = np.column_stack([np.ones(len(y)), _lagged(y, max_lag), _lagged(x, max_lag), y])
+    design = design[~np.isnan(design).any(axis=1)]
+    nobs = len(design)
+    f_values = np.full(max_lag, np.nan)
+    p_values = np.full(max_lag, np.nan)
+    if nobs <= 2 * max_lag + 1:
+        return f_values, p_values, nobs
+
+    gram = design.T @ design
+    target = 2 * max_lag + 1
+    for order in range(1, max_lag + 1):
+        restricted = [0] + list(range(1, order + 1))
+        unrestricted = restricted + list(range(max_lag + 1, max_lag + order + 1))
+        ssr_restricted = _ssr(gram, restricted, target)
+        ssr_unrestricted = _ssr(gram, unrestricted, target)
+        df_resid = nobs - len(unrestricted)
+        if ssr_unrestricted > 0:
+            f_values[order - 1] = (ssr_restricted - ssr_unrestricted) / order / (ssr_unrestricted / df_resid)
+            p_values[order - 1] = stats.f.sf(f_values[order - 1], order, df_resid)
+    return f_values, p_values, nobs
+
+
+def screen_series(y, candidates, names, max_lag):
+    """
+    Screen candidate series (columns of a 2-D array aligned with y) against y.
+    Returns one row per (series, lag).
+    """
+    rows = []
+    for name, x in zip(names, candidates.T):
+        correlations = cross_correlations(y, x, max_lag)
+        f_values, p_values, nobs = granger_tests(y, x, max_lag)
+        for lag in range(1, max_lag + 1):
+            rows.append({
+                "Series": name,
+                "Lag": lag,
+                "Cross-correlation": correlations[lag - 1],
+                "Granger F": f_values[lag - 1],
+                "Granger p-value": p_values[lag - 1],
+                "Observations": nobs,
+            })
+    return rows
+
+
+def _screen_task(arguments):
+    """Screen one chunk of series (in a worker process)."""
+    return screen_series(*arguments)
+
+
+def screen_leading_indicators(y, candidates, max_lag=24, max_workers=None):
+    """
+    Screen every column of `candidates` as a leading indicator of `y`.
+
+    Both are aligned on one regular date index (y a Series, candidates a
+    DataFrame). Series are split into chunks screened in a process pool when
+    there are at least PROCESS_POOL_MIN_SERIES of them. Returns a table with
+    one row per (series, lag), ranked by Granger p-value.
+    """
+    y_values = y.to_numpy(dtype=float)
+    values = candidates.to_numpy(dtype=float)
+    names = list(candidates.columns)
+
+    max_workers = max_workers or default_worker_count()
+    if len(names) >= PROCESS_POOL_MIN_SERIES and max_workers > 1:
+        chunks = np.array_split(np.arange(len(names)), max_workers * 4)
+        tasks = [(y_values, values[:, chunk], [names[i] for i in chunk], max_lag) for chunk in chunks if len(chunk)]
+        with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            rows = [row for chunk_rows in pool.map(_screen_task, tasks) for row in chunk_rows]
+    else:
+        rows = screen_series(y_values, values, names, max_lag)
+
+    columns = ["Series", "Lag", "Cross-correlation", "Granger F", "Granger p-value", "Observations"]
+    table = pd.DataFrame(rows, columns=columns)
+    return table.sort_values(["Granger p-value", "Series", "Lag"], na_position="last").reset_index(drop=True)
+
+
+def best_lags(table):
+    """Return the lag with the smallest Granger p-value of every series, ranked."""
+    ranked = table.dropna(subset=["Granger p-value"])
+    return ranked.drop_duplicates("Series").reset_index(drop=True)
+
+
+def catalogued_series(date_columns=None, catalog=None):
+    """
+    Return a selection entry for every numeric column of every uploaded dataset
+    with a date column, from the upload-time catalog.
+
+    `date_columns` ({file name: date column}) overrides the catalog's first date
+    column, e.g. with the Step 2 choices. A column name found in several files
+    is listed once, from the first file, since aligned series are keyed by name.
+    """
+    catalog = load_catalog() if catalog is None else catalog
+    date_columns = date_columns or {}
+    entries = {}
+    for file_name, entry in catalog.items():
+        date_column = date_columns.get(file_name) or next(iter(entry.get("date_columns") or []), None)
+        if date_column is None:
+            continue
+        for column, column_entry in entry.get("columns", {}).items():
+            if column != date_column and column_entry.get("dtype") in ("int64", "float64"):
+                entries.setdefault(column, {
+                    "variable": column,
+                    "file_name": file_name,
+                    "file_path": entry["path"],
+                    "date_column": date_column,
+                })
+    return list(entries.values())
+
+
+def load_screening_data(y_entry, candidates, start_date=None, end_date=None, frequency=None):
+    """
+    Align Y and the candidate series on one date index at the Step 2 frequency.
+    Returns (y, candidates frame), gaps left as NaN.
+    """
+    candidates = [entry for entry in candidates if entry["variable"] != y_entry["variable"]]
+    joined, _ = align_time_series([y_entry] + candidates, start_date, end_date, frequency)
+    return joined[y_entry["variable"]], joined.drop(columns=y_entry["variable"])
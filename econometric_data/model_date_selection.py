@@ -6,12 +6,12 @@ import json
 import pandas as pd
 import streamlit as st
 from econometric_data.regression_info import regression_info, display_regression_info
+from econometric_data.session_state import MODEL_SELECTION, set_state
 
 # Set up paths
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(CURRENT_DIR, "uploaded_files")
 JSON_FILE = os.path.join(DATA_DIR, "ingested_files.json")
-OUTPUT_FILE = os.path.join(CURRENT_DIR, "date_and_model_selection.json")
 
 def display_model_date_selection():
     """
@@ -59,8 +59,18 @@ def display_model_date_selection():
             "<h4 style='color: #5A9BD5;'>Select Frequency</h4>",
             unsafe_allow_html=True,
         )
+        frequency_options = ["Daily", "Weekly", "Monthly", "Quarterly", "Annually"]
+        # Default to the frequency inferred when the datasets were profiled
+        inferred_frequencies = [
+            details["columns"][column]["date"]["frequency"]
+            for details in datasets.values()
+            for column in details.get("date_columns", [])
+        ]
+        default_frequency = next((f for f in inferred_frequencies if f in frequency_options), "Daily")
         frequency = st.selectbox(
-            "Choose Frequency", options=["Daily", "Weekly", "Monthly", "Quarterly", "Annually"]
+            "Choose Frequency",
+            options=frequency_options,
+            index=frequency_options.index(default_frequency),
         )
     else:
         frequency = None
@@ -83,10 +93,12 @@ def display_model_date_selection():
             f"Choose <span style='color: #FF5733; font-weight: bold;'>date</span> column for {file_name}:",
             unsafe_allow_html=True,
         )
-        # Dropdown for date column selection
+        # Dropdown for date column selection, preselecting a profiled date column
+        date_columns = details.get("date_columns", [])
         column = st.selectbox(
             f"Date column for {file_name}",  # Simple text for compatibility
             options=details["headers"],
+            index=details["headers"].index(date_columns[0]) if date_columns else 0,
             key=f"date_column_{file_name}",
         )
         selected_date_columns[file_name] = {"path": details["path"], "date_column": column}
@@ -108,9 +120,8 @@ def display_model_date_selection():
         }
 
         try:
-            # Write to output JSON file
-            with open(OUTPUT_FILE, 'w') as f:
-                json.dump(selection_data, f, indent=4)
+            # Save to this session's state
+            set_state(MODEL_SELECTION, selection_data)
 
             st.success("Selections saved successfully!")
             st.json(selection_data)  # Display saved data
@@ -0,0 +1,281 @@
+# regressly/econometric_data/ols_engine.py
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+
+
+def constant_columns(x):
+    """Return the positions of the columns of a design matrix that are a non-zero constant."""
+    x = np.asarray(x, dtype=float)
+    if not len(x):
+        return []
+    return [j for j in range(x.shape[1]) if x[0, j] != 0 and np.all(x[:, j] == x[0, j])]
+
+
+def _unit_scale(xtx):
+    """Return the factors scaling the columns of X (or of each in a stack) to unit length."""
+    diagonal = np.sqrt(np.diagonal(xtx, axis1=-2, axis2=-1))
+    return np.where(diagonal > 0, 1 / np.where(diagonal > 0, diagonal, 1), 1.0)
+
+
+def normal_equations_rank(xtx):
+    """
+    Return the rank of X'X (or of each matrix in a stack of them).
+
+    The columns are scaled to unit length first, so regressors measured in very
+    different units (a constant next to population in thousands) are not taken
+    for collinear ones.
+    """
+    scale = _unit_scale(xtx)
+    eigenvalues = np.linalg.eigvalsh(xtx * scale[..., :, None] * scale[..., None, :])
+    tolerance = eigenvalues.max(axis=-1, keepdims=True) * xtx.shape[-1] * np.finfo(float).eps
+    return np.sum(eigenvalues > tolerance, axis=-1)
+
+
+def minimum_norm_projection(xtx, transform, rank):
+    """
+    Return the projection P that makes the solution of a rank-deficient centred
+    design the minimum-norm one of the original columns.
+
+    With X_c = X T, the coefficients T b_c (plus the y shift on the constant)
+    solve the original problem, but adding any T n, with X_c n = 0, does too;
+    the pseudo-inverse keeps b_c short, not T b_c. P removes every such
+    direction, so P b is the minimum-norm solution and P T (X_c'X_c)^+ T' P is
+    (X'X)^+, which is what statsmodels' pseudo-inverse of X gives.
+    """
+    scale = _unit_scale(xtx)
+    _, vectors = np.linalg.eigh(xtx * scale[:, None] * scale[None, :])
+    null = transform @ (scale[:, None] * vectors[:, :len(xtx) - rank])  # Ascending: the null directions come first
+    basis, _ = np.linalg.qr(null)
+    return np.eye(len(xtx)) - basis @ basis.T
+
+
+def solve_normal_equations(xtx, xty):
+    """
+    Solve X'X b = X'y, returning (b, (X'X)^-1, rank).
+
+    Uses a Cholesky factorization and falls back to the pseudo-inverse when X'X is
+    rank deficient, as statsmodels does for collinear designs.
+    """
+    rank = int(normal_equations_rank(xtx))
+    if rank == len(xtx):
+        try:
+            inverse_lower = np.linalg.solve(np.linalg.cholesky(xtx), np.eye(len(xtx)))
+            xtx_inv = inverse_lower.T @ inverse_lower
+            return xtx_inv @ xty, xtx_inv, rank
+        except np.linalg.LinAlgError:
+            pass
+    xtx_inv = np.linalg.pinv(xtx, hermitian=True)
+    return xtx_inv @ xty, xtx_inv, rank
+
+
+class OLSResult:
+    """
+    OLS estimates and fit statistics, computed from sufficient statistics.
+
+    Mirrors the attributes of statsmodels' RegressionResults used in the app
+    (params, bse, tvalues, pvalues, rsquared, ...). The full statsmodels results
+    object is only built when summary() or statsmodels_results() is called,
+    from the `data` callable returning the (y, X) rows the fit covers.
+    `solution` is the (b, (X'X)^-1, rank) of solve_normal_equations, when the
+    normal equations have already been solved, and `ssr` the residual sum of
+    squares, when it is known more precisely than the cross products give it.
+    """
+
+    def __init__(self, names, xtx, xty, yty, y_sum, nobs, has_constant=True, data=None, solution=None, ssr=None):
+        self.names = list(names)
+        self.nobs = int(nobs)
+        self.k = len(self.names)
+        self.has_constant = has_constant
+        self._data = data
+        self._results = None
+
+        beta, xtx_inv, self.rank = solution if solution is not None else solve_normal_equations(xtx, xty)
+        self.df_model = self.rank - (1 if has_constant else 0)
+        self.df_resid = self.nobs - self.rank
+        self.ssr = max(float(yty - 2 * beta @ xty + beta @ xtx @ beta if ssr is None else ssr), 0.0)
+        self.centered_tss = float(yty - y_sum ** 2 / self.nobs) if self.nobs else 0.0
+        self.uncentered_tss = float(yty)
+        tss = self.centered_tss if has_constant else self.uncentered_tss
+        self.rsquared = 1 - self.ssr / tss if tss > 0 else np.nan
+        self.rsquared_adj = (
+            1 - (self.nobs - (1 if has_constant else 0)) / self.df_resid * (1 - self.rsquared)
+            if self.df_resid > 0 else np.nan
+        )
+        self.scale = self.ssr / self.df_resid if self.df_resid > 0 else np.nan
+        self.set_estimates(beta, xtx_inv * self.scale)
+
+    def set_estimates(self, params, cov_params):
+        """Set the coefficients and their covariance, deriving SEs, t-statistics and p-values."""
+        self.params = pd.Series(params, index=self.names)
+        self.cov_params_matrix = cov_params
+        self.bse = pd.Series(np.sqrt(np.clip(np.diag(cov_params), 0, None)), index=self.names)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.tvalues = self.params / self.bse
+        self.pvalues = pd.Series(2 * stats.t.sf(np.abs(self.tvalues), self.df_resid), index=self.names)
+
+    @property
+    def llf(self):
+        """Gaussian log-likelihood."""
+        n = self.nobs
+        return -n / 2 * (np.log(2 * np.pi) + np.log(self.ssr / n) + 1)
+
+    @property
+    def aic(self):
+        """Akaike information criterion."""
+        return -2 * self.llf + 2 * self.rank
+
+    @property
+    def bic(self):
+        """Bayesian information criterion."""
+        return -2 * self.llf + np.log(self.nobs) * self.rank
+
+    @property
+    def fvalue(self):
+        """F-statistic of the regression against the intercept-only (or empty) model."""
+        if self.df_model <= 0 or self.df_resid <= 0:
+            return np.nan
+        tss = self.centered_tss if self.has_constant else self.uncentered_tss
+        return (tss - self.ssr) / self.df_model / self.scale
+
+    @property
+    def f_pvalue(self):
+        """p-value of the F-statistic."""
+        return stats.f.sf(self.fvalue, self.df_model, self.df_resid)
+
+    def conf_int(self, alpha=0.05):
+        """Return the (lower, upper) confidence interval of every coefficient."""
+        margin = stats.t.ppf(1 - alpha / 2, self.df_resid) * self.bse
+        return pd.DataFrame({0: self.params - margin, 1: self.params + margin})
+
+    def predict(self, x):
+        """Return fitted values for the rows of a design matrix."""
+        return pd.Series(np.asarray(x, dtype=float) @ self.params.to_numpy(), index=getattr(x, "index", None))
+
+    def statsmodels_results(self):
+        """Fit the equivalent statsmodels model, once, for its full diagnostics."""
+        if self._results is None:
+            if self._data is None:
+                raise ValueError("This fit has no data attached to build a statsmodels summary from.")
+            y, x = self._data()
+            self._results = sm.OLS(y, x).fit()
+        return self._results
+
+    def summary(self):
+        """Return the full statsmodels summary, building it on first use."""
+        return self.statsmodels_results().summary()
+
+
+def fit_ols(y, x):
+    """Fit OLS of y on a design matrix (pandas or numpy) from its centred cross products."""
+    if not isinstance(x, pd.DataFrame):
+        x_values = np.asarray(x, dtype=float)
+        x = pd.DataFrame(x_values, columns=[f"x{j}" for j in range(x_values.shape[1])])
+    name = getattr(y, "name", None) or "y"
+    y = pd.DataFrame({name: np.asarray(y, dtype=float)}, index=x.index)
+    return MultiOLSResult(y, x).result(name)
+
+
+class MultiOLSResult:
+    """
+    OLS of several dependent variables on one design, solved together.
+
+    X'X is built and factored once and every target is solved as a column of
+    one matrix right-hand side. Per-target OLSResults (and their statsmodels
+    summaries) are only built when asked for. As in CumulativeOLS, when the
+    design has a constant the other columns and the targets are centred on
+    their means before the cross products are taken, so residual sums of
+    squares do not cancel; estimates are mapped back to the original columns
+    (as the minimum-norm solution when the design is rank deficient).
+    """
+
+    def __init__(self, y, x):
+        self.y = y
+        self.x = x
+        self.targets = list(y.columns)
+        self.names = list(x.columns)
+
+        x_values = x.to_numpy(dtype=float)
+        y_values = y.to_numpy(dtype=float)
+        self.nobs = len(x_values)
+        constants = constant_columns(x_values)
+        self.has_constant = bool(constants)
+
+        # X_c = X T and Y_c = Y - const * y_shift, so b = T b_c plus y_shift on the constant
+        self.transform = np.eye(len(self.names))
+        y_shift = np.zeros(len(self.targets))
+        if constants:
+            constant = x_values[:, constants[0]]
+            x_shift = x_values.mean(axis=0) / constant[0]
+            x_shift[constants] = 0.0
+            y_shift = y_values.mean(axis=0) / constant[0]
+            x_values = x_values - np.outer(constant, x_shift)
+            y_values = y_values - np.outer(constant, y_shift)
+            self.transform[constants[0], :] -= x_shift
+
+        self.xtx = x_values.T @ x_values
+        self.xty = x_values.T @ y_values
+        self.yty = np.einsum("ij,ij->j", y_values, y_values)
+        self.y_sum = y_values.sum(axis=0)
+        self.centred_params, self.xtx_inv, self.rank = solve_normal_equations(self.xtx, self.xty)
+        self.params = self.transform @ self.centred_params
+        if constants:
+            self.params[constants[0]] += y_shift
+        self.xtx_pinv = self.transform @ self.xtx_inv @ self.transform.T
+        if self.rank < len(self.names):
+            projection = minimum_norm_projection(self.xtx, self.transform, self.rank)
+            self.params = projection @ self.params
+            self.xtx_pinv = projection @ self.xtx_pinv @ projection
+        self._results = {}
+
+    def __sizeof__(self):
+        return int(self.x.memory_usage(deep=True).sum() + self.y.memory_usage(deep=True).sum()) \
+            + self.xtx.nbytes + self.xty.nbytes + 2 * self.params.nbytes + 2 * self.xtx_inv.nbytes
+
+    def result(self, target):
+        """Return the OLSResult of one target, reusing the shared factorization."""
+        if target not in self._results:
+            j = self.targets.index(target)
+            result = OLSResult(
+                self.names, self.xtx, self.xty[:, j], self.yty[j], self.y_sum[j], self.nobs,
+                has_constant=self.has_constant,
+                data=lambda: (self.y[target], self.x),
+                solution=(self.centred_params[:, j], self.xtx_inv, self.rank),
+            )
+            result.set_estimates(self.params[:, j], self.xtx_pinv * result.scale)
+            self._results[target] = result
+        return self._results[target]
+
+    def comparison_table(self):
+        """
+        Return one row per target with its fit statistics and coefficients,
+        computed for all targets at once from the shared solution.
+        """
+        nobs, rank = self.nobs, self.rank
+        df_model = rank - (1 if self.has_constant else 0)
+        df_resid = nobs - rank
+        ssr = np.clip(
+            self.yty - 2 * np.einsum("ij,ij->j", self.centred_params, self.xty)
+            + np.einsum("ij,ij->j", self.centred_params, self.xtx @ self.centred_params),
+            0, None,
+        )
+        tss = self.yty - self.y_sum ** 2 / nobs if self.has_constant else self.yty
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsquared = 1 - ssr / tss
+            rsquared_adj = 1 - (nobs - (1 if self.has_constant else 0)) / df_resid * (1 - rsquared)
+            fvalue = (tss - ssr) / df_model / (ssr / df_resid)
+        llf = -nobs / 2 * (np.log(2 * np.pi) + np.log(ssr / nobs) + 1)
+
+        table = pd.DataFrame({
+            "Target": self.targets,
+            "R-squared": rsquared,
+            "Adj. R-squared": rsquared_adj,
+            "F-statistic": fvalue,
+            "Prob (F-statistic)": stats.f.sf(fvalue, df_model, df_resid),
+            "AIC": -2 * llf + 2 * rank,
+            "BIC": -2 * llf + np.log(nobs) * rank,
+        })
+        coefficients = pd.DataFrame(self.params.T, columns=self.names)
+        return pd.concat([table, coefficients], axis=1)
@@ -0,0 +1,261 @@
+# regressly/econometric_data/parallel_ingest.py
+
+import os
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from econometric_data.chunked_io import DEFAULT_MEMORY_LIMIT_MB, current_rss_bytes, save_upload_in_chunks
+from econometric_data.dataset_catalog import profile_csv, load_profile_state
+from econometric_data.columnar_cache import write_columnar_copy
+
+# Batches smaller than this are parsed in threads; worker process start-up would dominate
+PROCESS_POOL_MIN_BYTES = 64 * 1024 * 1024
+MIN_WORKER_MEMORY_MB   = 128
+
+
+def default_worker_count():
+    """Return the default number of ingestion workers (one per core)."""
+    return os.cpu_count() or 1
+
+
+def staging_path(upload_dir, file_name):
+    """Return the hidden path an upload is written to before it is accepted."""
+    return os.path.join(upload_dir, f".{file_name}.upload")
+
+
+def prefix_sizes(catalog):
+    """Return the byte sizes of catalogued files, to check uploads against as prefixes."""
+    return {entry["size"] for entry in catalog.values() if entry.get("size")}
+
+
+def classify_upload(file_name, size, sha256, prefixes, catalog, batch_hashes=None):
+    """
+    Decide how to ingest an upload given the files already in the catalog.
+
+    Returns ("skip", name) when the content is identical to a catalogued file (or
+    to an earlier file of the same batch, per `batch_hashes`), ("append", name)
+    when the upload is a catalogued file plus extra rows, and ("full", None)
+    otherwise. Append candidates with the same file name win, then the longest
+    matching prefix. An upload whose name is already catalogued is only skipped
+    when it is identical to that file: its entry must be refreshed even when the
+    new content duplicates another file.
+    """
+    if file_name in catalog:
+        entry = catalog[file_name]
+        if entry.get("sha256") == sha256 and os.path.exists(entry["path"]):
+            return "skip", file_name
+    else:
+        if batch_hashes and sha256 in batch_hashes:
+            return "skip", batch_hashes[sha256]
+        for name, entry in catalog.items():
+            if entry.get("sha256") == sha256 and os.path.exists(entry["path"]):
+                return "skip", name
+
+    candidates = [
+        (name == file_name, entry["size"], name)
+        for name, entry in catalog.items()
+        if entry.get("size", 0) < size
+        and prefixes.get(entry.get("size")) == (entry.get("sha256"), True)
+        and load_profile_state(entry["path"]) is not None
+    ]
+    if candidates:
+        return "append", max(candidates)[2]
+    return "full", None
+
+
+def plan_upload(file_name, upload_dir, saved, catalog, batch_hashes=None):
+    """
+    Classify a staged upload and move it into place unless it is a duplicate.
+
+    `saved` is the return value of save_upload_in_chunks for the staged file.
+    Returns a plan dictionary describing how the file should be ingested.
+    """
+    size, sha256, prefixes = saved
+    action, base_name = classify_upload(file_name, size, sha256, prefixes, catalog, batch_hashes)
+    save_path = os.path.join(upload_dir, file_name)
+    if action == "skip":
+        os.remove(staging_path(upload_dir, file_name))
+    else:
+        os.replace(staging_path(upload_dir, file_name), save_path)
+    return {
+        "file_name": file_name,
+        "save_path": save_path,
+        "sha256": sha256,
+        "size": size,
+        "action": action,
+        "base_name": base_name,
+        "append_to": (catalog[base_name]["path"], catalog[base_name]) if action == "append" else None,
+    }
+
+
+def stage_upload(uploaded_file, upload_dir, catalog):
+    """Save an upload to its staging path, hashing it, and plan its ingestion."""
+    saved = save_upload_in_chunks(
+        uploaded_file, staging_path(upload_dir, uploaded_file.name), prefix_sizes=prefix_sizes(catalog)
+    )
+    return plan_upload(uploaded_file.name, upload_dir, saved, catalog)
+
+
+def _plural(count, noun):
+    return f"{count:,} {noun}{'' if count == 1 else 's'}"
+
+
+def bad_rows_notice(entry, appended=False):
+    """Describe the malformed rows and unparseable values found while profiling an upload, if any."""
+    sentences = []
+    if entry.get("skipped_lines"):
+        lines = ", ".join(f"{line:,}" for line in entry["skipped_lines"])
+        sentences.append(
+            f"Skipped {_plural(entry['skipped_rows'], 'row')} with more fields than the header "
+            f"(line{'s' if len(entry['skipped_lines']) > 1 else ''} {lines} "
+            f"of the {'appended rows' if appended else 'file'})."
+        )
+    unparsed = {
+        column: info["unparsed_count"] for column, info in entry.get("columns", {}).items() if info.get("unparsed_count")
+    }
+    if unparsed:
+        counts = ", ".join(f"{column} ({_plural(count, 'value')})" for column, count in unparsed.items())
+        sentences.append(f"Non-numeric values in otherwise numeric columns, which are kept as text: {counts}.")
+    return " ".join(sentences) or None
+
+
+def upload_notice(plan, entry=None, catalog=None):
+    """Describe a skipped, incrementally ingested or malformed upload for the UI, if applicable."""
+    if plan["action"] == "skip":
+        return f"Identical to already ingested {plan['base_name']}; skipped."
+    notices = []
+    if plan["action"] == "append" and entry is not None:
+        new_rows = entry["rows"] - catalog[plan["base_name"]]["rows"]
+        notices.append(f"Extends {plan['base_name']}; ingested {_plural(new_rows, 'new row')} only.")
+    if entry is not None:
+        notices.append(bad_rows_notice(entry, appended=plan["action"] == "append"))
+    return " ".join(notice for notice in notices if notice) or None
+
+
+def ingest_saved_file(save_path, memory_limit_mb=None, progress_callback=None, append_to=None,
+                      chunk_budget_mb=None):
+    """
+    Profile a saved upload and write its columnar copy.
+
+    With `append_to=(base_file, base_entry)` only the rows after the base file's
+    bytes are profiled and written. Chunks are planned against `chunk_budget_mb`
+    when given. Returns the catalog entry for the file.
+    """
+    entry = profile_csv(
+        save_path,
+        memory_limit_mb=memory_limit_mb,
+        progress_callback=progress_callback,
+        resume_from=(append_to[0], append_to[1]["size"]) if append_to else None,
+        chunk_budget_mb=chunk_budget_mb,
+    )
+    write_columnar_copy(
+        save_path, entry, memory_limit_mb=memory_limit_mb, append_to=append_to, chunk_budget_mb=chunk_budget_mb
+    )
+    return entry
+
+
+def ingest_in_worker_process(save_path, chunk_budget_mb, append_to=None):
+    """
+    Ingest a saved upload in a worker process. The process has its own RSS, so
+    its limit is what it uses at start-up plus its share of the headroom.
+    """
+    memory_limit_mb = (current_rss_bytes() or 0) // 1024 ** 2 + chunk_budget_mb
+    return ingest_saved_file(save_path, memory_limit_mb, None, append_to, chunk_budget_mb)
+
+
+def _parse_pool(batch_bytes, file_count, max_workers):
+    """Use worker processes for large batches and threads for small ones."""
+    if file_count > 1 and batch_bytes >= PROCESS_POOL_MIN_BYTES:
+        # Spawn, not fork: the Streamlit server process is multi-threaded
+        return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers)
+
+
+def ingest_uploaded_files(uploaded_files, upload_dir, catalog=None, max_workers=None, memory_limit_mb=None,
+                          on_file_done=None):
+    """
+    Save, profile and write columnar copies for a batch of uploads concurrently.
+
+    Files are written to `upload_dir` by a thread pool and handed to a parsing pool
+    as soon as each one is on disk. Uploads identical to a file in `catalog` (or
+    earlier in the batch) are skipped, and uploads extending a catalogued file
+    only have their new rows ingested. The headroom the memory limit leaves above
+    the RSS measured before the pools start is split evenly between workers, and
+    each worker plans its chunks against its share. A failing file is recorded and the rest of the batch continues.
+    `on_file_done(file_name, entry, error)` is called from the calling thread as
+    each file finishes.
+
+    Returns (entries, errors, notices), dictionaries keyed by file name.
+    """
+    catalog = catalog or {}
+    max_workers = max(1, min(max_workers or default_worker_count(), len(uploaded_files) or 1))
+    memory_limit_mb = memory_limit_mb or DEFAULT_MEMORY_LIMIT_MB
+    baseline_mb = (current_rss_bytes() or 0) // 1024 ** 2
+    chunk_budget_mb = max(MIN_WORKER_MEMORY_MB, (memory_limit_mb - baseline_mb) // max_workers)
+    batch_bytes = sum(uploaded_file.size for uploaded_file in uploaded_files)
+    sizes = prefix_sizes(catalog)
+
+    entries, errors, notices = {}, {}, {}
+    batch_hashes = {}
+
+    def finish(file_name, entry=None, error=None):
+        if error is None:
+            entries[file_name] = entry
+        else:
+            errors[file_name] = error
+        if on_file_done:
+            on_file_done(file_name, entry, error)
+
+    with ThreadPoolExecutor(max_workers) as io_pool, \
+            _parse_pool(batch_bytes, len(uploaded_files), max_workers) as parse_pool:
+        save_futures = {
+            io_pool.submit(
+                save_upload_in_chunks,
+                uploaded_file,
+                staging_path(upload_dir, uploaded_file.name),
+                prefix_sizes=sizes,
+            ): uploaded_file.name
+            for uploaded_file in uploaded_files
+        }
+
+        parse_futures = {}
+        for future in as_completed(save_futures):
+            file_name = save_futures[future]
+            try:
+                plan = plan_upload(file_name, upload_dir, future.result(), catalog, batch_hashes)
+            except Exception as e:
+                finish(file_name, error=f"Error saving file: {e}")
+                continue
+
+            if plan["action"] == "skip":
+                notices[file_name] = upload_notice(plan)
+                if on_file_done:
+                    on_file_done(file_name, None, None)
+                continue
+
+            # Later uploads in the batch with the same content are duplicates of this one
+            batch_hashes[plan["sha256"]] = file_name
+            if isinstance(parse_pool, ProcessPoolExecutor):
+                future = parse_pool.submit(
+                    ingest_in_worker_process, plan["save_path"], chunk_budget_mb, plan["append_to"]
+                )
+            else:
+                # Threads share this process, whose RSS stays checked against the whole limit
+                future = parse_pool.submit(
+                    ingest_saved_file, plan["save_path"], memory_limit_mb, None, plan["append_to"], chunk_budget_mb
+                )
+            parse_futures[future] = plan
+
+        for future in as_completed(parse_futures):
+            plan = parse_futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                finish(plan["file_name"], error=f"Error reading file: {e}")
+                continue
+            entry.update(sha256=plan["sha256"], size=plan["size"])
+            notice = upload_notice(plan, entry, catalog)
+            if notice:
+                notices[plan["file_name"]] = notice
+            finish(plan["file_name"], entry=entry)
+
+    return entries, errors, notices
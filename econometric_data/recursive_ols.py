@@ -0,0 +1,304 @@
+# regressly/econometric_data/recursive_ols.py
+
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from scipy import stats
+from econometric_data.design_matrix import add_constant
+from econometric_data.feature_transforms import load_transformed_data
+from econometric_data.ols_engine import OLSResult, constant_columns, fit_ols, solve_normal_equations
+
+# Set up paths
+CURRENT_DIR      = os.path.dirname(os.path.abspath(__file__))
+SAVED_MODELS_DIR = os.path.join(CURRENT_DIR, "saved_models")
+
+# Largest relative difference from a full refit tolerated before the state is rebuilt
+DRIFT_TOLERANCE = 1e-6
+
+
+class RecursiveOLS:
+    """
+    OLS fit that is updated in place, one row at a time, by recursive least squares.
+
+    The state is the inverse Gram matrix P = (X'X)^-1, the coefficients and the
+    residual sum of squares, plus the running cross products. Adding a row costs
+    O(k^2) with no refactorization, and gives the same coefficients and standard
+    errors as refitting on all rows, up to rounding (see drift()).
+
+    As in CumulativeOLS, when the design has a constant the state is kept for
+    the design centred on the means of the rows first fitted: X_c = X T and
+    y_c = y - const * y_shift. Rows added later are shifted by the same
+    amounts, so the cross products of series far from zero do not cancel;
+    params and p_matrix map the state back to the original columns.
+    """
+
+    def __init__(self, names, constant=None, x_shift=None, y_shift=0.0, last_date=None):
+        self.names = list(names)
+        self.constant = constant
+        self.has_constant = constant is not None
+        self.x_shift = np.zeros(len(self.names)) if x_shift is None else np.array(x_shift, dtype=float)
+        self.y_shift = float(y_shift)
+        self.last_date = None if last_date is None else pd.Timestamp(last_date)
+
+    @classmethod
+    def from_data(cls, y, x):
+        """Fit on date-indexed rows (y Series, X design DataFrame)."""
+        x_values = x.to_numpy(dtype=float)
+        y_values = y.to_numpy(dtype=float)
+        constants = constant_columns(x_values)
+        model = cls(x.columns, constant=constants[0] if constants else None,
+                    last_date=x.index.max() if len(x) else None)
+        if constants:
+            scale = x_values[0, model.constant]
+            model.x_shift = x_values.mean(axis=0) / scale
+            model.x_shift[constants] = 0.0
+            model.y_shift = y_values.mean() / scale
+
+        x_centred, y_centred = model.centre(x_values, y_values)
+        model.xtx = x_centred.T @ x_centred
+        model.xty = x_centred.T @ y_centred
+        model.yty = float(y_centred @ y_centred)
+        model.y_sum = float(y_centred.sum())
+        model.nobs = len(y_values)
+        model.refactor()
+        # The rows are at hand, so the residual sum of squares is summed directly
+        model.ssr = float(np.sum((y_centred - x_centred @ model.centred_params) ** 2))
+        return model
+
+    def centre(self, x_values, y_values):
+        """Shift rows of the original design (and y) as the state is kept: X T and y - const * y_shift."""
+        if self.constant is None:
+            return x_values, y_values
+        constant = x_values[..., self.constant]
+        return x_values - np.multiply.outer(constant, self.x_shift), y_values - constant * self.y_shift
+
+    def transform(self):
+        """Return T with X_centred = X T."""
+        transform = np.eye(len(self.names))
+        if self.constant is not None:
+            transform[self.constant, :] -= self.x_shift
+        return transform
+
+    def refactor(self):
+        """Rebuild P, the coefficients and the residual sum of squares from the cross products."""
+        self.centred_params, self.centred_p, rank = solve_normal_equations(self.xtx, self.xty)
+        if rank < len(self.names):
+            raise ValueError("The design is collinear, so it cannot be updated recursively.")
+        self.ssr = max(float(self.yty - self.centred_params @ self.xty), 0.0)
+
+    @property
+    def params(self):
+        """Coefficients of the original columns: T b_c, plus y_shift on the constant."""
+        params = self.transform() @ self.centred_params
+        if self.constant is not None:
+            params[self.constant] += self.y_shift
+        return params
+
+    @property
+    def p_matrix(self):
+        """(X'X)^-1 of the original columns, T P_c T'."""
+        transform = self.transform()
+        return transform @ self.centred_p @ transform.T
+
+    def update(self, x_row, y_value):
+        """Add one observation in O(k^2)."""
+        x_row, y_value = self.centre(np.asarray(x_row, dtype=float), float(y_value))
+        p_x = self.centred_p @ x_row
+        denominator = 1.0 + x_row @ p_x
+        gain = p_x / denominator
+        error = y_value - x_row @ self.centred_params
+
+        self.centred_params = self.centred_params + gain * error
+        self.centred_p = self.centred_p - np.outer(gain, p_x)
+        self.ssr += error * error / denominator
+
+        self.xtx += np.outer(x_row, x_row)
+        self.xty += x_row * y_value
+        self.yty += y_value * y_value
+        self.y_sum += y_value
+        self.nobs += 1
+
+    def append(self, y, x):
+        """
+        Add the rows of a date-indexed (y, X) dated after the last row already
+        fitted. Returns the number of rows added.
+        """
+        x = x[self.names]
+        if self.last_date is not None:
+            new = x.index > self.last_date
+            y, x = y[new], x[new]
+        x = x.sort_index()
+        y = y.loc[x.index]
+        for x_row, y_value in zip(x.to_numpy(dtype=float), y.to_numpy(dtype=float)):
+            self.update(x_row, y_value)
+        if len(x):
+            self.last_date = x.index[-1]
+        return len(x)
+
+    @property
+    def df_resid(self):
+        return self.nobs - len(self.names)
+
+    @property
+    def bse(self):
+        """Standard errors of the coefficients."""
+        scale = self.ssr / self.df_resid if self.df_resid > 0 else np.nan
+        return np.sqrt(np.clip(np.diag(self.p_matrix), 0, None) * scale)
+
+    def coefficients(self, alpha=0.05):
+        """Return the coefficients, standard errors, t-statistics and p-values as a DataFrame."""
+        bse = self.bse
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tvalues = self.params / bse
+        margin = stats.t.ppf(1 - alpha / 2, max(self.df_resid, 1)) * bse
+        return pd.DataFrame({
+            "Variable": self.names,
+            "Coefficient": self.params,
+            "Standard Error": bse,
+            "t-Statistic": tvalues,
+            "P-Value": 2 * stats.t.sf(np.abs(tvalues), self.df_resid),
+            "Lower": self.params - margin,
+            "Upper": self.params + margin,
+        })
+
+    def result(self):
+        """Return an OLSResult of the rows fitted so far, for R² and the other fit statistics."""
+        result = OLSResult(
+            self.names, self.xtx, self.xty, self.yty, self.y_sum, self.nobs, self.has_constant,
+            solution=(self.centred_params, self.centred_p, len(self.names)), ssr=self.ssr,
+        )
+        result.set_estimates(self.params, self.p_matrix * result.scale)
+        return result
+
+    def drift(self, y, x):
+        """
+        Compare the recursive estimates with a full refit on (y, X), the rows
+        the model should cover, by the centred OLS engine. Returns the largest
+        relative difference of the coefficients and standard errors.
+        """
+        refit = fit_ols(y, x[self.names])
+        recursive = np.concatenate([self.params, self.bse])
+        full = np.concatenate([refit.params.to_numpy(), refit.bse.to_numpy()])
+        return float(np.max(np.abs(recursive - full) / np.maximum(np.abs(full), 1e-12)))
+
+    def to_dict(self):
+        """Return the state as JSON-serialisable values (cross products, params and P of the centred design)."""
+        return {
+            "names": self.names,
+            "constant": self.constant,
+            "x_shift": self.x_shift.tolist(),
+            "y_shift": self.y_shift,
+            "xtx": self.xtx.tolist(),
+            "xty": self.xty.tolist(),
+            "yty": self.yty,
+            "y_sum": self.y_sum,
+            "nobs": self.nobs,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "params": self.centred_params.tolist(),
+            "p_matrix": self.centred_p.tolist(),
+            "ssr": self.ssr,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a model saved with to_dict(), keeping its recursive state as saved."""
+        model = cls(state["names"], constant=state["constant"], x_shift=state["x_shift"],
+                    y_shift=state["y_shift"], last_date=state["last_date"])
+        model.xtx = np.array(state["xtx"], dtype=float)
+        model.xty = np.array(state["xty"], dtype=float)
+        model.yty = float(state["yty"])
+        model.y_sum = float(state["y_sum"])
+        model.nobs = int(state["nobs"])
+        model.centred_params = np.array(state["params"], dtype=float)
+        model.centred_p = np.array(state["p_matrix"], dtype=float)
+        model.ssr = float(state["ssr"])
+        return model
+
+
+def saved_model_path(model_name):
+    """
+    Return the file a saved model is stored in. Names that sanitize alike
+    ("GDP model", "GDP/model") get different files from a hash of the raw name.
+    """
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in model_name)
+    name_hash = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(SAVED_MODELS_DIR, f"{safe_name}-{name_hash}.json")
+
+
+def save_model(model_name, model, selected_data):
+    """
+    Save a model with its recursive state and the Step 3 selection it was fitted
+    on, so it can later be refreshed from the same files.
+    """
+    path = saved_model_path(model_name)
+    os.makedirs(SAVED_MODELS_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({"name": model_name, "selection": selected_data, "model": model.to_dict()}, f, indent=4)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_saved_model(path):
+    """Return (name, Step 3 selection, RecursiveOLS) of a saved model."""
+    with open(path, 'r') as f:
+        saved = json.load(f)
+    return saved["name"], saved["selection"], RecursiveOLS.from_dict(saved["model"])
+
+
+def list_saved_models():
+    """Return the paths of all saved models."""
+    if not os.path.isdir(SAVED_MODELS_DIR):
+        return []
+    return sorted(
+        os.path.join(SAVED_MODELS_DIR, name) for name in os.listdir(SAVED_MODELS_DIR) if name.endswith(".json")
+    )
+
+
+def load_design(selected_data):
+    """
+    Read the (y, X) design of a Step 3 selection over its [start_date, end_date],
+    with its X transforms and a constant column.
+    """
+    y_variable = selected_data["y"]["variable"]
+    data, x_names, _ = load_transformed_data(
+        selected_data, [y_variable],
+        start_date=selected_data.get("start_date"), end_date=selected_data.get("end_date"),
+    )
+    return data[y_variable], add_constant(data[x_names]).frame()
+
+
+def refresh_saved_model(path, check_drift=False):
+    """
+    Append the rows added to a saved model's files since it was last updated,
+    and save it again. Rows after the saved selection's end date are left out,
+    as they were when it was fitted; a model saved with no end date (its
+    window ran to the last date of the data) takes every new row.
+
+    With `check_drift`, the recursive estimates are compared with a full refit
+    on every row up to the new last date; if they differ by more than
+    DRIFT_TOLERANCE the state is rebuilt from the refit. Returns a dictionary
+    describing the refresh.
+    """
+    model_name, selected_data, model = load_saved_model(path)
+    y_data, x_data = load_design(selected_data)
+    rows_added = model.append(y_data, x_data)
+
+    drift = None
+    if check_drift:
+        covered = x_data.index <= model.last_date
+        drift = model.drift(y_data[covered], x_data[covered])
+        if drift > DRIFT_TOLERANCE:
+            model = RecursiveOLS.from_data(y_data[covered], x_data[covered][model.names])
+
+    if rows_added or check_drift:
+        save_model(model_name, model, selected_data)
+    return {
+        "Model": model_name,
+        "Rows Added": rows_added,
+        "Observations": model.nobs,
+        "Last Date": None if model.last_date is None else str(model.last_date.date()),
+        "Drift": drift,
+    }
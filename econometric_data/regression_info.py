@@ -91,6 +91,40 @@ regression_info = {
         ],
         "key_concept": "Reduces overfitting and performs feature selection by shrinking some coefficients to zero."
     },
+    "Ridge Regression": {
+        "description": "Ridge Regression is a linear regression model that includes L2 regularization. It shrinks all coefficients towards zero, which stabilizes the estimates when independent variables are highly correlated.",
+        "formula": "Loss = Σ(yᵢ - (β0 + ΣβⱼXⱼ))² + λΣβⱼ²",
+        "input": "X values (features), Y value (continuous)",
+        "output": "Predicted continuous value, with every coefficient shrunk but none set exactly to zero",
+        "assumptions": [
+            "Linear relationship between independent and dependent variables",
+            "Independent variables may be correlated with each other",
+            "Errors should have constant variance"
+        ],
+        "practical_applications": [
+            "Forecasting with many correlated macroeconomic indicators",
+            "Stabilizing regressions with more variables than observations",
+            "Modeling demand from overlapping price and promotion measures"
+        ],
+        "key_concept": "Trades a little bias for much lower variance by shrinking every coefficient."
+    },
+    "Elastic Net Regression": {
+        "description": "Elastic Net Regression combines the L1 penalty of Lasso with the L2 penalty of Ridge. It selects variables like Lasso while keeping groups of correlated variables together like Ridge.",
+        "formula": "Loss = Σ(yᵢ - (β0 + ΣβⱼXⱼ))² / 2n + λ(ρΣ|βⱼ| + (1 - ρ)Σβⱼ² / 2)",
+        "input": "X values (features), Y value (continuous), L1 ratio ρ between 0 and 1",
+        "output": "Predicted continuous value, with some coefficients potentially set to zero",
+        "assumptions": [
+            "Linear relationship between independent and dependent variables",
+            "Independent variables may be correlated with each other",
+            "Errors should have constant variance"
+        ],
+        "practical_applications": [
+            "Selecting among groups of correlated macroeconomic regressors",
+            "Feature selection in high-dimensional datasets with correlated features",
+            "Genomics and text models with many related predictors"
+        ],
+        "key_concept": "Mixes Lasso's variable selection with Ridge's stability under collinearity."
+    },
     "Random Forest Classification": {
         "description": "Random Forest Classification is an ensemble learning method used for classifying categorical Y variables by building multiple decision trees and combining their predictions through majority vote.",
         "formula": "Prediction = Majority Vote (Classification Trees)",
@@ -0,0 +1,135 @@
+# regressly/econometric_data/ridge_path.py
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# The GCV grid has RIDGE_ALPHAS log-spaced alphas between RIDGE_RANGE times the
+# largest eigenvalue of the centred X'X
+RIDGE_ALPHAS = 100
+RIDGE_RANGE = (1e2, 1e-8)
+
+# Eigenvalues below this fraction of the largest are treated as zero
+RANK_TOLERANCE = 1e-12
+
+# Rows of a sparse design densified and centred at a time when taking its centred X'X
+CENTRING_BLOCK_ROWS = 4096
+
+
+def _centred_cross_products(x, x_mean, y_centred):
+    """
+    Return (X_c'X_c, X_c'y_c) for a sparse x, densifying and centring
+    CENTRING_BLOCK_ROWS rows at a time.
+
+    X'X - n m m' (and X'y_c, whose terms cancel to it) would lose nearly all
+    precision for columns far from zero.
+    """
+    gram, xty = np.zeros((x.shape[1], x.shape[1])), np.zeros(x.shape[1])
+    for start in range(0, x.shape[0], CENTRING_BLOCK_ROWS):
+        block = x[start:start + CENTRING_BLOCK_ROWS].toarray() - x_mean
+        gram += block.T @ block
+        xty += block.T @ y_centred[start:start + CENTRING_BLOCK_ROWS]
+    return gram, xty
+
+
+def centred_decomposition(x, y):
+    """
+    Decompose the centred design once: X_c = U diag(s) V'.
+
+    Tall designs take the eigendecomposition of X_c'X_c, which a sparse x
+    gives without being densified whole; wide ones take a thin SVD of X_c.
+    x is centred before any product is taken, so columns far from zero keep
+    their precision.
+    Returns (V, s^2, z = V' X_c' y_c, x_mean, y_mean, y_c'y_c), keeping only
+    the directions with a non-zero singular value.
+    """
+    y_mean = y.mean()
+    y_centred = y - y_mean
+    x_mean = np.asarray(x.mean(axis=0)).ravel()
+    nobs, k = x.shape
+    if nobs >= k and sp.issparse(x):
+        gram, xty = _centred_cross_products(x, x_mean, y_centred)
+        eigenvalues, vectors = np.linalg.eigh(gram)
+        z = vectors.T @ xty
+    elif nobs >= k:
+        x_centred = x - x_mean
+        eigenvalues, vectors = np.linalg.eigh(x_centred.T @ x_centred)
+        z = vectors.T @ (x_centred.T @ y_centred)
+    else:
+        x_centred = (x.toarray() if sp.issparse(x) else x) - x_mean
+        u, s, vt = np.linalg.svd(x_centred, full_matrices=False)
+        eigenvalues, vectors = s ** 2, vt.T
+        z = s * (u.T @ y_centred)
+
+    keep = eigenvalues > RANK_TOLERANCE * max(eigenvalues.max(initial=0.0), 0.0)
+    return vectors[:, keep], eigenvalues[keep], z[keep], x_mean, y_mean, y_centred @ y_centred
+
+
+class RidgePath:
+    """
+    Ridge regression at every penalty from one decomposition of the design.
+
+    With X_c = U diag(s) V', the Ridge(alpha) coefficients are
+    V diag(1 / (s^2 + alpha)) V' X_c' y, the residual sum of squares and the
+    effective degrees of freedom sum(s^2 / (s^2 + alpha)) are sums over the
+    singular values, so every alpha, and its generalized cross-validation
+    (GCV) score, costs O(k) after the O(n k^2) decomposition. The grid spans
+    RIDGE_RANGE times the largest eigenvalue; alpha_gcv minimises GCV on it.
+    Alpha is that of scikit-learn's Ridge: ||y - Xb||^2 + alpha ||b||^2.
+    `x` is a dense array or a SciPy sparse matrix whose columns are `names`.
+    """
+
+    def __init__(self, y, x, names, n_alphas=RIDGE_ALPHAS):
+        self.names = list(names)
+        x_values = x.tocsr() if sp.issparse(x) else np.asarray(x, dtype=float)
+        y_values = np.asarray(y, dtype=float)
+        self.nobs = len(y_values)
+        self.vectors, self.eigenvalues, self.z, self.x_mean, self.y_mean, self.yty = \
+            centred_decomposition(x_values, y_values)
+
+        # Share of y'y along each direction, and the part of it no direction reaches
+        # (none when the n - 1 centred directions are all there, as on wide designs)
+        self.shares = self.z ** 2 / self.eigenvalues
+        full_rank = len(self.eigenvalues) >= self.nobs - 1
+        self.outside = 0.0 if full_rank else max(self.yty - self.shares.sum(), 0.0)
+
+        top = self.eigenvalues.max(initial=1.0)
+        self.alphas = np.geomspace(top * RIDGE_RANGE[0], top * RIDGE_RANGE[1], n_alphas)
+        self.coefs = (self.z / (self.eigenvalues + self.alphas[:, None])) @ self.vectors.T
+        self.intercepts = self.y_mean - self.coefs @ self.x_mean
+        self.gcv_scores = np.array([self.gcv(alpha) for alpha in self.alphas])
+        self.alpha_gcv = self.alphas[int(np.argmin(self.gcv_scores))]
+
+    def __sizeof__(self):
+        return self.vectors.nbytes + self.coefs.nbytes + self.alphas.nbytes + self.gcv_scores.nbytes
+
+    def index(self, alpha):
+        """Return the position on the grid of the alpha closest to `alpha` (on a log scale)."""
+        return int(np.argmin(np.abs(np.log(self.alphas) - np.log(alpha))))
+
+    def coefficients(self, alpha):
+        """Return the coefficients at any alpha as a Series."""
+        return pd.Series(self.vectors @ (self.z / (self.eigenvalues + alpha)), index=self.names)
+
+    def intercept(self, alpha):
+        return float(self.y_mean - self.coefficients(alpha).to_numpy() @ self.x_mean)
+
+    def predict(self, x, alpha):
+        """Return the fitted values of the rows of a design matrix at any alpha."""
+        coefficients = self.coefficients(alpha).to_numpy()
+        return np.asarray(x @ coefficients).ravel() + self.y_mean - coefficients @ self.x_mean
+
+    def effective_df(self, alpha):
+        """Return the effective degrees of freedom of the slopes, sum(s^2 / (s^2 + alpha))."""
+        return float(np.sum(self.eigenvalues / (self.eigenvalues + alpha)))
+
+    def rss(self, alpha):
+        """Return the residual sum of squares at any alpha."""
+        # Each direction leaves the fraction alpha / (s^2 + alpha) of its coordinate of y unfitted
+        shrink = alpha / (self.eigenvalues + alpha)
+        return float(self.outside + np.sum(self.shares * shrink ** 2))
+
+    def gcv(self, alpha):
+        """Return the GCV score (RSS / n) / (1 - df / n)^2 at any alpha, the intercept counting in df."""
+        df = self.effective_df(alpha) + 1
+        return (self.rss(alpha) / self.nobs) / (1 - df / self.nobs) ** 2 if df < self.nobs else np.inf
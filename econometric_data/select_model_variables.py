@@ -1,31 +1,19 @@
 # regressly/select_model_variables.py
 
-import json
-import os
 import importlib
 import streamlit as st
-
-import json
-import os
-import importlib
-import streamlit as st
-
-# Path to the JSON configuration file
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-JSON_FILE = os.path.join(CURRENT_DIR, "date_and_model_selection.json")
+from econometric_data.session_state import MODEL_SELECTION, get_state
 
 def display_model_variables():
     """
     Dynamically load and display widgets for the selected regression model.
     """
-    # Load the JSON file
-    if not os.path.exists(JSON_FILE):
-        st.error("❌ JSON file not found. Please complete Step 2 first.")
+    # Load this session's Step 2 selections
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("❌ No model selection found. Please complete Step 2 first.")
         return
 
-    with open(JSON_FILE, 'r') as f:
-        selection_data = json.load(f)
-
     model_type = selection_data.get("model", "").lower()
 
     try:
@@ -43,13 +31,11 @@ def run_regression_model():
     """
     Dynamically load and run the selected regression model.
     """
-    if not os.path.exists(JSON_FILE):
-        st.error("❌ JSON file not found. Please complete Step 2 first.")
+    selection_data = get_state(MODEL_SELECTION)
+    if not selection_data:
+        st.error("❌ No model selection found. Please complete Step 2 first.")
         return
 
-    with open(JSON_FILE, 'r') as f:
-        selection_data = json.load(f)
-
     model_type = selection_data.get("model", "").lower()
 
     try:
@@ -0,0 +1,97 @@
+# regressly/econometric_data/session_state.py
+
+import os
+import json
+import uuid
+import streamlit as st
+
+# Set up paths
+CURRENT_DIR   = os.path.dirname(os.path.abspath(__file__))
+WORKSPACE_DIR = os.path.join(CURRENT_DIR, "workspaces")
+
+# Persist each session's state to its workspace so a reload (same URL) picks it up again
+PERSIST_WORKSPACES = os.environ.get("REGRESSLY_PERSIST_WORKSPACES", "1") != "0"
+
+WORKSPACE_PARAM = "workspace"
+_STATE_KEY      = "regressly_state"
+
+# State handed between steps
+MODEL_SELECTION    = "date_and_model_selection"  # Step 2 -> Step 3/4: model, frequency, date columns
+SELECTED_VARIABLES = "selected_variables"        # Step 3 -> Step 4: Y/X variables and parameters
+
+
+def _valid_workspace_id(workspace_id):
+    """Workspace ids are hex strings, so they are safe to use as directory names."""
+    return bool(workspace_id) and len(workspace_id) <= 64 and all(c in "0123456789abcdef" for c in workspace_id)
+
+
+def workspace_id():
+    """
+    Return the id of this session's workspace.
+
+    The id is kept in the page URL (`?workspace=...`), so reloading or sharing the
+    URL reopens the same workspace. A new id is created for sessions without one.
+    """
+    current = st.query_params.get(WORKSPACE_PARAM)
+    if not _valid_workspace_id(current):
+        current = uuid.uuid4().hex
+        st.query_params[WORKSPACE_PARAM] = current
+    return current
+
+
+def workspace_path(workspace, key):
+    """Return the file a workspace persists one state key to."""
+    return os.path.join(WORKSPACE_DIR, workspace, f"{key}.json")
+
+
+def _session_store():
+    """Return this session's in-memory store, resetting it when the workspace changes."""
+    workspace = workspace_id()
+    store = st.session_state.get(_STATE_KEY)
+    if store is None or store["workspace"] != workspace:
+        store = {"workspace": workspace, "values": {}}
+        st.session_state[_STATE_KEY] = store
+    return store
+
+
+def _load_persisted(workspace, key):
+    """Read a persisted state value, or None if the workspace has none."""
+    try:
+        with open(workspace_path(workspace, key), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _persist(workspace, key, value):
+    """Write a state value to the workspace atomically."""
+    path = workspace_path(workspace, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def get_state(key, default=None):
+    """
+    Return a value from this session's state.
+
+    Values live in memory for the session; on first access they are restored
+    from the workspace when persistence is enabled.
+    """
+    store = _session_store()
+    if key not in store["values"] and PERSIST_WORKSPACES:
+        persisted = _load_persisted(store["workspace"], key)
+        if persisted is not None:
+            store["values"][key] = persisted
+    return store["values"].get(key, default)
+
+
+def set_state(key, value):
+    """Store a JSON-serialisable value in this session's state (and workspace)."""
+    store = _session_store()
+    store["values"][key] = value
+    if PERSIST_WORKSPACES:
+        _persist(store["workspace"], key, value)
+
@@ -0,0 +1,199 @@
+# regressly/econometric_data/subset_selection.py
+
+import heapq
+import math
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from econometric_data.parallel_ingest import default_worker_count
+
+CRITERIA = ["AIC", "BIC", "Adj. R-squared"]
+
+# Searches over fewer candidates than this run in-process; worker start-up would dominate
+PROCESS_POOL_MIN_CANDIDATES = 24
+
+# Nodes each branch-and-bound task may visit before it stops and reports a non-exhaustive search
+MAX_NODES_PER_TASK = 200_000
+
+
+class GramSystem:
+    """
+    X'X, X'y, y'y and sum(y) of all candidate regressors, computed once.
+
+    Every subset is fitted from the rows and columns of these matrices, so a
+    subset costs one small Cholesky solve and never touches the data. The
+    `forced` columns (the constant) are part of every subset.
+    """
+
+    def __init__(self, names, xtx, xty, yty, y_sum, nobs, forced):
+        self.names = list(names)
+        self.xtx = np.asarray(xtx, dtype=float)
+        self.xty = np.asarray(xty, dtype=float)
+        self.yty = float(yty)
+        self.nobs = int(nobs)
+        self.forced = list(forced)
+        self.candidates = [j for j in range(len(self.names)) if j not in self.forced]
+        self.tss = self.yty - y_sum ** 2 / self.nobs
+
+    def ssr(self, subset):
+        """Return the residual sum of squares of the forced columns plus `subset`."""
+        columns = self.forced + list(subset)
+        xtx = self.xtx[np.ix_(columns, columns)]
+        xty = self.xty[columns]
+        try:
+            lower = np.linalg.cholesky(xtx)
+            half_solution = np.linalg.solve(lower, xty)
+            explained = half_solution @ half_solution
+        except np.linalg.LinAlgError:
+            explained = xty @ np.linalg.pinv(xtx, hermitian=True) @ xty
+        return max(self.yty - explained, 0.0)
+
+    def criteria(self, ssr, subset_size):
+        """Return {criterion: value} of a subset from its residual sum of squares."""
+        n = self.nobs
+        n_params = len(self.forced) + subset_size
+        llf = -n / 2 * (math.log(2 * math.pi) + math.log(max(ssr, 1e-300) / n) + 1)
+        df_resid = n - n_params
+        return {
+            "AIC": -2 * llf + 2 * n_params,
+            "BIC": -2 * llf + math.log(n) * n_params,
+            "Adj. R-squared": 1 - (ssr / df_resid) / (self.tss / (n - 1)) if df_resid > 0 else -math.inf,
+        }
+
+    def score(self, ssr, subset_size, criterion):
+        """
+        Return the value to minimise for a criterion. It never decreases as the
+        residual sum of squares or the subset size grows, which is what makes
+        the branch-and-bound bound valid.
+        """
+        value = self.criteria(ssr, subset_size)[criterion]
+        return -value if criterion == "Adj. R-squared" else value
+
+
+def stepwise(system, criterion, direction="forward", scored=None):
+    """
+    Forward or backward stepwise search: repeatedly add (or drop) the candidate
+    that most improves the criterion, until no change improves it.
+    Returns the selected subset as a sorted tuple of column positions. Every
+    subset evaluated on the way is recorded in `scored` ({subset: score}).
+    """
+    scored = {} if scored is None else scored
+    current = [] if direction == "forward" else list(system.candidates)
+    best = system.score(system.ssr(current), len(current), criterion)
+    scored[tuple(sorted(current))] = best
+    while True:
+        if direction == "forward":
+            moves = [current + [j] for j in system.candidates if j not in current]
+        else:
+            moves = [[c for c in current if c != j] for j in current]
+        if not moves:
+            break
+        scores = [system.score(system.ssr(move), len(move), criterion) for move in moves]
+        scored.update((tuple(sorted(move)), score) for move, score in zip(moves, scores))
+        step = int(np.argmin(scores))
+        if scores[step] >= best:
+            break
+        best, current = scores[step], moves[step]
+    return tuple(sorted(current))
+
+
+def _branch_and_bound(system, criterion, order, included, position, top_n, cutoff_limit):
+    """
+    Depth-first best-subset search below one node of the inclusion tree.
+
+    A node fixes which of `order[:position]` are included. No subset below it
+    can have a smaller residual sum of squares than including every remaining
+    candidate, or fewer columns than `included`, so the node is skipped when
+    that bound cannot beat the current top_n or `cutoff_limit`.
+    Returns (top subsets as (-score, subset) heap, nodes visited, exhaustive).
+    """
+    top = []
+    nodes = 0
+    stack = [(tuple(included), position, True)]
+    while stack:
+        if nodes >= MAX_NODES_PER_TASK:
+            return top, nodes, False
+        included, position, evaluate = stack.pop()
+        nodes += 1
+        cutoff = min(-top[0][0] if len(top) == top_n else math.inf, cutoff_limit)
+
+        if evaluate:
+            score = system.score(system.ssr(included), len(included), criterion)
+            if score < cutoff:
+                heapq.heappush(top, (-score, tuple(sorted(included))))
+                if len(top) > top_n:
+                    heapq.heappop(top)
+                cutoff = min(-top[0][0] if len(top) == top_n else math.inf, cutoff_limit)
+
+        if position == len(order):
+            continue
+        bound = system.score(system.ssr(included + tuple(order[position:])), len(included), criterion)
+        if bound >= cutoff:
+            continue
+        stack.append((included, position + 1, False))
+        stack.append((included + (order[position],), position + 1, True))
+    return top, nodes, True
+
+
+def _search_task(arguments):
+    """Run one branch-and-bound subtree (in a worker process)."""
+    return _branch_and_bound(*arguments)
+
+
+def best_subsets(system, criterion, top_n=10, max_workers=None):
+    """
+    Branch-and-bound best-subset search.
+
+    Forward and backward stepwise runs first; the subsets they score bound
+    the search from the start, and candidates are ordered by their forward
+    entry so good subsets are found early. The tree is split a few levels
+    down into independent subtrees, searched in parallel across cores when
+    there are enough candidates. Returns (subsets ranked best first, nodes visited,
+    exhaustive); exhaustive is False if a subtree hit MAX_NODES_PER_TASK.
+    """
+    seeds = {}
+    forward = stepwise(system, criterion, "forward", seeds)
+    stepwise(system, criterion, "backward", seeds)
+    order = list(forward) + [j for j in system.candidates if j not in forward]
+    seed_scores = sorted(seeds.values())
+    cutoff_limit = seed_scores[top_n - 1] if len(seed_scores) >= top_n else math.inf
+
+    max_workers = max_workers or default_worker_count()
+    use_processes = len(order) >= PROCESS_POOL_MIN_CANDIDATES and max_workers > 1
+    depth = min(len(order), max(1, math.ceil(math.log2(4 * max_workers)))) if use_processes else 0
+
+    # Every inclusion pattern of the first `depth` candidates is one subtree
+    tasks = []
+    for pattern in range(2 ** depth):
+        included = tuple(order[i] for i in range(depth) if pattern >> i & 1)
+        tasks.append((system, criterion, order, included, depth, top_n, cutoff_limit))
+
+    if use_processes and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            outcomes = list(pool.map(_search_task, tasks))
+    else:
+        outcomes = [_search_task(task) for task in tasks]
+
+    found = dict(seeds)
+    nodes = 0
+    exhaustive = True
+    for top, task_nodes, task_exhaustive in outcomes:
+        nodes += task_nodes
+        exhaustive &= task_exhaustive
+        for negative_score, subset in top:
+            found[subset] = -negative_score
+    ranked = sorted(found, key=lambda subset: (found[subset], len(subset)))[:top_n]
+    return ranked, nodes, exhaustive
+
+
+def rank_subsets(system, subsets):
+    """Return a table of subsets with their size, every criterion and R²."""
+    rows = []
+    for subset in subsets:
+        ssr = system.ssr(subset)
+        row = {"Variables": ", ".join(system.names[j] for j in subset) or "(constant only)", "Size": len(subset)}
+        row.update(system.criteria(ssr, len(subset)))
+        row["R-squared"] = 1 - ssr / system.tss if system.tss > 0 else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,185 @@
+# regressly/econometric_data/timeseries_join.py
+
+import pandas as pd
+import streamlit as st
+from econometric_data.columnar_cache import read_columns
+
+# Step 2 frequency -> pandas resample rule (monthly and coarser periods are labelled by
+# their first day, as in FRED data)
+FREQUENCY_RULES = {
+    "Daily": "D",
+    "Weekly": "W",
+    "Monthly": "MS",
+    "Quarterly": "QS",
+    "Annually": "YS",
+}
+
+# Ways a series can be aggregated when resampled to a lower frequency
+AGGREGATIONS = ["mean", "last", "sum"]
+
+
+def group_by_file(variables):
+    """
+    Group selected variables by the file (and date column) they come from.
+
+    `variables` are Step 3 selection entries with "variable", "file_path" and
+    "date_column" keys. Returns {(file_path, date_column): [variable, ...]} in
+    selection order, each variable listed once.
+    """
+    groups = {}
+    for entry in variables:
+        columns = groups.setdefault((entry["file_path"], entry["date_column"]), [])
+        if entry["variable"] not in columns:
+            columns.append(entry["variable"])
+    return groups
+
+
+def read_series(file_path, date_column, variables):
+    """Read the date column and the given variables of one file as date-indexed series."""
+    df = read_columns(file_path, [date_column] + variables, parse_dates=[date_column])
+    df = df.dropna(subset=[date_column]).set_index(date_column).sort_index()
+    if df.index.has_duplicates:
+        raise ValueError(f"Date column '{date_column}' of {file_path} has duplicate dates.")
+    return df
+
+
+def resample_frame(frame, rule, aggregations):
+    """
+    Resample a date-indexed frame to a new frequency.
+
+    Each column is aggregated with its own method from `aggregations` ("mean",
+    "last" or "sum"; default "mean"), one vectorized resample per method.
+    """
+    by_method = {}
+    for column in frame.columns:
+        by_method.setdefault(aggregations.get(column, "mean"), []).append(column)
+
+    resampler = frame.resample(rule)
+    parts = []
+    for method, columns in by_method.items():
+        if method not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{method}' for {', '.join(columns)}")
+        if method == "sum":
+            parts.append(resampler[columns].sum(min_count=1))  # Empty periods stay missing
+        else:
+            parts.append(getattr(resampler[columns], method)())
+    return pd.concat(parts, axis=1)[frame.columns]
+
+
+def asof_join(frames, tolerance, direction="backward"):
+    """
+    Join frames onto the dates of the first one, matching each date to the
+    nearest earlier (or `direction`) date of the others within `tolerance`.
+    """
+    joined = frames[0]
+    for frame in frames[1:]:
+        joined = pd.merge_asof(
+            joined, frame, left_index=True, right_index=True, tolerance=tolerance, direction=direction
+        )
+    return joined
+
+
+def align_time_series(variables, start_date=None, end_date=None, frequency=None, tolerance=None):
+    """
+    Read selected variables and align them on their dates, reading each file once.
+
+    Variables are grouped by source file; every file is read once with only the
+    needed columns. With a Step 2 `frequency`, each file is first resampled to
+    it, aggregating every variable by its "aggregation" entry (mean/last/sum),
+    and periods in which the file has no value are dropped.
+    Files are then aligned in a single outer join on the date index or, with a
+    `tolerance` (Timedelta), as-of joined onto the dates of the first variable's
+    file.
+
+    Returns (joined, groups): a DataFrame with one column per variable (in
+    selection order) and every date, gaps left as NaN, and the variables of
+    each file as returned by group_by_file().
+    """
+    groups = group_by_file(variables)
+    aggregations = {entry["variable"]: entry.get("aggregation", "mean") for entry in variables}
+    rule = FREQUENCY_RULES.get(frequency)
+
+    frames = []
+    for (file_path, date_column), columns in groups.items():
+        frame = read_series(file_path, date_column, columns)
+        if rule:
+            # Periods with no observation (weekends and holidays of business-day data
+            # resampled daily) are dropped, so each file keeps only its own dates
+            frame = resample_frame(frame, rule, aggregations).dropna(how="all")
+        frames.append(frame.loc[start_date:end_date])
+
+    names = [column for frame in frames for column in frame.columns]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Variables selected from more than one file: {', '.join(duplicates)}")
+
+    if tolerance is not None:
+        joined = asof_join(frames, tolerance)
+    else:
+        joined = pd.concat(frames, axis=1, join="outer", sort=True)
+    return joined[list(dict.fromkeys(entry["variable"] for entry in variables))], groups
+
+
+def complete_rows(joined, groups, how="inner", frequency=None):
+    """
+    Keep the dates of an aligned frame where every column has a value.
+
+    With how="inner" only dates where every column has a value are kept; with
+    how="outer" all dates are kept. `groups` maps each file to its columns in
+    `joined`, to report which file the dropped dates were missing from.
+
+    Returns (data, report): the kept rows and a dictionary describing the dates
+    that were dropped.
+    """
+    complete = joined.notna().all(axis=1)
+    data = joined[complete] if how == "inner" else joined
+    dropped = joined.index[~complete] if how == "inner" else joined.index[:0]
+    missing = joined.loc[dropped]
+    report = {
+        "files_read": len(groups),
+        "frequency": frequency if frequency in FREQUENCY_RULES else None,
+        "total_dates": len(joined),
+        "kept_dates": len(data),
+        "dropped_dates": dropped,
+        # Dropped dates on which a file had no value for any of its columns, per file
+        "missing_by_file": {
+            file_path: int(missing[columns].isna().all(axis=1).sum())
+            for (file_path, _), columns in groups.items()
+        },
+    }
+    return data, report
+
+
+def join_time_series(variables, how="inner", start_date=None, end_date=None, frequency=None, tolerance=None):
+    """
+    Read and align selected variables on their dates (see align_time_series()),
+    keeping the complete dates (see complete_rows()).
+
+    Returns (data, report): a DataFrame with one column per variable (in
+    selection order) and a dictionary describing the dates that were dropped.
+    """
+    joined, groups = align_time_series(variables, start_date, end_date, frequency, tolerance)
+    return complete_rows(joined, groups, how, frequency)
+
+
+def asof_tolerance(selected_data):
+    """Return the as-of join tolerance chosen in Step 3, or None to join on exact dates."""
+    days = selected_data.get("asof_tolerance_days") or 0
+    return pd.Timedelta(days=days) if days > 0 else None
+
+
+def display_join_report(report):
+    """Summarise the dates dropped while aligning the series."""
+    dropped = report["dropped_dates"]
+    if not len(dropped):
+        return
+    resampled = f" at {report['frequency'].lower()} frequency" if report.get("frequency") else ""
+    st.info(
+        f"Aligned {report['files_read']} file(s) on their dates{resampled}: kept {report['kept_dates']:,} of "
+        f"{report['total_dates']:,} dates, dropped {len(dropped):,} with a missing value."
+    )
+    with st.expander("Dropped dates"):
+        missing = {file_path: count for file_path, count in report["missing_by_file"].items() if count}
+        for file_path, count in missing.items():
+            st.write(f"{count:,} date(s) with no value from `{file_path}`")
+        st.write(", ".join(str(date.date()) for date in dropped))
@@ -2,8 +2,20 @@
 
 import os
 import json
+import time
 import pandas as pd
 import streamlit as st
+from econometric_data.chunked_io import DEFAULT_MEMORY_LIMIT_MB
+from econometric_data.compression import UPLOAD_TYPES
+from econometric_data.dataset_catalog import catalog_lock, load_catalog
+from econometric_data.dtype_plan import memory_saved_fraction
+from econometric_data.parallel_ingest import (
+    default_worker_count,
+    ingest_saved_file,
+    ingest_uploaded_files,
+    stage_upload,
+    upload_notice,
+)
 
 # Set up paths
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,8 +28,9 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 def clear_json_file():
     """Clear the JSON file."""
     try:
-        with open(JSON_FILE, 'w') as f:
-            json.dump({}, f)
+        with catalog_lock(JSON_FILE):
+            with open(JSON_FILE, 'w') as f:
+                json.dump({}, f)
         st.success("JSON file cleared successfully.")
     except Exception as e:
         st.error(f"Error clearing JSON file: {e}")
@@ -35,15 +48,93 @@ def load_json_file():
         return {}
 
 def write_to_json(files_metadata):
-    """Write file metadata to the JSON file."""
+    """Merge file metadata into the JSON file atomically, keeping earlier entries."""
     try:
-        # Write metadata to JSON
-        with open(JSON_FILE, 'w') as f:
-            json.dump(files_metadata, f, indent=4)
+        # Re-read under the lock, so entries written by other sessions since this upload started are kept
+        with catalog_lock(JSON_FILE):
+            catalog = load_catalog(JSON_FILE)
+            catalog.update(files_metadata)
+
+            # Write to a temporary file and swap it in so readers never see a partial file
+            tmp_file = JSON_FILE + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(catalog, f, indent=4)
+            os.replace(tmp_file, JSON_FILE)
         st.success("JSON file updated successfully.")
     except Exception as e:
         st.error(f"Error writing to JSON file: {e}")
 
+def progress_reporter(label):
+    """Return a progress callback that shows rows processed and rows/s in the UI."""
+    progress_bar = st.progress(0.0, text=label)
+
+    def report(rows, fraction, rows_per_second):
+        progress_bar.progress(fraction, text=f"{label}: {rows:,} rows ({rows_per_second:,.0f} rows/s)")
+
+    return report
+
+def ingest_single_file(uploaded_file, memory_limit_mb, catalog):
+    """Save and ingest one upload in-process, with row-level progress."""
+    file_name = uploaded_file.name
+    try:
+        # Stream the file to the upload directory in fixed-size blocks, hashing it for dedup
+        plan = stage_upload(uploaded_file, UPLOAD_DIR, catalog)
+        if plan["action"] == "skip":
+            return {}, {}, {file_name: upload_notice(plan)}
+        entry = ingest_saved_file(
+            plan["save_path"],
+            memory_limit_mb=memory_limit_mb,
+            progress_callback=progress_reporter(f"Profiling {file_name}"),
+            append_to=plan["append_to"],
+        )
+    except Exception as e:
+        return {}, {file_name: f"Error reading file: {e}"}, {}
+    entry.update(sha256=plan["sha256"], size=plan["size"])
+    notice = upload_notice(plan, entry, catalog)
+    return {file_name: entry}, {}, ({file_name: notice} if notice else {})
+
+def ingest_file_batch(uploaded_files, memory_limit_mb, max_workers, catalog):
+    """Save and ingest several uploads concurrently, with per-file progress."""
+    progress_bar = st.progress(0.0, text=f"Ingesting {len(uploaded_files)} files...")
+    started = time.perf_counter()
+    done = []
+
+    def on_file_done(file_name, entry, error):
+        done.append(entry["rows"] if entry else 0)
+        rows_per_second = sum(done) / max(time.perf_counter() - started, 1e-9)
+        progress_bar.progress(
+            len(done) / len(uploaded_files),
+            text=f"Ingested {len(done)}/{len(uploaded_files)} files ({rows_per_second:,.0f} rows/s)",
+        )
+
+    return ingest_uploaded_files(
+        uploaded_files,
+        UPLOAD_DIR,
+        catalog=catalog,
+        max_workers=max_workers,
+        memory_limit_mb=memory_limit_mb,
+        on_file_done=on_file_done,
+    )
+
+def display_memory_report(files_metadata):
+    """Show the in-memory size of each ingested dataset before and after its dtype plan."""
+    rows = [
+        {
+            "File": file_name,
+            "Default (MB)": entry["memory"]["default_bytes"] / 1024 ** 2,
+            "Planned (MB)": entry["memory"]["planned_bytes"] / 1024 ** 2,
+            "Saved": f"{memory_saved_fraction(entry['memory']):.0%}",
+            "Categorical columns": ", ".join(
+                column for column, dtype in entry["dtype_plan"].items() if dtype == "category"
+            ),
+        }
+        for file_name, entry in files_metadata.items()
+        if entry.get("memory")
+    ]
+    if rows:
+        st.write("### Memory Saved by Column Types")
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+
 def streamlit_file_uploader():
     """Display file uploader and handle file processing."""
     # Clear JSON File Button
@@ -53,35 +144,48 @@ def streamlit_file_uploader():
 
     # File Uploader Widget
     st.sidebar.write("### Browse Files")
-    uploaded_files = st.sidebar.file_uploader("Choose CSV files", type="csv", accept_multiple_files=True)
+    uploaded_files = st.sidebar.file_uploader(
+        "Choose CSV files (.csv, .csv.gz, .zip, .zst)", type=UPLOAD_TYPES, accept_multiple_files=True
+    )
+
+    # Ingestion memory limit
+    st.sidebar.write("### Ingestion Settings")
+    memory_limit_mb = st.sidebar.number_input(
+        "Memory limit (MB)",
+        min_value=128,
+        value=DEFAULT_MEMORY_LIMIT_MB,
+        step=128,
+        help="Peak memory target while parsing uploads; files are processed in chunks sized to fit.",
+    )
+    max_workers = st.sidebar.number_input(
+        "Parallel workers",
+        min_value=1,
+        value=default_worker_count(),
+        step=1,
+        help="Files in a multi-file upload are saved, parsed and profiled concurrently.",
+    )
 
     # Main App: Upload Files Button
     st.write("### Step 1: Upload Your CSV Files")
     if st.button("Upload Files"):
         if uploaded_files:
-            files_metadata = {}
-            for uploaded_file in uploaded_files:
-                file_name = uploaded_file.name
-                save_path = os.path.join(UPLOAD_DIR, file_name)
-
-                # Save the file to the upload directory
-                with open(save_path, 'wb') as f:
-                    f.write(uploaded_file.getbuffer())
-
-                # Extract headers
-                try:
-                    df = pd.read_csv(save_path, nrows=0)  # Read only headers
-                    headers = df.columns.tolist()
-                    files_metadata[file_name] = {
-                        "path": save_path,
-                        "headers": headers
-                    }
-                except Exception as e:
-                    st.error(f"Error reading file {file_name}: {e}")
-                    continue
-
-            # Write metadata to JSON
+            # Profile every column in one streaming pass, then write the columnar copy
+            catalog = load_catalog(JSON_FILE)
+            if len(uploaded_files) == 1:
+                files_metadata, errors, notices = ingest_single_file(uploaded_files[0], memory_limit_mb, catalog)
+            else:
+                files_metadata, errors, notices = ingest_file_batch(
+                    uploaded_files, memory_limit_mb, max_workers, catalog
+                )
+
+            for file_name, notice in notices.items():
+                st.info(f"{file_name}: {notice}")
+            for file_name, error in errors.items():
+                st.error(f"{file_name}: {error}")
+
+            # Write metadata to JSON once for the whole batch
             write_to_json(files_metadata)
+            display_memory_report(files_metadata)
         else:
             st.warning("No files selected. Please browse and select files.")
 
@@ -0,0 +1,58 @@
+# regressly/tests/test_categorical_encoding.py
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.preprocessing import OneHotEncoder
+from econometric_data.categorical_encoding import DEFAULT_ENCODING, binary_column, hashed, one_hot, select_encoding
+from econometric_data.design_matrix import fill_design
+
+
+def _dense(positions, width):
+    matrix, _ = fill_design([(list(range(width)), None, positions)], len(positions), sparse=False)
+    return matrix
+
+
+def test_one_hot_matches_sklearn_with_a_missing_level():
+    column = pd.Series(["tech", "energy", np.nan, "retail", "energy", "tech", np.nan, "banks"], name="sector")
+    positions, names = one_hot(column)
+
+    encoder = OneHotEncoder(drop="first", sparse_output=False).fit(column.to_frame())
+    np.testing.assert_array_equal(_dense(positions, len(names)), encoder.transform(column.to_frame()))
+    assert names == list(encoder.get_feature_names_out())
+
+
+def test_one_hot_of_a_categorical_sorts_levels_by_value():
+    column = pd.Series(pd.Categorical(["b", "a", "c"], categories=["c", "b", "a"]), name="grade")
+    positions, names = one_hot(column, drop_first=False)
+    assert names == ["grade_a", "grade_b", "grade_c"]
+    assert positions.tolist() == [1, 0, 2]
+
+
+def test_hashed_keeps_its_width_and_one_column_per_row():
+    rng = np.random.default_rng(5)
+    column = pd.Series(rng.integers(0, 5_000, size=20_000).astype(str), name="firm")
+    positions, names = hashed(column, n_features=64)
+    assert len(names) == 64
+
+    matrix, _ = fill_design([(names, None, positions)], len(column))
+    assert matrix.shape == (len(column), 64)
+    assert matrix.nnz == len(column)  # One non-zero per row, however many levels
+
+    hasher = FeatureHasher(n_features=64, input_type="string", alternate_sign=False)
+    expected = hasher.transform([f"firm={level}"] for level in column[:200]).tocsr().indices
+    np.testing.assert_array_equal(positions[:200], expected)
+
+
+def test_binary_column_is_zero_one_in_order_of_appearance():
+    column = pd.Series(["yes", "no", "no", "yes"])
+    encoded = binary_column(column)
+    assert encoded.dtype == float
+    assert encoded.tolist() == [0.0, 1.0, 1.0, 0.0]
+
+
+def test_no_categoricals_take_the_default_encoding():
+    encoding = select_encoding([])
+    assert encoding == DEFAULT_ENCODING
+    encoding["method"] = "hashing"  # A copy: the default is untouched
+    assert DEFAULT_ENCODING == {"method": "one-hot"}
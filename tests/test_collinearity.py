@@ -0,0 +1,64 @@
+# regressly/tests/test_collinearity.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from statsmodels.stats.outliers_influence import variance_inflation_factor
+from econometric_data.collinearity import CorrelationInverse
+
+
+def _frame(nobs=200):
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({"a": rng.normal(size=nobs), "b": rng.normal(size=nobs)})
+    frame["c"] = frame["a"] + 0.5 * frame["b"] + 0.3 * rng.normal(size=nobs) + 1e4
+    frame["d"] = rng.normal(size=nobs)
+    return frame
+
+
+def _expected_vif(frame):
+    x = sm.add_constant(frame).to_numpy()
+    return [variance_inflation_factor(x, j + 1) for j in range(frame.shape[1])]
+
+
+def test_vifs_match_statsmodels_as_columns_come_and_go():
+    frame = _frame()
+    tracker = CorrelationInverse()
+    for columns in (["a", "b"], ["a", "b", "c", "d"], ["a", "c", "d"], ["c", "d", "b"]):
+        tracker.update(frame[columns])
+        np.testing.assert_allclose(tracker.vif_table(columns)["VIF"], _expected_vif(frame[columns]), rtol=1e-8)
+        np.testing.assert_allclose(tracker.correlation_matrix(columns), frame[columns].corr(), atol=1e-12)
+
+
+def test_exactly_collinear_column_is_aliased_until_freed():
+    frame = _frame()
+    frame["a_plus_b"] = frame["a"] + frame["b"]
+    tracker = CorrelationInverse()
+    tracker.update(frame[["a", "b", "a_plus_b"]])
+    assert np.isinf(tracker.vif_table(["a_plus_b"])["VIF"][0])
+
+    tracker.update(frame[["a", "a_plus_b"]])  # Without b it is an ordinary column again
+    np.testing.assert_allclose(
+        tracker.vif_table(["a", "a_plus_b"])["VIF"], _expected_vif(frame[["a", "a_plus_b"]]), rtol=1e-8
+    )
+
+
+def test_column_with_other_missing_rows_borders_the_tracked_columns(monkeypatch):
+    frame = _frame()
+    frame.loc[:9, "a"] = np.nan
+    frame.loc[190:, "d"] = np.nan  # A shorter history than the tracked columns
+    tracker = CorrelationInverse()
+    tracker.update(frame[["a", "b", "c"]])
+
+    added = []
+    add = tracker.add
+    monkeypatch.setattr(tracker, "reset", lambda: pytest.fail("the tracker started over"))
+    monkeypatch.setattr(tracker, "add", lambda name, *args: added.append(name) or add(name, *args))
+    tracker.update(frame)
+    tracker.update(frame[["a", "c", "d"]])
+    assert added == ["d"]
+
+    columns = ["a", "c", "d"]
+    expected = frame[columns].corr()  # Pairwise complete, like the tracker
+    np.testing.assert_allclose(tracker.correlation_matrix(columns), expected, atol=1e-12)
+    np.testing.assert_allclose(tracker.vif_table(columns)["VIF"], np.diag(np.linalg.inv(expected)), rtol=1e-8)
@@ -0,0 +1,66 @@
+# regressly/tests/test_columnar_cache.py
+
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from econometric_data import columnar_cache
+from econometric_data.columnar_cache import columnar_path, has_columnar_copy, read_columns
+from econometric_data.dataset_catalog import find_entry
+from econometric_data.parallel_ingest import ingest_saved_file
+
+
+def _rows(start, nobs):
+    rng = np.random.default_rng(start)
+    return pd.DataFrame({
+        "date": pd.date_range("2001-01-01", periods=start + nobs, freq="D")[start:].strftime("%Y-%m-%d"),
+        "small": rng.integers(-100, 100, size=nobs),
+        "rate": rng.integers(0, 1000, size=nobs) / 4,
+        "region": rng.choice(["north", "south", "east", "west"], size=nobs),
+    })
+
+
+def _ingest(path, append_to=None):
+    entry = ingest_saved_file(str(path), append_to=append_to)
+    entry["size"] = os.path.getsize(path)
+    return entry
+
+
+def _parts(path):
+    return sorted(name for name in os.listdir(columnar_path(str(path))) if name.endswith(".parquet"))
+
+
+def test_appends_add_parts_and_reads_return_every_row(tmp_path, monkeypatch):
+    base = tmp_path / "base.csv"
+    _rows(0, 300).to_csv(base, index=False)
+    base_entry = _ingest(base)
+    assert _parts(base) == ["part-00000.parquet"]
+
+    # A re-upload with more rows reuses the base parts in a copy of its own
+    grown = tmp_path / "grown.csv"
+    shutil.copy(base, grown)
+    _rows(300, 200).to_csv(grown, mode="a", header=False, index=False)
+    grown_entry = _ingest(grown, append_to=(str(base), base_entry))
+    assert _parts(grown) == ["part-00000.parquet", "part-00001.parquet"]
+    assert _parts(base) == ["part-00000.parquet"]
+
+    # A second append to the same file adds another part in place
+    _rows(500, 100).to_csv(grown, mode="a", header=False, index=False)
+    entry = _ingest(grown, append_to=(str(grown), grown_entry))
+    assert _parts(grown) == ["part-00000.parquet", "part-00001.parquet", "part-00002.parquet"]
+    assert entry["rows"] == 600
+    assert has_columnar_copy(str(grown))
+
+    catalog = {"grown.csv": dict(entry, path=str(grown))}
+    monkeypatch.setattr(columnar_cache, "find_entry", lambda file_path: find_entry(file_path, catalog))
+    columns = ["region", "date", "small", "rate"]
+    data = read_columns(str(grown), columns, parse_dates=["date"])
+
+    assert list(data.columns) == columns
+    assert {column: str(data[column].dtype) for column in columns} == {
+        column: entry["dtype_plan"][column] for column in columns
+    }
+    expected = pd.read_csv(grown)
+    pd.testing.assert_series_equal(data["date"], pd.to_datetime(expected["date"]), check_dtype=False)
+    for column in ("small", "rate", "region"):
+        pd.testing.assert_series_equal(data[column].astype(expected[column].dtype), expected[column])
@@ -0,0 +1,69 @@
+# regressly/tests/test_compression.py
+
+import io
+import gzip
+import zipfile
+import pytest
+from econometric_data.chunked_io import iter_csv_chunks, save_upload_in_chunks
+from econometric_data.compression import open_decompressed, read_csv, skip_bytes
+
+CONTENT = b"x,y\n" + b"".join(f"{i},{i * i}\n".encode() for i in range(500))
+
+
+def _write_zip(path, members):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+
+
+@pytest.fixture(params=["csv", "gz", "zip", "zst"])
+def stored(request, tmp_path):
+    path = tmp_path / f"data.{request.param}"
+    if request.param == "csv":
+        path.write_bytes(CONTENT)
+    elif request.param == "gz":
+        path.write_bytes(gzip.compress(CONTENT))
+    elif request.param == "zip":
+        _write_zip(path, {"__MACOSX/._data.csv": b"", "data.csv": CONTENT})
+    else:
+        zstandard = pytest.importorskip("zstandard")  # Optional, as in the app
+        path.write_bytes(zstandard.ZstdCompressor().compress(CONTENT))
+    return str(path)
+
+
+def test_compressed_files_read_as_their_content(stored):
+    with open_decompressed(stored) as (stream, _):
+        assert stream.read() == CONTENT
+    chunks = list(iter_csv_chunks(stored, chunksize=100))
+    assert [len(chunk) for chunk in chunks] == [100] * 5
+    assert read_csv(stored)["y"].iloc[-1] == 499 * 499
+
+
+def test_reading_from_an_offset_skips_the_prefix(stored):
+    offset = CONTENT.index(b"400,")
+    with open_decompressed(stored) as (stream, _):
+        skip_bytes(stream, offset, block_bytes=64)
+        assert stream.read(4) == b"400,"
+    chunk = next(iter_csv_chunks(stored, chunksize=1000, start_offset=offset, header=None, names=["x", "y"]))
+    assert chunk["x"].tolist() == list(range(400, 500))
+
+
+def test_upload_hashes_cover_the_uncompressed_content(stored, tmp_path):
+    compressed = open(stored, "rb").read()
+    upload = io.BytesIO(compressed)
+    upload.name = stored
+    size, digest, prefixes = save_upload_in_chunks(upload, str(tmp_path / "saved"), chunk_bytes=1000,
+                                                   prefix_sizes=[len(CONTENT) // 2])
+    plain = io.BytesIO(CONTENT)
+    plain.name = "data.csv"
+    assert (size, digest, prefixes) == save_upload_in_chunks(plain, str(tmp_path / "plain"),
+                                                             prefix_sizes=[len(CONTENT) // 2])
+    assert open(tmp_path / "saved", "rb").read() == compressed  # Stored as uploaded
+
+
+def test_zip_with_several_csv_files_is_an_error(tmp_path):
+    path = str(tmp_path / "data.zip")
+    _write_zip(path, {"a.csv": CONTENT, "b.csv": CONTENT})
+    with pytest.raises(ValueError, match="exactly one CSV"):
+        with open_decompressed(path):
+            pass
@@ -0,0 +1,75 @@
+# regressly/tests/test_cumulative_ols.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from econometric_data import cumulative_ols
+from econometric_data.cumulative_ols import CumulativeOLS
+
+
+def _design(nobs=300):
+    rng = np.random.default_rng(1)
+    dates = pd.date_range("2000-01-01", periods=nobs, freq="D")
+    x = pd.DataFrame({"const": 1.0, "level": 1e5 + rng.normal(size=nobs), "rate": rng.normal(size=nobs)}, index=dates)
+    y = pd.Series(1 + 0.2 * x["level"] + 2 * x["rate"] + rng.normal(size=nobs), index=dates, name="y")
+    return y, x
+
+
+@pytest.mark.parametrize("block_entries", [4096, 7])  # One prefix entry per row, and per block of rows
+def test_window_fit_matches_statsmodels(monkeypatch, block_entries):
+    monkeypatch.setattr(cumulative_ols, "PREFIX_MAX_ENTRIES", block_entries)
+    y, x = _design()
+    result = CumulativeOLS(y, x).fit("2000-02-03", "2000-08-10")
+    expected = sm.OLS(y["2000-02-03":"2000-08-10"], x["2000-02-03":"2000-08-10"]).fit()
+    assert result.nobs == expected.nobs
+    np.testing.assert_allclose(result.params, expected.params, rtol=1e-7)
+    np.testing.assert_allclose(result.bse, expected.bse, rtol=1e-6)
+    assert np.isclose(result.rsquared, expected.rsquared, rtol=1e-9)
+
+
+@pytest.mark.filterwarnings("ignore:The design matrix is rank-deficient")
+def test_collinear_window_fit_matches_statsmodels():
+    y, x = _design()
+    x["rate_shifted"] = x["rate"] + 3
+    result = CumulativeOLS(y, x).fit()
+    expected = sm.OLS(y, x).fit()
+    np.testing.assert_allclose(result.params, expected.params, rtol=1e-7)
+    np.testing.assert_allclose(result.bse, expected.bse, rtol=1e-6)
+
+
+def test_rolling_fits_match_statsmodels(monkeypatch):
+    monkeypatch.setattr(cumulative_ols, "PREFIX_MAX_ENTRIES", 64)  # Several batches of windows
+    y, x = _design()
+    fits = CumulativeOLS(y, x).rolling_fits(window=40)
+    coefficients = fits.pivot(index="date", columns="variable", values="coefficient")[x.columns]
+    std_errors = fits.pivot(index="date", columns="variable", values="std_error")[x.columns]
+    assert len(coefficients) == len(x) - 39
+
+    # RollingOLS sums uncentred cross products, which are less precise than this far from zero
+    for end in (39, 150, 299):
+        expected = sm.OLS(y.iloc[end - 39:end + 1], x.iloc[end - 39:end + 1]).fit()
+        np.testing.assert_allclose(coefficients.loc[x.index[end]], expected.params, rtol=1e-7)
+        np.testing.assert_allclose(std_errors.loc[x.index[end]], expected.bse, rtol=1e-6)
+
+
+@pytest.mark.filterwarnings("ignore:The design matrix is rank-deficient")
+def test_collinear_rolling_windows_match_statsmodels():
+    y, x = _design(nobs=60)
+    x["rate_shifted"] = x["rate"] + 3
+    fits = CumulativeOLS(y, x).rolling_fits(window=30)
+    coefficients = fits.pivot(index="date", columns="variable", values="coefficient")[x.columns]
+    expected = sm.OLS(y.iloc[-30:], x.iloc[-30:]).fit()
+    np.testing.assert_allclose(coefficients.iloc[-1], expected.params, rtol=1e-6)
+
+
+def test_expanding_fits_match_statsmodels():
+    y, x = _design(nobs=80)
+    fits = CumulativeOLS(y, x).rolling_fits(min_nobs=10)
+    coefficients = fits.pivot(index="date", columns="variable", values="coefficient")[x.columns]
+    nobs = fits.groupby("date")["nobs"].first()
+    assert nobs.iloc[0] == 10 and nobs.iloc[-1] == 80
+
+    for end in (9, 40, 79):
+        expected = sm.OLS(y.iloc[:end + 1], x.iloc[:end + 1]).fit()
+        np.testing.assert_allclose(coefficients.loc[x.index[end]], expected.params, rtol=1e-7)
@@ -0,0 +1,55 @@
+# regressly/tests/test_data_cache.py
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from econometric_data import data_cache
+from econometric_data.data_cache import LRUCache, cached, dataset_fingerprint
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(data_cache, "DATA_CACHE", LRUCache(memory_limit_mb=1))
+    return data_cache.DATA_CACHE
+
+
+def test_callers_cannot_change_cached_values(cache):
+    @cached(lambda: "key")
+    def load():
+        return pd.DataFrame({"x": [1.0, 2.0]}), np.arange(3.0)
+
+    frame, array = load()
+    frame["x"] *= 10
+    frame.loc[0, "x"] = -1
+    with pytest.raises(ValueError):
+        array[0] = 5
+
+    frame, array = load()
+    assert frame["x"].tolist() == [1.0, 2.0]
+    assert array.tolist() == [0.0, 1.0, 2.0]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    block = np.zeros(400_000 // 8)  # 400 kB: two fit in the 1 MB budget
+    for key in ("a", "b", "c"):
+        cache.put(key, block)
+    assert list(cache.entries) == ["b", "c"]
+    assert cache.evictions == 1
+
+
+def test_dataset_fingerprint_follows_the_dtype_plan(tmp_path, monkeypatch):
+    data_file = tmp_path / "data.csv"
+    data_file.write_text("x\n1\n")
+    catalog_file = tmp_path / "ingested_files.json"
+    monkeypatch.setattr(data_cache, "CATALOG_FILE", str(catalog_file))
+
+    def write_plan(dtype):
+        catalog_file.write_text(json.dumps({"data.csv": {"path": str(data_file), "dtype_plan": {"x": dtype}}}))
+        catalog_file.touch()
+
+    write_plan("int8")
+    before = dataset_fingerprint(str(data_file))
+    write_plan("float32")  # The CSV is unchanged, but reads now return other dtypes
+    assert dataset_fingerprint(str(data_file)) != before
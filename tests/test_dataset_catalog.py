@@ -0,0 +1,79 @@
+# regressly/tests/test_dataset_catalog.py
+
+from concurrent.futures import ThreadPoolExecutor
+from econometric_data.chunked_io import iter_csv_chunks
+from econometric_data.dataset_catalog import profile_csv
+
+
+def _write_rows(path, rows, mode="w"):
+    with open(path, mode) as f:
+        f.write("".join(row + "\n" for row in rows))
+
+
+def test_rows_with_extra_fields_are_reported_per_chunk(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    rows = [f"{i},{i}" for i in range(12)]
+    rows[2] += ",extra"   # Line 4 (after the header), in the first chunk of 5 rows
+    rows[9] += ",extra"   # Line 11, in the second
+    _write_rows(path, ["x,y"] + rows)
+
+    reported = []
+    chunks = list(iter_csv_chunks(path, chunksize=5, bad_rows_callback=lambda *args: reported.append(args)))
+    assert sum(len(chunk) for chunk in chunks) == 10
+    assert [lines for _, lines in reported] == [[4], [11]]
+    assert [number for number, _ in reported] == [0, 1]
+
+
+def test_quoted_delimiters_and_line_breaks_are_not_extra_fields(tmp_path):
+    path = str(tmp_path / "quoted.csv")
+    _write_rows(path, ["x,y", '"a,b",1', '"c\nd,e",2', "3,4,5", '"f""g",6', "", "7,8,9"])
+
+    reported = []
+    chunk = next(iter_csv_chunks(path, chunksize=10, bad_rows_callback=lambda *args: reported.append(args)))
+    assert chunk["x"].tolist() == ["a,b", "c\nd,e", 'f"g']
+    assert reported == [(0, [4, 7])]  # A quoted line break does not start a new line, as in pandas
+
+
+def test_readers_in_threads_report_their_own_rows(tmp_path):
+    paths = []
+    for i in range(8):
+        paths.append(str(tmp_path / f"file_{i}.csv"))
+        _write_rows(paths[-1], ["x,y"] + [f"{j},{j}" + (",extra" if j == i else "") for j in range(200)])
+
+    def skipped_lines(path):
+        reported = []
+        list(iter_csv_chunks(path, chunksize=50, bad_rows_callback=lambda _, lines: reported.extend(lines)))
+        return reported
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(skipped_lines, paths)) == [[i + 2] for i in range(8)]
+
+
+def test_profile_counts_skipped_rows_and_unparsed_values(tmp_path):
+    path = str(tmp_path / "bad.csv")
+    _write_rows(path, ["x,y", "1,a", "3,4,5", "n.a.,b", "7,c", "9,4"])
+
+    entry = profile_csv(path)
+    assert entry["rows"] == 4
+    assert entry["skipped_rows"] == 1
+    assert entry["skipped_lines"] == [3]
+    assert entry["columns"]["x"]["unparsed_count"] == 1  # "n.a." among numbers
+    assert "unparsed_count" not in entry["columns"]["y"]  # Mostly text: a text column, not bad numbers
+
+    # Appended rows add to the count, with line numbers from the first appended line
+    base_size = len(open(path, "rb").read())
+    _write_rows(path, ["10,11", "12,13,14"], mode="a")
+    appended = profile_csv(path, resume_from=(path, base_size))
+    assert appended["rows"] == 5
+    assert appended["skipped_rows"] == 2
+    assert appended["skipped_lines"] == [2]
+
+
+def test_distinct_count_ignores_the_dtype_of_each_chunk(tmp_path):
+    path = str(tmp_path / "mixed.csv")
+    # The same 50 values in chunks parsed as integers, floats and (with "n.a.") text
+    values = [str(i) for i in range(50)]
+    _write_rows(path, ["x"] + values + [f"{i}.0" for i in range(50)] + values[:-1] + ["n.a."])
+
+    entry = profile_csv(path, chunksize=50)
+    assert entry["columns"]["x"]["distinct_estimate"] == 51
@@ -0,0 +1,71 @@
+# regressly/tests/test_design_matrix.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from econometric_data.design_matrix import CONSTANT_COLUMN, add_constant, build_design, plan_design
+
+X_ENTRIES = [
+    {"variable": "rate", "type": "continuous"},
+    {"variable": "sector", "type": "categorical"},
+    {"variable": "member", "type": "categorical"},
+    {"variable": "spread", "type": "continuous"},
+]
+
+
+def _frame(nobs=60):
+    rng = np.random.default_rng(6)
+    frame = pd.DataFrame({
+        "y": rng.normal(size=nobs),
+        "rate": rng.normal(size=nobs),
+        "sector": rng.choice(["banks", "energy", "tech"], size=nobs).astype(object),
+        "member": rng.choice(["yes", "no"], size=nobs),
+        "spread": rng.normal(size=nobs),
+    }, index=pd.RangeIndex(100, 100 + nobs))
+    frame.loc[[103, 110], "rate"] = np.nan
+    frame.loc[125, "spread"] = np.nan
+    frame.loc[140, "y"] = np.nan
+    frame.loc[[105, 130], "sector"] = np.nan  # A level of its own, not a dropped row
+    return frame
+
+
+@pytest.mark.parametrize("encoding", [{"method": "one-hot"}, {"method": "hashing", "n_features": 16}])
+@pytest.mark.parametrize("binary_as_column", [False, True])
+def test_sparse_and_dense_builds_are_equal(encoding, binary_as_column):
+    frame = _frame()
+    builds = [
+        build_design(frame, X_ENTRIES, "y", encoding, binary_as_column, sparse=sparse, constant=True)
+        for sparse in (True, False)
+    ]
+    (y_sparse, sparse), (y_dense, dense) = builds
+    pd.testing.assert_series_equal(y_sparse, y_dense)
+    assert sparse.columns == dense.columns
+    assert sparse.matrix.format == "csr"
+    np.testing.assert_array_equal(sparse.matrix.toarray(), dense.matrix)
+    assert dense.matrix.flags.c_contiguous
+
+
+def test_constant_comes_first_and_matches_statsmodels():
+    frame = _frame().dropna()
+    _, design = build_design(frame, X_ENTRIES, "y", sparse=False, constant=True)
+    assert design.columns[0] == CONSTANT_COLUMN
+    np.testing.assert_array_equal(design.matrix[:, 0], 1.0)
+    assert CONSTANT_COLUMN not in build_design(frame, X_ENTRIES, "y", sparse=False)[1].columns
+
+    x = frame[["rate", "spread"]]
+    pd.testing.assert_frame_equal(add_constant(x).frame(), sm.add_constant(x))
+
+
+def test_rows_missing_y_or_a_continuous_value_are_dropped_from_both():
+    frame = _frame()
+    complete, _ = plan_design(frame, X_ENTRIES, "y")
+    dropped = [103, 110, 125, 140]
+    assert frame.index[~complete].tolist() == dropped
+
+    y, design = build_design(frame, X_ENTRIES, "y", sparse=False, constant=True)
+    assert y.index.equals(frame.index.drop(dropped))
+    assert design.index.equals(y.index)
+    frame_x = design.frame()
+    np.testing.assert_array_equal(frame_x["rate"], frame.loc[y.index, "rate"])
+    np.testing.assert_array_equal(frame_x["sector_nan"], frame.loc[y.index, "sector"].isna())
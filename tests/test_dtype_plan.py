@@ -0,0 +1,84 @@
+# regressly/tests/test_dtype_plan.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from econometric_data.dataset_catalog import profile_csv
+from econometric_data.dtype_plan import (
+    CATEGORY_MAX_RATIO, _narrowest_integer, apply_dtype_plan, memory_saved_fraction, plan_column_dtype,
+)
+
+
+@pytest.mark.parametrize("low, high, dtype", [
+    (-128, 127, "int8"),
+    (-129, 0, "int16"),
+    (0, 128, "int16"),
+    (-32768, 32767, "int16"),
+    (0, 32768, "int32"),
+    (-2 ** 31, 2 ** 31 - 1, "int32"),
+    (0, 2 ** 31, "int64"),
+    (-2 ** 63, 2 ** 63 - 1, "int64"),
+])
+def test_narrowest_integer_at_the_boundaries(low, high, dtype):
+    assert _narrowest_integer(low, high) == dtype
+
+
+def _entry(dtype, null_count=0, **entry):
+    return {"dtype": dtype, "null_count": null_count, "min": None, "max": None, "distinct_estimate": 0, **entry}
+
+
+def test_numbers_take_the_narrowest_lossless_dtype():
+    assert plan_column_dtype(_entry("int64", min=0, max=300), 10) == "int16"
+    # With missing values an integer column is read as floats
+    assert plan_column_dtype(_entry("int64", null_count=1, min=0, max=300, float32_exact=True), 10) == "float32"
+    assert plan_column_dtype(_entry("float64", float32_exact=True), 10) == "float32"
+    assert plan_column_dtype(_entry("float64", float32_exact=False), 10) == "float64"
+    assert plan_column_dtype(_entry("bool"), 10) == "bool"
+    assert plan_column_dtype(_entry("bool", null_count=1, distinct_estimate=2), 10) == "category"
+    assert plan_column_dtype(_entry("datetime64[ns]", date={}), 10) == "datetime64[ns]"
+
+
+def test_text_becomes_categorical_up_to_the_distinct_ratio():
+    rows, nulls = 110, 10
+    limit = int(CATEGORY_MAX_RATIO * (rows - nulls))
+    assert plan_column_dtype(_entry("object", nulls, distinct_estimate=limit), rows) == "category"
+    assert plan_column_dtype(_entry("object", nulls, distinct_estimate=limit + 1), rows) == "object"
+    assert plan_column_dtype(_entry("object", rows), rows) == "object"  # Every value missing
+
+
+def test_memory_saved_fraction():
+    assert memory_saved_fraction(None) == 0.0
+    assert memory_saved_fraction({"default_bytes": 0, "planned_bytes": 0}) == 0.0
+    assert memory_saved_fraction({"default_bytes": 400, "planned_bytes": 100}) == 0.75
+    assert memory_saved_fraction({"default_bytes": 100, "planned_bytes": 120}) == 0.0
+
+
+def test_planned_dtypes_keep_every_value(tmp_path):
+    rng = np.random.default_rng(9)
+    nobs = 400
+    frame = pd.DataFrame({
+        "date": pd.date_range("2001-01-01", periods=nobs, freq="D").strftime("%Y-%m-%d"),
+        "small": rng.integers(-100, 100, size=nobs),
+        "wide": rng.integers(0, 2 ** 40, size=nobs),
+        "halves": rng.integers(0, 1000, size=nobs) / 2,
+        "prices": rng.normal(100, 5, size=nobs).round(7),
+        "counts": np.where(rng.random(nobs) < 0.1, np.nan, rng.integers(0, 50, size=nobs)),
+        "region": rng.choice(["north", "south", "east", "west"], size=nobs),
+        "ident": [f"id{i}" for i in range(nobs)],
+    })
+    path = tmp_path / "data.csv"
+    frame.to_csv(path, index=False)
+
+    entry = profile_csv(str(path))
+    assert entry["dtype_plan"] == {
+        "date": "datetime64[ns]", "small": "int8", "wide": "int64", "halves": "float32", "prices": "float64",
+        "counts": "float32", "region": "category", "ident": "object",
+    }
+    assert entry["memory"]["planned_bytes"] < entry["memory"]["default_bytes"]
+
+    default = pd.read_csv(path)
+    planned = apply_dtype_plan(default.copy(), entry["dtype_plan"])
+    assert {column: str(dtype) for column, dtype in planned.dtypes.items()} == entry["dtype_plan"]
+    pd.testing.assert_series_equal(planned["date"], pd.to_datetime(default["date"]), check_dtype=False)
+    for column in default.columns.drop("date"):
+        pd.testing.assert_series_equal(planned[column].astype(default[column].dtype), default[column])
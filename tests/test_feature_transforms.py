@@ -0,0 +1,68 @@
+# regressly/tests/test_feature_transforms.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from econometric_data.feature_transforms import apply_transform, transformed_design
+
+
+def test_missing_month_stays_a_gap():
+    dates = pd.to_datetime(["2024-01-01", "2024-02-01", "2024-04-01", "2024-05-01", "2024-06-01"])
+    series = pd.Series([1.0, 2.0, 4.0, 5.0, 6.0], index=dates, name="X")  # March is missing
+
+    lag = apply_transform(series, "lag", 1)
+    assert lag.name == "X_lag1"
+    assert np.isnan(lag["2024-04-01"])  # Not February's value
+    assert lag["2024-05-01"] == 4.0
+
+    diff = apply_transform(series, "diff", 1)
+    assert np.isnan(diff["2024-04-01"])  # Would otherwise span two months
+    assert diff["2024-06-01"] == 1.0
+
+    rolling = apply_transform(series, "rolling_mean", 2)
+    assert np.isnan(rolling["2024-04-01"])
+    assert rolling["2024-05-01"] == 4.5
+
+
+def test_month_end_dates_shift_by_month():
+    dates = pd.to_datetime(["2024-01-31", "2024-02-29", "2024-03-31", "2024-05-31"])
+    lag = apply_transform(pd.Series([1.0, 2.0, 3.0, 5.0], index=dates, name="X"), "lag", 1)
+    assert np.isnan(lag["2024-01-31"])
+    assert lag["2024-02-29"] == 1.0
+    assert lag["2024-03-31"] == 2.0
+    assert np.isnan(lag["2024-05-31"])  # April is missing
+
+
+def test_business_days_skip_weekends_and_holidays():
+    dates = pd.bdate_range("2024-01-01", periods=15).drop(pd.Timestamp("2024-01-15"))  # A holiday Monday
+    series = pd.Series(np.arange(len(dates), dtype=float), index=dates, name="X")
+    # Aligned onto every calendar day, as after an outer join with seven-day data
+    aligned = series.reindex(pd.date_range(dates[0], dates[-1]))
+
+    lag = apply_transform(aligned, "lag", 1)
+    assert lag["2024-01-08"] == series["2024-01-05"]  # Monday lags to Friday
+    assert lag["2024-01-16"] == series["2024-01-12"]  # After the holiday
+    assert np.isnan(lag["2024-01-06"])  # Weekends have no value of their own
+
+
+def test_daily_data_with_weekends_keeps_gaps():
+    dates = pd.date_range("2024-01-01", periods=10).drop(pd.Timestamp("2024-01-05"))
+    series = pd.Series(np.arange(len(dates), dtype=float), index=dates, name="X")
+    lag = apply_transform(series, "lag", 1)
+    assert np.isnan(lag["2024-01-06"])
+    assert lag["2024-01-07"] == series["2024-01-06"]
+
+
+def test_x_column_named_like_a_target_is_an_error():
+    dates = pd.date_range("2024-01-01", periods=6, freq="MS")
+    joined = pd.DataFrame({"Y": np.arange(6.0), "X": np.arange(6.0) ** 2}, index=dates)
+    groups = {"data.csv": ["Y", "X"]}
+    entries = [{"variable": "X"}, {"variable": "Y", "transforms": [{"transform": "level", "periods": 0}]}]
+    with pytest.raises(ValueError, match="Y"):
+        transformed_design(joined, groups, ["Y"], entries)
+
+    # The target's lags are columns of their own
+    entries[1]["transforms"] = [{"transform": "lag", "periods": 1}]
+    frame, x_names, _ = transformed_design(joined, groups, ["Y"], entries)
+    assert list(frame.columns) == ["Y"] + x_names
+    assert "Y_lag1" in x_names
@@ -0,0 +1,51 @@
+# regressly/tests/test_lasso_path.py
+
+import numpy as np
+import scipy.sparse as sp
+import pytest
+from sklearn.linear_model import Lasso
+from econometric_data import lasso_path
+from econometric_data.lasso_path import alpha_grid, fit_lasso, fit_path
+
+# Both paths are solved to a duality gap of TOL, and must then agree coefficient-wise to ATOL
+TOL = 1e-10
+ATOL = 1e-6
+
+
+def _design(sparse):
+    rng = np.random.default_rng(0)
+    if sparse:
+        x = sp.random(1000, 600, density=0.02, format="csr", random_state=0)
+    else:
+        x = rng.normal(size=(100, 400))
+    beta = np.zeros(x.shape[1])
+    beta[:10] = rng.normal(size=10) * 3
+    return x, np.asarray(x @ beta).ravel() + rng.normal(size=x.shape[0])
+
+
+def _unscreened_path(monkeypatch, x, y, alphas, l1_ratio):
+    with monkeypatch.context() as patch:
+        patch.setattr(lasso_path, "SCREENING_MIN_FEATURES", x.shape[1] + 1)
+        return fit_path(x, y, alphas, l1_ratio, tol=TOL)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("l1_ratio", [1.0, 0.5])
+def test_screened_path_matches_unscreened(monkeypatch, sparse, l1_ratio):
+    x, y = _design(sparse)
+    alphas = alpha_grid(x, y, n_alphas=30, eps=1e-2, l1_ratio=l1_ratio)
+    assert lasso_path._screened(x)
+
+    coefs, intercepts = fit_path(x, y, alphas, l1_ratio, tol=TOL)
+    expected_coefs, expected_intercepts = _unscreened_path(monkeypatch, x, y, alphas, l1_ratio)
+    np.testing.assert_allclose(coefs, expected_coefs, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(intercepts, expected_intercepts, rtol=0, atol=ATOL)
+
+
+def test_fit_lasso_matches_scikit_learn():
+    x, y = _design(sparse=False)
+    alpha = alpha_grid(x, y, n_alphas=1)[0] * 0.02
+    coef, intercept = fit_lasso(x, y, alpha, tol=TOL)
+    model = Lasso(alpha=alpha, tol=TOL, max_iter=100000).fit(x, y)
+    np.testing.assert_allclose(coef, model.coef_, rtol=0, atol=ATOL)
+    assert intercept == pytest.approx(model.intercept_, abs=ATOL)
@@ -0,0 +1,69 @@
+# regressly/tests/test_lead_lag_screening.py
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.stattools import grangercausalitytests
+from econometric_data import lead_lag_screening
+from econometric_data.lead_lag_screening import cross_correlations, granger_tests, screen_leading_indicators
+
+MAX_LAG = 4
+
+
+def _series(nobs=300, seed=7):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=nobs).cumsum() * 0.1 + 50  # A level far from zero
+    y = np.empty(nobs)
+    y[:2] = rng.normal(size=2)
+    for t in range(2, nobs):
+        y[t] = 0.4 * y[t - 1] + 0.8 * (x[t - 2] - 50) + rng.normal()
+    return y, x
+
+
+def test_granger_tests_match_statsmodels_on_the_same_rows():
+    y, x = _series()
+    f_values, p_values, nobs = granger_tests(y, x, MAX_LAG)
+    assert nobs == len(y) - MAX_LAG
+
+    for order in range(1, MAX_LAG + 1):
+        # granger_tests uses the rows with all MAX_LAG lags; statsmodels drops the first `order` rows
+        data = np.column_stack([y, x])[MAX_LAG - order:]
+        f_test = grangercausalitytests(data, [order])[order][0]["ssr_ftest"]
+        np.testing.assert_allclose(f_values[order - 1], f_test[0], rtol=1e-8)
+        np.testing.assert_allclose(p_values[order - 1], f_test[1], rtol=1e-6, atol=1e-300)
+
+
+def test_cross_correlations_match_corrcoef_of_the_lagged_series():
+    y, x = _series()
+    y[[5, 40, 41]] = np.nan
+    x[[100, 250]] = np.nan
+    correlations = cross_correlations(y, x, MAX_LAG)
+
+    for lag in range(1, MAX_LAG + 1):
+        pairs = np.column_stack([y[lag:], x[:-lag]])
+        pairs = pairs[~np.isnan(pairs).any(axis=1)]
+        np.testing.assert_allclose(correlations[lag - 1], np.corrcoef(pairs.T)[0, 1], rtol=1e-10)
+
+
+def test_cross_correlations_need_three_pairs():
+    y = np.array([1.0, 2.0, 4.0, 3.0])
+    assert np.isnan(cross_correlations(y, y[::-1], 2)[1])  # Only 2 pairs at lag 2
+
+
+def test_process_pool_screen_matches_the_serial_one(monkeypatch):
+    y, _ = _series()
+    rng = np.random.default_rng(8)
+    dates = pd.date_range("2000-01-01", periods=len(y), freq="MS")
+    candidates = pd.DataFrame(rng.normal(size=(len(y), 6)), index=dates, columns=[f"s{j}" for j in range(6)])
+    candidates.iloc[:20, 2] = np.nan  # A shorter history
+    y = pd.Series(y, index=dates)
+
+    serial = screen_leading_indicators(y, candidates, MAX_LAG, max_workers=1)
+    pools = []
+    pool = lead_lag_screening.ProcessPoolExecutor
+    monkeypatch.setattr(lead_lag_screening, "PROCESS_POOL_MIN_SERIES", 2)
+    monkeypatch.setattr(lead_lag_screening, "ProcessPoolExecutor", lambda *args, **kwargs: pools.append(1) or pool(*args, **kwargs))
+    parallel = screen_leading_indicators(y, candidates, MAX_LAG, max_workers=2)
+
+    assert pools
+    assert len(serial) == 6 * MAX_LAG
+    pd.testing.assert_frame_equal(parallel, serial)
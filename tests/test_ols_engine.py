@@ -0,0 +1,64 @@
+# regressly/tests/test_ols_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from econometric_data.ols_engine import MultiOLSResult, fit_ols
+
+
+def _design(nobs=120, offset=1e6):
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame({"const": 1.0, "level": offset + rng.normal(size=nobs), "rate": rng.normal(size=nobs)})
+    y = pd.DataFrame({
+        "y1": 2 + 0.5 * x["level"] - x["rate"] + rng.normal(size=nobs),
+        "y2": -1 + 3 * x["rate"] + rng.normal(size=nobs),
+    })
+    return y, x
+
+
+def _assert_matches_statsmodels(result, y, x):
+    expected = sm.OLS(y, x).fit()
+    np.testing.assert_allclose(result.params, expected.params, rtol=1e-7, atol=1e-9)
+    np.testing.assert_allclose(result.bse, expected.bse, rtol=1e-6)
+    assert np.isclose(result.rsquared, expected.rsquared, rtol=1e-9)
+    assert np.isclose(result.ssr, expected.ssr, rtol=1e-7)
+    assert result.df_resid == expected.df_resid
+
+
+def test_fit_ols_matches_statsmodels_far_from_zero():
+    y, x = _design()
+    _assert_matches_statsmodels(fit_ols(y["y1"], x), y["y1"], x)
+
+
+def test_targets_solved_together_match_separate_fits():
+    y, x = _design()
+    model = MultiOLSResult(y, x)
+    for target in y.columns:
+        _assert_matches_statsmodels(model.result(target), y[target], x)
+    table = model.comparison_table().set_index("Target")
+    assert np.isclose(table.loc["y2", "R-squared"], sm.OLS(y["y2"], x).fit().rsquared)
+
+
+@pytest.mark.filterwarnings("ignore:The design matrix is rank-deficient")
+def test_rank_deficient_design_gives_the_minimum_norm_solution():
+    y, x = _design(offset=50.0)
+    x["level_again"] = x["level"]  # A duplicated column: the coefficient is split between the two
+    x["shifted"] = x["rate"] + 3   # Collinear with the constant too
+    result = fit_ols(y["y1"], x)
+    assert result.rank == 3
+    _assert_matches_statsmodels(result, y["y1"], x)
+
+
+def test_statsmodels_results_are_built_only_when_asked_for():
+    y, x = _design()
+    result = fit_ols(y["y1"], x)
+    assert result._results is None
+    expected = sm.OLS(y["y1"], x).fit()
+    assert np.isclose(result.fvalue, expected.fvalue, rtol=1e-7)
+    assert np.isclose(result.aic, expected.aic, rtol=1e-9)
+    np.testing.assert_allclose(result.conf_int(), expected.conf_int(), rtol=1e-6)
+    assert result._results is None
+
+    assert result.statsmodels_results().nobs == expected.nobs
+    assert result.statsmodels_results() is result.statsmodels_results()
@@ -0,0 +1,31 @@
+# regressly/tests/test_parallel_ingest.py
+
+import hashlib
+from econometric_data.parallel_ingest import classify_upload, upload_notice
+
+
+def _catalog_file(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return {"path": str(path), "size": len(content), "sha256": hashlib.sha256(content).hexdigest(), "rows": 2}
+
+
+def test_reupload_identical_to_another_file_is_ingested(tmp_path):
+    old, new = b"x\n1\n2\n", b"x\n3\n4\n"
+    catalog = {"A.csv": _catalog_file(tmp_path, "A.csv", old), "B.csv": _catalog_file(tmp_path, "B.csv", new)}
+    sha256 = hashlib.sha256(new).hexdigest()
+
+    # A.csv now has B.csv's bytes: skipping it would leave A's stale entry in place
+    assert classify_upload("A.csv", len(new), sha256, {}, catalog) == ("full", None)
+    assert classify_upload("A.csv", len(new), sha256, {}, catalog, {sha256: "C.csv"}) == ("full", None)
+
+    # Identical re-uploads, and new names for catalogued content, are still skipped
+    assert classify_upload("B.csv", len(new), sha256, {}, catalog) == ("skip", "B.csv")
+    assert classify_upload("C.csv", len(new), sha256, {}, catalog) == ("skip", "B.csv")
+
+
+def test_upload_notice_counts_rows():
+    plan = {"action": "append", "base_name": "A.csv"}
+    catalog = {"A.csv": {"rows": 2}}
+    assert upload_notice(plan, {"rows": 3}, catalog) == "Extends A.csv; ingested 1 new row only."
+    assert upload_notice(plan, {"rows": 1002}, catalog) == "Extends A.csv; ingested 1,000 new rows only."
@@ -0,0 +1,54 @@
+# regressly/tests/test_recursive_ols.py
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from econometric_data import recursive_ols
+from econometric_data.recursive_ols import RecursiveOLS, refresh_saved_model, save_model
+
+
+def _data(nobs=200):
+    rng = np.random.default_rng(2)
+    dates = pd.date_range("2010-01-01", periods=nobs, freq="MS")
+    data = pd.DataFrame({"level": 5e4 + rng.normal(size=nobs), "rate": rng.normal(size=nobs)}, index=dates)
+    data["y"] = 3 + 0.1 * data["level"] - data["rate"] + rng.normal(size=nobs)
+    return data
+
+
+def _design(data):
+    return data["y"], sm.add_constant(data[["level", "rate"]])
+
+
+def test_recursive_updates_match_a_full_fit():
+    y, x = _design(_data())
+    model = RecursiveOLS.from_data(y.iloc[:50], x.iloc[:50])
+    assert model.append(y, x) == 150  # Only the rows after the last fitted date
+
+    expected = sm.OLS(y, x).fit()
+    np.testing.assert_allclose(model.params, expected.params, rtol=1e-8)
+    np.testing.assert_allclose(model.bse, expected.bse, rtol=1e-6)
+    assert np.isclose(model.result().rsquared, expected.rsquared, rtol=1e-9)
+
+    restored = RecursiveOLS.from_dict(model.to_dict())
+    np.testing.assert_allclose(restored.params, model.params, rtol=0)
+    assert restored.last_date == model.last_date
+
+
+def test_refresh_keeps_the_saved_end_date(tmp_path, monkeypatch):
+    monkeypatch.setattr(recursive_ols, "SAVED_MODELS_DIR", str(tmp_path))
+    data = _data()
+
+    def load_transformed_data(selected_data, target_names, start_date=None, end_date=None):
+        return data.loc[start_date:end_date], ["level", "rate"], None
+
+    monkeypatch.setattr(recursive_ols, "load_transformed_data", load_transformed_data)
+    y, x = _design(data)
+    selection = {"y": {"variable": "y"}, "start_date": "2010-01-01"}
+    closed = save_model("closed", RecursiveOLS.from_data(y.iloc[:100], x.iloc[:100]),
+                        dict(selection, end_date=str(y.index[99].date())))
+    open_ended = save_model("open", RecursiveOLS.from_data(y.iloc[:100], x.iloc[:100]), dict(selection, end_date=None))
+
+    assert refresh_saved_model(closed)["Rows Added"] == 0  # Rows after the window stay out
+    refreshed = refresh_saved_model(open_ended, check_drift=True)
+    assert refreshed["Rows Added"] == 100
+    assert refreshed["Drift"] < recursive_ols.DRIFT_TOLERANCE
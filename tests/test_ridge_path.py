@@ -0,0 +1,28 @@
+# regressly/tests/test_ridge_path.py
+
+import numpy as np
+import scipy.sparse as sp
+import pytest
+from sklearn.linear_model import Ridge
+from econometric_data.ridge_path import RidgePath
+
+
+def _design(nobs, k, offset):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(nobs, k))
+    x[:, 0] += offset  # A regressor far from zero, such as a level in the millions
+    beta = rng.normal(size=k)
+    return x, x @ beta + 5 + rng.normal(size=nobs)
+
+
+@pytest.mark.parametrize("offset", [0.0, 1e4, 1e7])
+@pytest.mark.parametrize("shape", [(200, 8), (20, 40)])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_ridge_matches_scikit_learn(offset, shape, sparse):
+    x, y = _design(*shape, offset)
+    path = RidgePath(y, sp.csr_matrix(x) if sparse else x, [f"x{j}" for j in range(x.shape[1])])
+    alpha = path.alphas[len(path.alphas) // 2]
+    model = Ridge(alpha=alpha, solver="svd").fit(x, y)
+    np.testing.assert_allclose(path.coefficients(alpha).to_numpy(), model.coef_, rtol=1e-6, atol=1e-9)
+    assert path.intercept(alpha) == pytest.approx(model.intercept_, rel=1e-6, abs=1e-6)
+    assert path.rss(alpha) == pytest.approx(np.sum((y - model.predict(x)) ** 2), rel=1e-6)
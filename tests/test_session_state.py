@@ -0,0 +1,40 @@
+# regressly/tests/test_session_state.py
+
+from types import SimpleNamespace
+import pytest
+from econometric_data import session_state
+from econometric_data.session_state import SELECTED_VARIABLES, get_state, set_state
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    """Switch between fake browser sessions, each with its own URL and session state."""
+    monkeypatch.setattr(session_state, "WORKSPACE_DIR", str(tmp_path))
+    monkeypatch.setattr(session_state, "PERSIST_WORKSPACES", True)
+
+    def open_session(query_params=None):
+        monkeypatch.setattr(session_state, "st", SimpleNamespace(query_params=dict(query_params or {}), session_state={}))
+        return session_state.st
+
+    return open_session
+
+
+def test_sessions_keep_their_own_state(session):
+    first = session()
+    set_state(SELECTED_VARIABLES, {"y": "GDP"})
+    second = session()
+    assert get_state(SELECTED_VARIABLES) is None
+    assert first.query_params["workspace"] != second.query_params["workspace"]
+
+
+def test_reloading_the_workspace_url_restores_its_state(session):
+    first = session()
+    set_state(SELECTED_VARIABLES, {"y": "GDP"})
+    session(first.query_params)  # A new session on the same URL
+    assert get_state(SELECTED_VARIABLES) == {"y": "GDP"}
+
+
+def test_invalid_workspace_ids_are_replaced(session):
+    st = session({"workspace": "../../etc"})
+    assert get_state(SELECTED_VARIABLES, "default") == "default"
+    assert st.query_params["workspace"] != "../../etc"
@@ -0,0 +1,49 @@
+# regressly/tests/test_subset_selection.py
+
+from itertools import combinations
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from econometric_data.subset_selection import GramSystem, best_subsets, rank_subsets, stepwise
+
+
+def _system(nobs=150):
+    rng = np.random.default_rng(4)
+    x = pd.DataFrame(rng.normal(size=(nobs, 7)), columns=[f"x{j}" for j in range(7)])
+    x["x6"] += 1e3  # Far from zero, as a level would be
+    y = 1 + 2 * x["x0"] - x["x2"] + 0.5 * x["x6"] + rng.normal(size=nobs)
+    design = sm.add_constant(x)
+    xc = design - design.mean().where(design.columns != "const", 0)  # Centred, as CumulativeOLS keeps it
+    yc = y - y.mean()
+    system = GramSystem(design.columns, xc.T @ xc, xc.T @ yc, yc @ yc, yc.sum(), nobs, forced=[0])
+    return system, y, design
+
+
+def _statsmodels_fit(system, y, design, subset):
+    return sm.OLS(y, design.iloc[:, [0] + list(subset)]).fit()
+
+
+def test_subset_criteria_match_statsmodels():
+    system, y, design = _system()
+    subsets = [(1, 3), (2, 5, 7)]
+    table = rank_subsets(system, subsets)
+    for (_, row), subset in zip(table.iterrows(), subsets):
+        fit = _statsmodels_fit(system, y, design, subset)
+        assert row["AIC"] == pytest.approx(fit.aic, rel=1e-9)
+        assert row["BIC"] == pytest.approx(fit.bic, rel=1e-9)
+        assert row["Adj. R-squared"] == pytest.approx(fit.rsquared_adj, rel=1e-9)
+        assert row["R-squared"] == pytest.approx(fit.rsquared, rel=1e-9)
+
+
+@pytest.mark.parametrize("criterion", ["AIC", "BIC"])
+def test_best_subset_matches_exhaustive_search(criterion):
+    system, y, design = _system()
+    attribute = criterion.lower()
+    everything = [subset for size in range(8) for subset in combinations(range(1, 8), size)]
+    expected = min(everything, key=lambda subset: getattr(_statsmodels_fit(system, y, design, subset), attribute))
+
+    ranked, _, exhaustive = best_subsets(system, criterion, max_workers=1)
+    assert exhaustive
+    assert ranked[0] == expected
+    assert set(stepwise(system, criterion, "forward")) >= {1, 3, 7}  # x0, x2 and x6 enter
@@ -0,0 +1,66 @@
+# regressly/tests/test_timeseries_join.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from econometric_data.timeseries_join import align_time_series, join_time_series
+
+
+def _write(tmp_path, name, frame):
+    path = tmp_path / name
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    monthly = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=4, freq="MS"), "GDP": [1.0, 2.0, 3.0, 4.0]})
+    daily_dates = pd.date_range("2024-01-01", "2024-03-31", freq="D")
+    daily = pd.DataFrame({
+        "day": daily_dates,
+        "RATE": np.arange(len(daily_dates), dtype=float),
+        "VOLUME": np.ones(len(daily_dates)),
+    })
+    return _write(tmp_path, "monthly.csv", monthly), _write(tmp_path, "daily.csv", daily), daily_dates
+
+
+def _entries(monthly, daily):
+    return [
+        {"variable": "GDP", "file_path": monthly, "date_column": "date"},
+        {"variable": "RATE", "file_path": daily, "date_column": "day", "aggregation": "last"},
+        {"variable": "VOLUME", "file_path": daily, "date_column": "day", "aggregation": "sum"},
+    ]
+
+
+def test_resampled_files_are_joined_on_their_periods(files):
+    monthly, daily, daily_dates = files
+    data, report = join_time_series(_entries(monthly, daily), frequency="Monthly")
+
+    assert list(data.columns) == ["GDP", "RATE", "VOLUME"]
+    assert list(data.index) == list(pd.date_range("2024-01-01", periods=3, freq="MS"))
+    rate = pd.Series(np.arange(len(daily_dates), dtype=float), index=daily_dates)
+    assert data["RATE"].tolist() == rate.resample("MS").last().tolist()
+    assert data["VOLUME"].tolist() == [31.0, 29.0, 31.0]
+    assert report["files_read"] == 2
+    assert list(report["dropped_dates"]) == [pd.Timestamp("2024-04-01")]  # No daily data for April
+    assert report["missing_by_file"] == {daily: 1, monthly: 0}
+
+
+def test_asof_join_takes_the_latest_earlier_value(files):
+    monthly, daily, _ = files
+    entries = _entries(monthly, daily)[:2]
+    joined, _ = align_time_series(entries, tolerance=pd.Timedelta(days=3))
+    assert list(joined.index) == list(pd.date_range("2024-01-01", periods=4, freq="MS"))  # The first file's dates
+    assert joined.loc["2024-02-01", "RATE"] == 31.0
+    assert joined.loc["2024-04-01", "RATE"] == 90.0  # March 31st, within three days
+
+    joined, _ = align_time_series(entries, tolerance=pd.Timedelta(hours=12))
+    assert np.isnan(joined.loc["2024-04-01", "RATE"])
+
+
+def test_variable_from_two_files_is_an_error(files, tmp_path):
+    monthly, _, _ = files
+    other = _write(tmp_path, "other.csv", pd.read_csv(monthly))
+    entries = [{"variable": "GDP", "file_path": path, "date_column": "date"} for path in (monthly, other)]
+    with pytest.raises(ValueError, match="GDP"):
+        align_time_series(entries)
@@ -0,0 +1,36 @@
+# regressly/tests/test_upload_file.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from econometric_data import upload_file
+from econometric_data.dataset_catalog import catalog_lock, load_catalog
+
+
+def test_concurrent_catalog_writes_keep_every_entry(tmp_path, monkeypatch):
+    catalog_file = str(tmp_path / "ingested_files.json")
+    monkeypatch.setattr(upload_file, "JSON_FILE", catalog_file)
+
+    names = [f"file_{i}.csv" for i in range(32)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda name: upload_file.write_to_json({name: {"rows": 1}}), names))
+
+    assert sorted(load_catalog(catalog_file)) == sorted(names)
+    assert not (tmp_path / "ingested_files.json.lock").exists()
+
+
+def test_long_held_lock_is_not_taken_over(tmp_path):
+    catalog_file = str(tmp_path / "ingested_files.json")
+    acquired = threading.Event()
+
+    def wait_for_lock():
+        with catalog_lock(catalog_file):
+            acquired.set()
+
+    with catalog_lock(catalog_file):
+        os.utime(catalog_file + ".lock", (0, 0))  # Looks abandoned by its age, but is still held
+        waiter = threading.Thread(target=wait_for_lock)
+        waiter.start()
+        assert not acquired.wait(0.3)
+    waiter.join(5)
+    assert acquired.is_set()